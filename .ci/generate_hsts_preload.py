@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the GNU Affero General Public License as published by the
+# Free Software Foundation, either version 3 of the License, or (at your
+# option) any later version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or
+# FITNESS FOR A PARTICULAR PURPOSE.  See the GNU Affero General Public License
+# for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Generates the snapshot of the HSTS preload list used by HTTPSBear from the
+list in the Chromium sources.
+
+The list is a JSON file with ``//`` comments. Only entries with the
+``force-https`` mode are preloaded, the others only pin keys. Every host is
+written on its own line, prefixed with a dot if its subdomains are preloaded
+as well.
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import urllib.request
+
+CHROMIUM_HSTS_PRELOAD_URL = (
+    'https://chromium.googlesource.com/chromium/src/+/main/net/http/'
+    'transport_security_state_static.json?format=TEXT')
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+HSTS_PRELOAD_FILE = os.path.join(PROJECT_DIR, 'bears', 'general',
+                                 'hsts_preload.txt.gz')
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description='This program generates the snapshot of the HSTS '
+                    'preload list of Chromium used by HTTPSBear.')
+    parser.add_argument('--input', '-i',
+                        help='path to transport_security_state_static.json, '
+                             'downloaded from the Chromium sources if not '
+                             'given')
+    parser.add_argument('--output', '-o', default=HSTS_PRELOAD_FILE,
+                        help='name of the gzipped file to generate')
+    return parser.parse_args()
+
+
+def read_chromium_list(path=None):
+    """
+    Reads the HSTS preload list of Chromium.
+
+    :param path: The path to a local copy of the list or None to download
+                 the current one.
+    :return:     The text of the list.
+    """
+    if path is not None:
+        with open(path, encoding='utf-8') as file:
+            return file.read()
+
+    with urllib.request.urlopen(CHROMIUM_HSTS_PRELOAD_URL) as response:
+        # Gitiles serves the raw file base64 encoded
+        return base64.b64decode(response.read()).decode('utf-8')
+
+
+def get_preloaded_hosts(text):
+    """
+    Extracts the preloaded hosts from the HSTS preload list of Chromium.
+
+    :param text: The text of the list.
+    :return:     A sorted list of the hosts, prefixed with a dot if their
+                 subdomains are preloaded.
+    """
+    lines = [line for line in text.splitlines()
+             if not line.lstrip().startswith('//')]
+    entries = json.loads('\n'.join(lines))['entries']
+    return sorted(('.' if entry.get('include_subdomains') else '') +
+                  entry['name']
+                  for entry in entries
+                  if entry.get('mode') == 'force-https')
+
+
+def write_hsts_preload(hosts, path):
+    # A fixed mtime keeps the output reproducible
+    with gzip.GzipFile(path, 'wb', 9, mtime=0) as file:
+        file.write(''.join(host + '\n' for host in hosts).encode('ascii'))
+
+
+if __name__ == '__main__':
+    args = get_args()
+    hosts = get_preloaded_hosts(read_chromium_list(args.input))
+    write_hsts_preload(hosts, args.output)
+    print('Wrote {} hosts to {}'.format(len(hosts), args.output))
@@ -1,11 +1,15 @@
-from clang.cindex import Index, LibclangError
+from clang.cindex import Index, LibclangError, TranslationUnitLoadError
 
+from bears.c_languages.ClangPrecompiledHeader import (
+    get_include_header_args, get_prefix_header_args, get_source_language)
+from bears.c_languages.ClangTranslationUnitCache import (
+    get_translation_unit)
 from coalib.bears.LocalBear import LocalBear
 from coalib.results.Diff import Diff
 from coalib.results.Result import Result
 from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
 from coalib.results.SourceRange import SourceRange
-from coalib.settings.Setting import typed_list
+from coalib.settings.Setting import path, typed_list
 
 from dependency_management.requirements.PipRequirement import PipRequirement
 
@@ -79,6 +83,7 @@ class ClangBear(LocalBear):
 
     def run(self, filename, file,
             clang_cli_options: typed_list(str) = None,
+            prefix_header: path = '',
             ):
         """
         Check code for syntactical or semantical problems using Clang.
@@ -87,12 +92,28 @@ class ClangBear(LocalBear):
 
         :param clang_cli_options: Any options that will be passed through to
                                   Clang.
+        :param prefix_header:     A header to include before every file, e.g.
+                                  one including the heavy headers all files
+                                  use. It is precompiled once and reused for
+                                  all files until it or one of the headers it
+                                  includes changes.
         """
-        index = Index.create()
-        diagnostics = index.parse(
-            filename,
-            args=clang_cli_options,
-            unsaved_files=[(filename, ''.join(file))]).diagnostics
+        args = list(clang_cli_options or ())
+        if prefix_header:
+            try:
+                translation_unit = get_translation_unit(
+                    filename, file, args + get_prefix_header_args(
+                        prefix_header, args,
+                        get_source_language(filename, args)))
+            except TranslationUnitLoadError:
+                # E.g. the precompiled header doesn't match the file, clang
+                # reports the errors of the header itself when including it
+                translation_unit = get_translation_unit(
+                    filename, file,
+                    args + get_include_header_args(prefix_header))
+        else:
+            translation_unit = get_translation_unit(filename, file, args)
+        diagnostics = translation_unit.diagnostics
         for diag in diagnostics:
             severity = {0: RESULT_SEVERITY.INFO,
                         1: RESULT_SEVERITY.INFO,
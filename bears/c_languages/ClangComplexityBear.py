@@ -1,11 +1,13 @@
-from clang.cindex import Index, CursorKind
+from clang.cindex import CursorKind
 
 from coalib.bears.LocalBear import LocalBear
 from coalib.results.Result import Result
 from coalib.bearlib import deprecate_settings
+from coalib.settings.Setting import typed_list
 from bears.c_languages.ClangBear import (
     clang_available, ClangBear, sourcerange_from_clang_range,
 )
+from bears.c_languages.ClangTranslationUnitCache import get_translation_unit
 
 
 class ClangComplexityBear(LocalBear):
@@ -79,6 +81,7 @@ class ClangComplexityBear(LocalBear):
     @deprecate_settings(cyclomatic_complexity='max_complexity')
     def run(self, filename, file,
             cyclomatic_complexity: int = 8,
+            clang_cli_options: typed_list(str) = None,
             ):
         """
         Check for all functions if they are too complicated using the
@@ -94,9 +97,11 @@ class ClangComplexityBear(LocalBear):
                                 module, either limit cyclomatic complexity to
                                 [the agreed-upon limit] or provide a written
                                 explanation of why the limit was exceeded."
+        :param clang_cli_options: Any options that will be passed through to
+                                  Clang.
         """
 
-        root = Index.create().parse(filename).cursor
+        root = get_translation_unit(filename, file, clang_cli_options).cursor
         for cursor, complexity in self.complexities(root, filename):
             if complexity > cyclomatic_complexity:
                 affected_code = (sourcerange_from_clang_range(cursor.extent),)
@@ -0,0 +1,254 @@
+from collections import namedtuple
+
+from clang.cindex import CursorKind
+
+from coalib.bears.LocalBear import LocalBear
+from coalib.results.Result import Result
+from coalib.settings.Setting import typed_list
+from bears.c_languages.ClangBear import (
+    clang_available, ClangBear, sourcerange_from_clang_range,
+)
+from bears.c_languages.ClangTranslationUnitCache import get_translation_unit
+
+FunctionMetrics = namedtuple('FunctionMetrics',
+                             'cyclomatic_complexity nesting_depth statements '
+                             'parameters fan_out')
+
+_FUNCTION_KINDS = {
+    CursorKind.FUNCTION_DECL, CursorKind.CXX_METHOD, CursorKind.CONSTRUCTOR,
+    CursorKind.DESTRUCTOR, CursorKind.CONVERSION_FUNCTION,
+    CursorKind.FUNCTION_TEMPLATE}
+# The decision points counted by ClangComplexityBear
+_DECISIVE_KINDS = {
+    CursorKind.IF_STMT, CursorKind.WHILE_STMT, CursorKind.FOR_STMT,
+    CursorKind.DEFAULT_STMT, CursorKind.CASE_STMT}
+_NESTING_KINDS = {
+    CursorKind.IF_STMT, CursorKind.WHILE_STMT, CursorKind.FOR_STMT,
+    CursorKind.DO_STMT, CursorKind.SWITCH_STMT,
+    CursorKind.CXX_FOR_RANGE_STMT, CursorKind.CXX_TRY_STMT}
+# Statements whose last child is a statement, e.g. the body of a loop
+_LAST_CHILD_STATEMENT_KINDS = {
+    CursorKind.WHILE_STMT, CursorKind.FOR_STMT,
+    CursorKind.CXX_FOR_RANGE_STMT, CursorKind.SWITCH_STMT,
+    CursorKind.CASE_STMT, CursorKind.DEFAULT_STMT, CursorKind.LABEL_STMT}
+# Statements not counted themselves, only the statements they contain
+_UNCOUNTED_KINDS = {
+    CursorKind.COMPOUND_STMT, CursorKind.NULL_STMT, CursorKind.CASE_STMT,
+    CursorKind.DEFAULT_STMT, CursorKind.LABEL_STMT}
+
+
+def _get_body(cursor):
+    """
+    :return: The body of the function or None if it's only declared.
+    """
+    if not cursor.is_definition():
+        return None
+    return next((child for child in cursor.get_children()
+                 if child.kind == CursorKind.COMPOUND_STMT),
+                None)
+
+
+def _get_statement_positions(cursor, children):
+    """
+    :return: The indices of the children of the cursor that are statements
+             by their position, e.g. the branches of an if statement, even
+             if they are single expressions without braces.
+    """
+    kind = cursor.kind
+    if kind == CursorKind.COMPOUND_STMT:
+        return range(len(children))
+    if not children:
+        return ()
+    if kind == CursorKind.IF_STMT:
+        # The branches follow the condition
+        condition = next((index for index, child in enumerate(children)
+                          if child.kind.is_expression()),
+                         0)
+        return range(condition + 1, len(children))
+    if kind == CursorKind.DO_STMT:
+        return (0,)
+    if kind in _LAST_CHILD_STATEMENT_KINDS:
+        return (len(children) - 1,)
+    return ()
+
+
+def get_function_metrics(body):
+    """
+    Calculates all metrics of a function in one walk over its body.
+
+    The cyclomatic complexity is calculated like ``ClangComplexityBear``
+    does: decision points minus exit points plus two, where code after a
+    return on the top level of the body isn't counted. Unlike
+    ``ClangComplexityBear``, which walks the first child of the function
+    that isn't a parameter, the body is walked even if the return type is a
+    type reference. The nesting depth is the maximum number of nested
+    control statements, an ``else if`` doesn't count as nested. The
+    statements counted are the ones in blocks and the bodies and branches of
+    control statements, braced or not, where blocks and labels aren't
+    counted themselves. The fan out is the number of distinct functions
+    called.
+
+    :param body: The compound statement cursor of the function body.
+    :return:     A ``FunctionMetrics`` tuple without the parameter count.
+    """
+    decisions, exits, statements, max_depth = 0, 0, 0, 0
+    called_functions = set()
+    returned = False
+
+    # Tuples of the iterator over the numbered children, the cursor, the
+    # positions of the children that are statements and the nesting depth,
+    # the tree is walked depth first without recursion.
+    children = list(body.get_children())
+    stack = [(enumerate(children), body,
+              _get_statement_positions(body, children), 0)]
+    while stack:
+        children, parent, statement_positions, depth = stack[-1]
+        child_num, child = next(children, (None, None))
+        if child is None:
+            stack.pop()
+            continue
+
+        kind = child.kind
+        if child_num in statement_positions and kind not in _UNCOUNTED_KINDS:
+            statements += 1
+
+        if kind == CursorKind.CALL_EXPR and child.spelling:
+            called_functions.add(child.spelling)
+
+        if kind in _NESTING_KINDS:
+            # The else branch is the third child of an if statement
+            is_else_if = (kind == CursorKind.IF_STMT and
+                          parent.kind == CursorKind.IF_STMT and
+                          child_num == 2)
+            if not is_else_if:
+                depth += 1
+                max_depth = max(max_depth, depth)
+
+        if not returned:
+            if kind in _DECISIVE_KINDS:
+                decisions += 1
+            elif kind == CursorKind.RETURN_STMT:
+                exits += 1
+                # Code after a top level return is unreachable
+                returned = len(stack) == 1
+
+        children = list(child.get_children())
+        stack.append((enumerate(children), child,
+                      _get_statement_positions(child, children), depth))
+
+    if not returned:
+        # Implicit return statement.
+        exits += 1
+
+    return FunctionMetrics(cyclomatic_complexity=max(1,
+                                                     decisions - exits + 2),
+                           nesting_depth=max_depth,
+                           statements=statements,
+                           parameters=None,
+                           fan_out=len(called_functions))
+
+
+def get_functions_metrics(cursor, filename):
+    """
+    Retrieves all functions defined in the given file and their metrics.
+    Cursors of other files are skipped without walking their children.
+
+    :param cursor:   The cursor to search functions in, usually the one of a
+                     translation unit.
+    :param filename: The file to retrieve the functions of.
+    :return:         An iterator of tuples of function cursors and their
+                     ``FunctionMetrics``.
+    """
+    stack = [iter(cursor.get_children())]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+            continue
+
+        file = child.location.file
+        if file is not None and file.name != filename:
+            continue
+
+        if child.kind in _FUNCTION_KINDS:
+            body = _get_body(child)
+            if body is not None:
+                parameters = sum(1 for parameter in child.get_children()
+                                 if parameter.kind == CursorKind.PARM_DECL)
+                yield child, get_function_metrics(body)._replace(
+                    parameters=parameters)
+        else:
+            stack.append(iter(child.get_children()))
+
+
+class ClangFunctionMetricsBear(LocalBear):
+    """
+    Calculates the cyclomatic complexity, the maximum nesting depth, the
+    number of statements and parameters and the fan out of each function and
+    reports functions exceeding the maximum of one of them.
+    """
+
+    LANGUAGES = ClangBear.LANGUAGES
+    REQUIREMENTS = ClangBear.REQUIREMENTS
+    AUTHORS = {'The coala developers'}
+    AUTHORS_EMAILS = {'coala-devel@googlegroups.com'}
+    LICENSE = 'AGPL-3.0'
+    CAN_DETECT = {'Complexity'}
+
+    check_prerequisites = classmethod(clang_available)
+
+    _METRIC_DESCRIPTIONS = FunctionMetrics(
+        cyclomatic_complexity='cyclomatic complexity',
+        nesting_depth='nesting depth',
+        statements='number of statements',
+        parameters='number of parameters',
+        fan_out='number of called functions')
+
+    def run(self, filename, file,
+            max_cyclomatic_complexity: int = 8,
+            max_nesting_depth: int = 5,
+            max_statements: int = 60,
+            max_parameters: int = 6,
+            max_fan_out: int = 15,
+            clang_cli_options: typed_list(str) = None,
+            ):
+        """
+        Check for all functions if they are too complicated using several
+        metrics calculated in one pass over the function.
+
+        :param max_cyclomatic_complexity:
+            Maximum cyclomatic complexity that is considered to be normal. See
+            <https://www.wikiwand.com/en/Cyclomatic_complexity>.
+        :param max_nesting_depth:
+            Maximum number of nested control statements.
+        :param max_statements:
+            Maximum number of statements.
+        :param max_parameters:
+            Maximum number of parameters.
+        :param max_fan_out:
+            Maximum number of distinct functions a function calls.
+        :param clang_cli_options:
+            Any options that will be passed through to Clang.
+        """
+        maxima = FunctionMetrics(
+            cyclomatic_complexity=max_cyclomatic_complexity,
+            nesting_depth=max_nesting_depth,
+            statements=max_statements,
+            parameters=max_parameters,
+            fan_out=max_fan_out)
+        root = get_translation_unit(filename, file, clang_cli_options).cursor
+        for cursor, metrics in get_functions_metrics(root, filename):
+            for value, maximum, description in zip(metrics,
+                                                   maxima,
+                                                   self._METRIC_DESCRIPTIONS):
+                if value > maximum:
+                    yield Result(
+                        self,
+                        "The function '{function}' should be simplified. Its "
+                        '{description} is {value} which exceeds the maximum '
+                        'of {maximum}.'.format(function=cursor.displayname,
+                                               description=description,
+                                               value=value,
+                                               maximum=maximum),
+                        affected_code=(
+                            sourcerange_from_clang_range(cursor.extent),))
@@ -0,0 +1,161 @@
+"""
+Precompiles a prefix header included by every file, so the headers it
+includes are parsed once instead of once per file.
+
+The precompiled header is stored in the coala data directory, along with the
+modification times and sizes of the prefix header and all files it includes.
+It is reused by all files and later runs and built again when one of them
+changed.
+"""
+
+import os
+import uuid
+
+from clang.cindex import (
+    Index, TranslationUnitLoadError, TranslationUnitSaveError)
+
+from coalib.misc.CachingUtilities import get_data_path, pickle_dump, pickle_load
+
+# Maps (header, args, language) tuples to the files and fingerprint of the
+# precompiled header last used by this process, saving to load its info every
+# time.
+_precompiled_headers = {}
+
+# Extensions clang parses as C++ by default
+CPP_EXTENSIONS = {'.C', '.cc', '.cp', '.cpp', '.cxx', '.c++', '.CPP', '.hh',
+                  '.hpp', '.hxx', '.h++', '.ii', '.ixx'}
+
+
+def get_source_language(filename, args=()):
+    """
+    Determines the language clang parses the file in, which a precompiled
+    header has to be built in as well.
+
+    :param filename: The path to the file.
+    :param args:     The arguments the file is parsed with.
+    :return:         The language as given to clang's ``-x`` option, i.e.
+                     ``c`` or ``c++``.
+    """
+    args = list(args)
+    # The last language given applies to the file
+    for index in range(len(args) - 1, -1, -1):
+        if args[index] == '-x' and index + 1 < len(args):
+            return args[index + 1]
+        if args[index].startswith('-x') and len(args[index]) > 2:
+            return args[index][2:]
+    return ('c++' if os.path.splitext(filename)[1] in CPP_EXTENSIONS
+            else 'c')
+
+
+def get_header_fingerprint(filenames):
+    """
+    Retrieves the modification times and sizes of the given files.
+
+    :return: A tuple of tuples of the modification time in nanoseconds and
+             the size, None for files that don't exist anymore.
+    """
+    fingerprint = []
+    for filename in filenames:
+        try:
+            stat = os.stat(filename)
+            fingerprint.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            fingerprint.append(None)
+    return tuple(fingerprint)
+
+
+def build_precompiled_header(header, args, pch_path, language='c'):
+    """
+    Precompiles the header.
+
+    :param header:   The path to the header.
+    :param args:     The arguments the files including it are parsed with.
+    :param pch_path: The path to write the precompiled header to.
+    :param language: The language of the files including it, e.g. ``c++``.
+    :return:         A sorted list of the header and all files it includes.
+    :raises TranslationUnitLoadError: If clang can't parse the header.
+    :raises TranslationUnitSaveError: If the precompiled header can't be
+                                      written.
+    """
+    # Given last, so it overrides a language given for the sources
+    translation_unit = Index.create().parse(
+        header, args=list(args) + ['-x', language + '-header'])
+    # Write atomically, other processes may use the old one meanwhile
+    temporary_path = '{}.{}.tmp'.format(pch_path, uuid.uuid4().hex)
+    try:
+        translation_unit.save(temporary_path)
+        os.replace(temporary_path, pch_path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+
+    return sorted({header} | {inclusion.include.name
+                              for inclusion in translation_unit.get_includes()})
+
+
+def get_precompiled_header(header, args=(), language='c'):
+    """
+    Retrieves a precompiled version of the header, building it if it doesn't
+    exist yet or the header or one of the files it includes changed.
+
+    :param header:   The path to the header.
+    :param args:     The arguments the files including it are parsed with.
+    :param language: The language of the files including it, e.g. ``c++``.
+    :return:         The path to the precompiled header or None if it
+                     couldn't be built.
+    """
+    header = os.path.abspath(header)
+    args = tuple(args)
+    identifier = 'ClangBear_precompiled_header_{}_{}_{}'.format(
+        header, args, language)
+    pch_path = get_data_path(None, identifier)
+    if pch_path is None:
+        return None
+
+    key = (header, args, language)
+    if key in _precompiled_headers:
+        filenames, fingerprint = _precompiled_headers[key]
+    else:
+        filenames, fingerprint = pickle_load(None, identifier + '_info',
+                                             ([], None))
+    if (not filenames or not os.path.isfile(pch_path) or
+            get_header_fingerprint(filenames) != fingerprint):
+        try:
+            filenames = build_precompiled_header(header, list(args),
+                                                 pch_path, language)
+        except (TranslationUnitLoadError, TranslationUnitSaveError):
+            return None
+        fingerprint = get_header_fingerprint(filenames)
+        pickle_dump(None, identifier + '_info', (filenames, fingerprint))
+
+    _precompiled_headers[key] = filenames, fingerprint
+    return pch_path
+
+
+def get_include_header_args(header):
+    """
+    Retrieves the arguments to include the header before every file without
+    precompiling it.
+
+    :param header: The path to the header.
+    :return:       A list of arguments to parse the files with additionally.
+    """
+    return ['-include', os.path.abspath(header)]
+
+
+def get_prefix_header_args(header, args=(), language='c'):
+    """
+    Retrieves the arguments to include the header before every file,
+    precompiled if possible.
+
+    :param header:   The path to the header.
+    :param args:     The arguments the files are parsed with.
+    :param language: The language of the files, e.g. ``c++``, see
+                     ``get_source_language``.
+    :return:         A list of arguments to parse the files with
+                     additionally.
+    """
+    pch_path = get_precompiled_header(header, args, language)
+    if pch_path is None:
+        return get_include_header_args(header)
+    return ['-include-pch', pch_path]
@@ -0,0 +1,96 @@
+"""
+Parses files with clang once per process and shares the translation units
+between all clang based bears.
+
+Translation units are cached by filename, content, arguments and parse
+options, so bears running on the same file with the same ``clang_cli_options``
+get the same translation unit instead of parsing the file again. All files
+are parsed with the same options, a superset of what the bears need.
+
+The clone detection parses files with the include paths of the project or
+the compilation database instead, so its translation units aren't shared
+with the local bears.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+
+from clang.cindex import Index, TranslationUnit
+
+# Translation units hold the whole AST of a file and its includes, only the
+# most recently used ones are kept.
+MAX_CACHED_TRANSLATION_UNITS = 16
+
+PARSE_OPTIONS = TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD
+
+_index = None
+_index_pid = None
+_translation_units = OrderedDict()
+
+
+def _get_index():
+    """
+    Retrieves the index of this process. Processes forked after it was
+    created get their own one along with an empty cache.
+    """
+    global _index, _index_pid
+    if _index is None or _index_pid != os.getpid():
+        _index = Index.create()
+        _index_pid = os.getpid()
+        _translation_units.clear()
+    return _index
+
+
+def _read_file(filename):
+    """
+    Reads the file the way coala does.
+
+    :return: The contents of the file or None if it can't be read.
+    """
+    try:
+        with open(filename, encoding='utf-8') as file:
+            return file.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def get_translation_unit(filename, file=None, args=()):
+    """
+    Retrieves the translation unit of a file, parsing it only if it wasn't
+    parsed with the same contents and arguments before.
+
+    :param filename: The path to the file to parse.
+    :param file:     The lines of the file to parse instead of the contents
+                     on disk, as given to local bears. The file is read from
+                     disk if omitted.
+    :param args:     The arguments to parse the file with.
+    :return:         The ``TranslationUnit`` of the file.
+    :raises TranslationUnitLoadError: If clang can't parse the file.
+    """
+    args = list(args or ())
+    index = _get_index()
+    contents = _read_file(filename) if file is None else ''.join(file)
+    if contents is None:
+        # Let clang report the error, nothing to cache
+        return index.parse(filename, args=args, options=PARSE_OPTIONS)
+
+    key = (filename,
+           hashlib.sha1(contents.encode(errors='surrogateescape')).digest(),
+           tuple(args))
+    translation_unit = _translation_units.get(key)
+    if translation_unit is not None:
+        _translation_units.move_to_end(key)
+        return translation_unit
+
+    # Files read from disk are parsed from disk, clang reads the same
+    # contents then.
+    unsaved_files = [] if file is None else [(filename, contents)]
+    translation_unit = index.parse(filename,
+                                   args=args,
+                                   unsaved_files=unsaved_files,
+                                   options=PARSE_OPTIONS)
+    _translation_units[key] = translation_unit
+    while len(_translation_units) > MAX_CACHED_TRANSLATION_UNITS:
+        _translation_units.popitem(last=False)
+    return translation_unit
@@ -0,0 +1,123 @@
+"""
+Solvers for the linear assignment problem, i.e. finding a matching between
+the rows and the columns of a cost matrix such that the sum of the matched
+fields is minimal.
+
+All solvers take a 2D ``numpy`` array with at least as many columns as rows
+and return a list of ``(row, column)`` tuples sorted by row.
+"""
+
+from collections import OrderedDict
+
+import numpy
+from munkres import Munkres
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # pragma: no cover
+    linear_sum_assignment = None
+
+
+def solve_munkres(cost_matrix):
+    """
+    Solves the assignment problem with the pure Python ``munkres`` package.
+
+    >>> solve_munkres(numpy.array([[4, 1], [2, 3]]))
+    [(0, 1), (1, 0)]
+    """
+    return [(int(row), int(column))
+            for row, column in Munkres().compute(cost_matrix.tolist())]
+
+
+def solve_numpy(cost_matrix):
+    """
+    Solves the assignment problem with the Hungarian method using shortest
+    augmenting paths (as described by Jonker and Volgenant). Every row is
+    added with one path search whose inner loop over all columns is
+    vectorized with ``numpy``.
+
+    >>> solve_numpy(numpy.array([[4, 1], [2, 3]]))
+    [(0, 1), (1, 0)]
+    """
+    rows, columns = cost_matrix.shape
+    assert rows <= columns
+    # Index 0 is a virtual column, the rows are 1 based to be able to use 0
+    # as "unassigned" in ``assigned_rows``.
+    row_potential = numpy.zeros(rows + 1)
+    column_potential = numpy.zeros(columns + 1)
+    assigned_rows = numpy.zeros(columns + 1, dtype=int)
+    previous_columns = numpy.zeros(columns + 1, dtype=int)
+
+    for row in range(1, rows + 1):
+        assigned_rows[0] = row
+        column = 0
+        min_slack = numpy.full(columns + 1, numpy.inf)
+        used = numpy.zeros(columns + 1, dtype=bool)
+        while assigned_rows[column] != 0 or column == 0:
+            used[column] = True
+            current_row = assigned_rows[column]
+            slack = (cost_matrix[current_row - 1] -
+                     row_potential[current_row] - column_potential[1:])
+            free = ~used[1:]
+            improved = free & (slack < min_slack[1:])
+            min_slack[1:][improved] = slack[improved]
+            previous_columns[1:][improved] = column
+
+            free_slack = numpy.where(free, min_slack[1:], numpy.inf)
+            next_column = int(numpy.argmin(free_slack)) + 1
+            delta = free_slack[next_column - 1]
+
+            row_potential[assigned_rows[used]] += delta
+            column_potential[used] -= delta
+            min_slack[1:][free] -= delta
+            column = next_column
+
+        # Flip the augmenting path
+        while column != 0:
+            previous = previous_columns[column]
+            assigned_rows[column] = assigned_rows[previous]
+            column = previous
+
+    return sorted((int(assigned_rows[column]) - 1, column - 1)
+                  for column in range(1, columns + 1)
+                  if assigned_rows[column] != 0)
+
+
+def solve_scipy(cost_matrix):
+    """
+    Solves the assignment problem with ``scipy.optimize``.
+    """
+    return [(int(row), int(column))
+            for row, column in zip(*linear_sum_assignment(cost_matrix))]
+
+
+ASSIGNMENT_SOLVERS = OrderedDict((('scipy', solve_scipy),
+                                  ('numpy', solve_numpy),
+                                  ('munkres', solve_munkres)))
+
+
+def get_assignment_solver(name='auto'):
+    """
+    Retrieves an assignment solver.
+
+    >>> get_assignment_solver('numpy').__name__
+    'solve_numpy'
+
+    :param name: The name of the solver, one of ``scipy``, ``numpy`` and
+                 ``munkres``. ``auto`` chooses ``scipy`` if it is installed
+                 and ``numpy`` otherwise.
+    :return:     The solver function.
+    :raises ValueError: If there is no solver with this name or SciPy is
+                        requested but not installed.
+    """
+    name = name.lower()
+    if name == 'auto':
+        name = 'scipy' if linear_sum_assignment is not None else 'numpy'
+    if name not in ASSIGNMENT_SOLVERS:
+        raise ValueError('Unknown assignment solver {!r}, possible values '
+                         'are: auto, {}.'.format(
+                             name, ', '.join(ASSIGNMENT_SOLVERS)))
+    if name == 'scipy' and linear_sum_assignment is None:  # pragma: no cover
+        raise ValueError('The scipy assignment solver needs SciPy to be '
+                         'installed.')
+    return ASSIGNMENT_SOLVERS[name]
@@ -1,7 +1,7 @@
-from clang.cindex import Index, TranslationUnit
-
 from bears.c_languages.ClangBear import clang_available, ClangBear
+from bears.c_languages.ClangTranslationUnitCache import get_translation_unit
 from coalib.bears.GlobalBear import GlobalBear
+from coalib.settings.Setting import typed_list
 
 
 class ClangASTPrintBear(GlobalBear):
@@ -51,15 +51,17 @@ class ClangASTPrintBear(GlobalBear):
                             before + len(spec_before)*' ',
                             '`')
 
-    def run(self):
+    def run(self, clang_cli_options: typed_list(str) = None):
         """
         This bear is meant for debugging purposes relating to clang. It just
         prints out the whole AST for a file to the DEBUG channel.
+
+        :param clang_cli_options: Any options that will be passed through to
+                                  Clang.
         """
         for filename, file in sorted(self.file_dict.items()):
-            root = Index.create().parse(
-                filename,
-                options=TranslationUnit.PARSE_DETAILED_PROCESSING_RECORD
-                ).cursor
+            root = get_translation_unit(filename,
+                                        file,
+                                        clang_cli_options).cursor
 
             self.print_node(root, filename)
@@ -1,6 +1,6 @@
 from bears.c_languages.ClangBear import clang_available, ClangBear
 from bears.c_languages.codeclone_detection.ClangFunctionDifferenceBear import (
-    ClangFunctionDifferenceBear)
+    ClangFunctionDifferenceBear, DEFAULT_MAX_CLONE_DIFFERENCE)
 from coalib.bears.GlobalBear import GlobalBear
 from coalib.results.Result import Result
 from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
@@ -15,7 +15,8 @@ class ClangCloneDetectionBear(GlobalBear):
 
     def run(self,
             dependency_results: dict,
-            max_clone_difference: float = 0.185,
+            max_clone_difference: float = DEFAULT_MAX_CLONE_DIFFERENCE,
+            debug_count_matrices: bool = False,
             ):
         '''
         Checks the given code for similar functions that are probably
@@ -23,6 +24,9 @@ class ClangCloneDetectionBear(GlobalBear):
 
         :param max_clone_difference: The maximum difference a clone should
                                      have.
+        :param debug_count_matrices: Set to true to attach the count matrices
+                                     of both functions to the debug message
+                                     of every result.
         '''
         dependency_result = dependency_results[
             ClangFunctionDifferenceBear.__name__][0]
@@ -44,5 +48,6 @@ class ClangCloneDetectionBear(GlobalBear):
                     file=function_1[0],
                     severity=RESULT_SEVERITY.MAJOR,
                     line=function_1[1],
-                    debug_msg=[count_matrices[function_1],
-                               count_matrices[function_2]])
+                    debug_msg=([count_matrices[function_1],
+                                count_matrices[function_2]]
+                               if debug_count_matrices else ''))
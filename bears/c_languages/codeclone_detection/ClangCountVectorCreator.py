@@ -1,7 +1,9 @@
-from clang.cindex import Cursor, Index
+from clang.cindex import Cursor
 
+from bears.c_languages.ClangTranslationUnitCache import get_translation_unit
 from bears.c_languages.codeclone_detection.ClangCountingConditions import (
-    get_identifier_name, is_function_declaration, is_literal, is_reference)
+    CursorStack, get_identifier_name, is_function_declaration, is_literal,
+    is_reference)
 from bears.c_languages.codeclone_detection.CountVector import CountVector
 
 
@@ -13,9 +15,9 @@ class ClangCountVectorCreator:
 
       condition(stack)
 
-    While stack is a stack (i.e. list) holding a tuple holding the parent
-    cursors and the child number. (E.g. if a cursor is the third child of
-    its parent its child number is two, counted from zero.)
+    While stack is a CursorStack (i.e. a list) holding a tuple holding the
+    parent cursors and the child number. (E.g. if a cursor is the third child
+    of its parent its child number is two, counted from zero.)
 
     The ClangCountVectorCreator will only count variables local to each
     function.
@@ -37,7 +39,7 @@ class ClangCountVectorCreator:
         self.conditions = conditions
         self.weightings = weightings
         self.count_vectors = {}
-        self.stack = []
+        self.stack = CursorStack()
 
     def count_identifier(self, identifier, category):
         if identifier not in self.count_vectors:
@@ -46,21 +48,11 @@ class ClangCountVectorCreator:
 
         self.count_vectors[identifier].count_reference(self.stack)
 
-    def _get_vector_for_function(self, cursor, child_num=0):
+    def _count_cursor(self, cursor, child_num):
         """
-        Creates a CountVector object for the given cursor.
-
-        Note: this function uses self.count_vectors for storing its results.
-        This is done knowingly because passing back and forth mutable objects
-        is not nice and yields in bigger complexity IMHO.
-
-        This function creates a CountVector object for all variables found in
-        self.local_vars and in the tree elements below the given one, stores it
-        in self.count_vectors.
-
-        :param cursor: Clang cursor to iterate over.
+        Pushes the cursor on the stack and counts it if it is a reference or
+        a literal.
         """
-        assert isinstance(cursor, Cursor)
         self.stack.append((cursor, child_num))
 
         if is_reference(cursor):
@@ -72,10 +64,35 @@ class ClangCountVectorCreator:
                 self.count_identifier(tokens[0].spelling,
                                       CountVector.Category.literal)
 
-        for i, child in enumerate(cursor.get_children()):
-            self._get_vector_for_function(child, i)
+    def _get_vector_for_function(self, cursor):
+        """
+        Creates a CountVector object for the given cursor.
+
+        Note: this function uses self.count_vectors for storing its results.
+        This is done knowingly because passing back and forth mutable objects
+        is not nice and yields in bigger complexity IMHO.
+
+        This function creates a CountVector object for all variables found in
+        self.local_vars and in the tree elements below the given one, stores it
+        in self.count_vectors.
+
+        The tree is traversed depth first without recursion so deeply nested
+        code doesn't exceed the recursion limit.
 
-        self.stack.pop()
+        :param cursor: Clang cursor to iterate over.
+        """
+        assert isinstance(cursor, Cursor)
+        self._count_cursor(cursor, 0)
+        children = [enumerate(cursor.get_children())]
+
+        while children:
+            for child_num, child in children[-1]:
+                self._count_cursor(child, child_num)
+                children.append(enumerate(child.get_children()))
+                break
+            else:
+                children.pop()
+                self.stack.pop()
 
     def _get_vectors_for_cursor(self, cursor, filename):
         """
@@ -99,7 +116,7 @@ class ClangCountVectorCreator:
                        get_identifier_name(cursor)): self.count_vectors}
             # Reset local states
             self.count_vectors = {}
-            self.stack = []
+            self.stack = CursorStack()
         else:
             result = {}
             for child in cursor.get_children():
@@ -118,7 +135,34 @@ class ClangCountVectorCreator:
         :return:         The dictionary holding CountVectors for all variables
                          in all functions.
         """
-        args = ['-I'+path for path in include_paths]
-        root = Index.create().parse(filename, args=args).cursor
+        return self.get_vectors_and_includes_for_file(filename,
+                                                      include_paths)[0]
 
-        return self._get_vectors_for_cursor(root, filename)
+    def get_vectors_and_includes_for_file(self,
+                                          filename,
+                                          include_paths=(),
+                                          args=()):
+        """
+        Like ``get_vectors_for_file`` but also retrieves the files included
+        by the given file, directly or indirectly.
+
+        The file is parsed from disk with the given include paths, so the
+        translation unit is only shared with bears parsing it with the same
+        arguments.
+
+        :param filename:      The path to the file to parse.
+        :param include_paths: The include paths to parse the file with.
+        :param args:          Further arguments to parse the file with.
+        :return:              A tuple of the dictionary holding CountVectors
+                              for all variables in all functions and a sorted
+                              list of the paths of the included files.
+        """
+        args = ['-I'+path for path in include_paths] + list(args)
+        translation_unit = get_translation_unit(filename, args=args)
+        included_files = sorted({inclusion.include.name
+                                 for inclusion
+                                 in translation_unit.get_includes()})
+
+        return (self._get_vectors_for_cursor(translation_unit.cursor,
+                                             filename),
+                included_files)
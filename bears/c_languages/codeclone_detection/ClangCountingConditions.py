@@ -4,6 +4,7 @@ clone detection. (See http://goo.gl/8UuAW5 for general information about the
 algorithm.)
 """
 
+from collections import Counter
 
 from clang.cindex import CursorKind
 
@@ -62,16 +63,12 @@ def _stack_contains_kind(stack, kind):
     """
     Checks if a cursor with the given kind is within the stack.
 
-    :param stack: The stack holding a tuple holding the parent cursors and the
-                  child number.
+    :param stack: The CursorStack holding a tuple holding the parent cursors
+                  and the child number.
     :param kind:  The kind of the cursor to search for.
     :return:      True if the kind was found.
     """
-    for elem, _ in stack:
-        if elem.kind == kind:
-            return True
-
-    return False
+    return stack.kinds[kind] != 0
 
 
 def _is_nth_child_of_kind(stack, allowed_nums, kind):
@@ -80,24 +77,14 @@ def _is_nth_child_of_kind(stack, allowed_nums, kind):
     stack also has a child of this element which number is in the allowed_nums
     list.
 
-    :param stack:        The stack holding a tuple holding the parent cursors
-                         and the child number.
+    :param stack:        The CursorStack holding a tuple holding the parent
+                         cursors and the child number.
     :param allowed_nums: List/iterator of child numbers allowed.
     :param kind:         The kind of the parent element.
     :return:             Number of matches.
     """
-    is_kind_child = False
-    count = 0
-    for elem, child_num in stack:
-        if is_kind_child and child_num in allowed_nums:
-            count += 1
-
-        if elem.kind == kind:
-            is_kind_child = True
-        else:
-            is_kind_child = False
-
-    return count
+    return sum(stack.children[(kind, child_num)]
+               for child_num in allowed_nums)
 
 
 def is_function(stack):
@@ -161,25 +148,6 @@ def _get_position_in_for_tokens(tokens, position):
     return FOR_POSITION.UNKNOWN  # pragma: no cover
 
 
-def _get_positions_in_for_loop(stack):
-    """
-    Investigates all FOR_STMT objects in the stack and checks for each in
-    what position the given cursor is.
-
-    :param cursor: The cursor to investigate.
-    :param stack:  The stack of parental cursors.
-    :return:       A list of semantic FOR_POSITION's within for loops.
-    """
-    results = []
-    for elem, _ in stack:
-        if elem.kind == CursorKind.FOR_STMT:
-            results.append(_get_position_in_for_tokens(
-                elem.get_tokens(),
-                (stack[-1][0].location.line, stack[-1][0].location.column)))
-
-    return results
-
-
 def _get_binop_operator(cursor):
     """
     Returns the operator token of a binary operator cursor.
@@ -188,6 +156,11 @@ def _get_binop_operator(cursor):
     :return:       The token object containing the actual operator or None.
     """
     children = list(cursor.get_children())
+    # Not known how to reproduce but may be possible when evil macros join
+    # the game.
+    if len(children) < 2:  # pragma: no cover
+        return None
+
     operator_min_begin = (children[0].location.line,
                           children[0].location.column)
     operator_max_end = (children[1].location.line,
@@ -203,28 +176,21 @@ def _get_binop_operator(cursor):
     return None  # pragma: no cover
 
 
+def _is_binop(cursor):
+    return cursor.kind in [CursorKind.BINARY_OPERATOR,
+                           CursorKind.COMPOUND_ASSIGNMENT_OPERATOR]
+
+
 def _stack_contains_operators(stack, operators):
     """
     Checks if one of the given operators is within the stack.
 
-    :param stack:     The stack holding a tuple holding the parent cursors
-                      and the child number.
+    :param stack:     The CursorStack holding a tuple holding the parent
+                      cursors and the child number.
     :param operators: A list of strings. E.g. ["+", "-"]
     :return:          True if the operator was found.
     """
-    for elem, _ in stack:
-        if elem.kind in [CursorKind.BINARY_OPERATOR,
-                         CursorKind.COMPOUND_ASSIGNMENT_OPERATOR]:
-            operator = _get_binop_operator(elem)
-            # Not known how to reproduce but may be possible when evil macros
-            # join the game.
-            if operator is None:  # pragma: no cover
-                continue
-
-            if operator.spelling in operators:
-                return True
-
-    return False
+    return any(stack.operators[operator] != 0 for operator in operators)
 
 
 ARITH_BINARY_OPERATORS = ['+', '-', '*', '/', '%', '&', '|']
@@ -233,6 +199,98 @@ ADV_ASSIGNMENT_OPERATORS = [op + '=' for op in ARITH_BINARY_OPERATORS]
 ASSIGNMENT_OPERATORS = ['='] + ADV_ASSIGNMENT_OPERATORS
 
 
+class CursorStack(list):
+    """
+    The stack of the cursors from a function declaration down to the current
+    cursor that is passed to the counting conditions, holding tuples of a
+    cursor and its child number.
+
+    Everything the counting conditions need to know about the parents of the
+    current cursor is updated when a cursor is pushed or popped, so the
+    conditions don't need to search the stack:
+
+    - ``kinds`` counts the cursor kinds in the stack.
+    - ``children`` counts the (parent kind, child number) pairs of the
+      cursors in the stack.
+    - ``for_positions`` counts the ``FOR_POSITION``s of the cursors in the
+      stack relative to their parent for loop.
+    - ``operators`` counts the operators of binary operators in the stack.
+    - ``inc_or_dec`` counts the in- and decrements in the stack.
+    - ``assignments`` holds a tuple for every cursor in the stack describing
+      the assignment operator tokens within the cursor or its parents: the
+      maximal start position, the minimal end position of the ``=`` tokens
+      and the number of compound assignment tokens.
+    """
+
+    def __init__(self):
+        list.__init__(self)
+        self.kinds = Counter()
+        self.children = Counter()
+        self.for_positions = Counter()
+        self.operators = Counter()
+        self.inc_or_dec = 0
+        self.assignments = []
+        self._pushed = []
+
+    def append(self, elem):
+        cursor, child_num = elem
+        parent = self[-1][0] if self else None
+        kind = cursor.kind
+
+        child = None
+        for_position = None
+        if parent is not None:
+            child = (parent.kind, child_num)
+            if child[0] == CursorKind.FOR_STMT:
+                for_position = _get_position_in_for_tokens(
+                    parent.get_tokens(),
+                    (cursor.location.line, cursor.location.column))
+
+        operator = None
+        inc_or_dec = False
+        max_start, min_end, compound = (self.assignments[-1]
+                                        if self.assignments
+                                        else (None, None, 0))
+        if _is_binop(cursor):
+            token = _get_binop_operator(cursor)
+            # Not known how to reproduce but may be possible when evil macros
+            # join the game.
+            operator = token.spelling if token is not None else None
+            for token in cursor.get_tokens():
+                if token.spelling not in ASSIGNMENT_OPERATORS:
+                    continue
+                start = (token.extent.start.line, token.extent.start.column)
+                end = (token.extent.end.line, token.extent.end.column)
+                max_start = start if max_start is None else max(max_start,
+                                                                start)
+                if token.spelling == '=':
+                    min_end = end if min_end is None else min(min_end, end)
+                else:
+                    compound += 1
+        elif kind == CursorKind.UNARY_OPERATOR:
+            inc_or_dec = any(token.spelling in ['--', '++']
+                             for token in cursor.get_tokens())
+
+        self.kinds[kind] += 1
+        self.children[child] += 1
+        self.for_positions[for_position] += 1
+        self.operators[operator] += 1
+        self.inc_or_dec += inc_or_dec
+        self.assignments.append((max_start, min_end, compound))
+        self._pushed.append((kind, child, for_position, operator, inc_or_dec))
+        list.append(self, elem)
+
+    def pop(self):
+        kind, child, for_position, operator, inc_or_dec = self._pushed.pop()
+        self.kinds[kind] -= 1
+        self.children[child] -= 1
+        self.for_positions[for_position] -= 1
+        self.operators[operator] -= 1
+        self.inc_or_dec -= inc_or_dec
+        self.assignments.pop()
+        return list.pop(self)
+
+
 def in_sum(stack):
     """
     A counting condition returning true if the variable is used in a sum
@@ -287,13 +345,7 @@ def is_inc_or_dec(stack):
     """
     Returns true if the cursor on top is inc- or decremented.
     """
-    for elem, _ in stack:
-        if elem.kind == CursorKind.UNARY_OPERATOR:
-            for token in elem.get_tokens():
-                if token.spelling in ['--', '++']:
-                    return True
-
-    return False
+    return stack.inc_or_dec != 0
 
 
 def is_condition(stack):
@@ -304,7 +356,7 @@ def is_condition(stack):
             _is_nth_child_of_kind(stack, [0], CursorKind.IF_STMT) != 0 or
             _is_nth_child_of_kind(stack, [0], CursorKind.SWITCH_STMT) != 0 or
             _is_nth_child_of_kind(stack, [0], CursorKind.CASE_STMT) != 0 or
-            FOR_POSITION.COND in _get_positions_in_for_loop(stack))
+            stack.for_positions[FOR_POSITION.COND] != 0)
 
 
 def in_condition(stack):
@@ -338,18 +390,10 @@ def is_assignee(stack):
     Returns true if the cursor on top is assigned something.
     """
     cursor_pos = (stack[-1][0].extent.end.line, stack[-1][0].extent.end.column)
-    for elem, _ in stack:
-        if (
-                elem.kind == CursorKind.BINARY_OPERATOR or
-                elem.kind == CursorKind.COMPOUND_ASSIGNMENT_OPERATOR):
-            for token in elem.get_tokens():
-                token_pos = (token.extent.start.line,
-                             token.extent.start.column)
-                # This needs to be an assignment and cursor has to be on LHS
-                if (
-                        token.spelling in ASSIGNMENT_OPERATORS and
-                        cursor_pos <= token_pos):
-                    return True
+    max_start, _, _ = stack.assignments[-1]
+    # This needs to be an assignment and cursor has to be on LHS
+    if max_start is not None and cursor_pos <= max_start:
+        return True
 
     return is_inc_or_dec(stack)
 
@@ -360,19 +404,12 @@ def is_assigner(stack):
     """
     cursor_pos = (stack[-1][0].extent.start.line,
                   stack[-1][0].extent.start.column)
-    for elem, _ in stack:
-        if (
-                elem.kind == CursorKind.BINARY_OPERATOR or
-                elem.kind == CursorKind.COMPOUND_ASSIGNMENT_OPERATOR):
-            for token in elem.get_tokens():
-                token_pos = (token.extent.end.line, token.extent.end.column)
-                # This needs to be an assignment and cursor has to be on RHS
-                # or if we have something like += its irrelevant on which side
-                # it is because += reads on both sides
-                if (token.spelling in ASSIGNMENT_OPERATORS and (
-                        token_pos <= cursor_pos or
-                        token.spelling != '=')):
-                    return True
+    _, min_end, compound = stack.assignments[-1]
+    # This needs to be an assignment and cursor has to be on RHS or if we
+    # have something like += its irrelevant on which side it is because +=
+    # reads on both sides
+    if compound != 0 or (min_end is not None and min_end <= cursor_pos):
+        return True
 
     return is_inc_or_dec(stack)
 
@@ -384,9 +421,8 @@ def _loop_level(stack):
     :param stack: A stack of clang cursors.
     :return:      An integer representing the level of nested loops.
     """
-    positions_in_for = _get_positions_in_for_loop(stack)
-    return (positions_in_for.count(FOR_POSITION.INC) +
-            positions_in_for.count(FOR_POSITION.BODY) +
+    return (stack.for_positions[FOR_POSITION.INC] +
+            stack.for_positions[FOR_POSITION.BODY] +
             _is_nth_child_of_kind(stack, [1], CursorKind.WHILE_STMT))
 
 
@@ -1,19 +1,32 @@
 import functools
-from itertools import combinations
+import os
 
 from bears.c_languages.ClangBear import clang_available, ClangBear
+from bears.c_languages.codeclone_detection.AssignmentSolvers import (
+    get_assignment_solver)
 from bears.c_languages.codeclone_detection.ClangCountingConditions import (
     condition_dict)
 from bears.c_languages.codeclone_detection.ClangCountVectorCreator import (
     ClangCountVectorCreator)
 from bears.c_languages.codeclone_detection.CloneDetectionRoutines import (
-    compare_functions, get_count_matrices)
+    get_candidate_pairs, get_count_array, get_count_matrices, get_differences,
+    get_function_pair_difference)
+from bears.c_languages.codeclone_detection.CompileCommands import (
+    COMPILE_COMMANDS_FILENAME, load_compile_commands)
+from bears.c_languages.codeclone_detection.CountMatrixCache import (
+    CountMatrixCache)
+from bears.c_languages.codeclone_detection.DifferenceCache import (
+    DifferenceCache)
+from bears.c_languages.codeclone_detection.DifferenceList import (
+    DifferenceList)
+from bears.c_languages.codeclone_detection.ShardedComparison import (
+    evaluate_sharded)
 from coala_utils.string_processing.StringConverter import StringConverter
 from coalib.bears.GlobalBear import GlobalBear
 from dependency_management.requirements.PipRequirement import PipRequirement
 from coalib.collecting.Collectors import collect_dirs
 from coalib.results.HiddenResult import HiddenResult
-from coalib.settings.Setting import path_list, typed_ordered_dict
+from coalib.settings.Setting import path, path_list, typed_ordered_dict
 from coala_utils.decorators import (enforce_signature, generate_ordering,
                                     generate_repr)
 
@@ -47,6 +60,8 @@ in_product: 0,
 in_binary_operation,
 member_accessed"""))
 
+DEFAULT_MAX_CLONE_DIFFERENCE = 0.185
+
 
 @generate_repr(('id', hex),
                'origin',
@@ -61,7 +76,7 @@ class ClangFunctionDifferenceResult(HiddenResult):
 
     @enforce_signature
     def __init__(self, origin,
-                 differences: list,
+                 differences: (list, DifferenceList),
                  count_matrices: dict):
         super().__init__(origin,
                          [differences, count_matrices])
@@ -69,45 +84,41 @@ class ClangFunctionDifferenceResult(HiddenResult):
         self.count_matrices = count_matrices
 
 
-def get_difference(function_pair,
-                   count_matrices,
-                   average_calculation,
-                   poly_postprocessing,
-                   exp_postprocessing):
-    """
-    Retrieves the difference between two functions using the munkres algorithm.
-
-    :param function_pair:       A tuple containing both indices for the
-                                count_matrices dictionary.
-    :param count_matrices:      A dictionary holding CMs.
-    :param average_calculation: If set to true the difference calculation
-                                function will take the average of all variable
-                                differences as the difference, else it will
-                                normalize the function as a whole and thus
-                                weighting in variables dependent on their size.
-    :param poly_postprocessing: If set to true, the difference value of big
-                                function pairs will be reduced using a
-                                polynomial approach.
-    :param exp_postprocessing:  If set to true, the difference value of big
-                                function pairs will be reduced using an
-                                exponential approach.
-    :return:                    A tuple containing both function ids and their
-                                difference.
-    """
-    function_1, function_2 = function_pair
-    return (function_1,
-            function_2,
-            compare_functions(count_matrices[function_1],
-                              count_matrices[function_2],
-                              average_calculation,
-                              poly_postprocessing,
-                              exp_postprocessing))
-
-
 class ClangFunctionDifferenceBear(GlobalBear):
     check_prerequisites = classmethod(clang_available)
     LANGUAGES = ClangBear.LANGUAGES
-    REQUIREMENTS = ClangBear.REQUIREMENTS | {PipRequirement('munkres3', '1.0')}
+    REQUIREMENTS = ClangBear.REQUIREMENTS | {PipRequirement('munkres3', '1.0'),
+                                             PipRequirement('numpy', '1.13')}
+
+    def get_compile_commands(self, compile_commands_path):
+        """
+        Loads the compilation database.
+
+        :param compile_commands_path: The configured path to the compilation
+                                      database, it is searched next to the
+                                      coafile if empty.
+        :return:                      A dict mapping filenames to clang
+                                      arguments or None if there is no valid
+                                      compilation database.
+        """
+        if not compile_commands_path:
+            compile_commands_path = os.path.join(
+                os.path.dirname(self.section['files'].origin),
+                COMPILE_COMMANDS_FILENAME)
+            if not os.path.isfile(compile_commands_path):
+                return None
+
+        try:
+            compile_commands = load_compile_commands(compile_commands_path)
+        except (OSError, ValueError) as exception:
+            self.warn('The compilation database {} could not be loaded, '
+                      'using all directories of the project as include '
+                      'paths: {}'.format(compile_commands_path, exception))
+            return None
+
+        self.debug('Using the compile commands of {} files from {}.'.format(
+            len(compile_commands), compile_commands_path))
+        return compile_commands
 
     def run(self,
             counting_conditions: counting_condition_dict = default_cc_dict,
@@ -115,6 +126,17 @@ class ClangFunctionDifferenceBear(GlobalBear):
             poly_postprocessing: bool = True,
             exp_postprocessing: bool = False,
             extra_include_paths: path_list = (),
+            max_clone_difference: float = DEFAULT_MAX_CLONE_DIFFERENCE,
+            assignment_solver: str = 'auto',
+            comparison_processes: int = 1,
+            parsing_processes: int = 1,
+            cache_count_matrices: bool = False,
+            cache_differences: bool = False,
+            compile_commands: path = '',
+            max_stored_difference: float = None,
+            shard_directory: path = '',
+            shard_count: int = 1,
+            shard_timeout: float = 60,
             ):
         """
         Retrieves similarities for code clone detection. Those can be reused in
@@ -153,38 +175,170 @@ class ClangFunctionDifferenceBear(GlobalBear):
         :param exp_postprocessing:  If set to true, the difference value of big
                                     function pairs will be reduced using an
                                     exponential approach.
+        :param max_clone_difference:
+            The maximum difference a clone should have. Function pairs that
+            can't have a lower difference are skipped or not compared
+            exactly, a lower bound of their difference is reported for the
+            latter.
+        :param assignment_solver:
+            The algorithm matching the variables of two functions. Possible
+            values are: scipy, numpy, munkres. Defaults to scipy if it is
+            installed and numpy otherwise.
+        :param comparison_processes:
+            The number of processes comparing function pairs in parallel, 0
+            to use one per CPU. Few pairs are always compared in this
+            process.
+        :param parsing_processes:
+            The number of processes parsing files in parallel, 0 to use one
+            per CPU.
+        :param cache_count_matrices:
+            Set to true to store the count matrices of all files on disk and
+            parse only files changed since the last run, i.e. files whose
+            contents, included headers or include paths changed.
+        :param cache_differences:
+            Set to true to store the differences of all compared function
+            pairs on disk and compare only pairs involving a function whose
+            count matrix changed since the last run.
+        :param compile_commands:
+            The path to a compilation database (``compile_commands.json``) or
+            the directory containing it. Files in it are parsed with the
+            include paths and definitions they are compiled with, all
+            directories of the project are used as include paths for the
+            others. Defaults to the ``compile_commands.json`` next to the
+            coafile if there is one.
+        :param max_stored_difference:
+            Only function pairs with at most this difference are passed to
+            other bears, e.g. ``max_clone_difference``. All pairs are passed
+            if not set. The count matrices of functions without any such
+            pair are dropped as well.
+        :param shard_directory:
+            A directory shared with workers on other machines. If set, the
+            function pairs are partitioned into ``shard_count`` shards
+            evaluated by this bear and the workers, started with ``python3
+            -m bears.c_languages.codeclone_detection.ShardedComparison
+            <directory>``. The workers and this bear load pickled jobs and
+            results from the directory, so anyone who can write to it can
+            run arbitrary code on all of them. Only use a directory that
+            nobody but trusted users can write to.
+        :param shard_count:
+            The number of shards the function pairs are partitioned into.
+        :param shard_timeout:
+            Seconds a worker may not refresh its claim of a shard, which it
+            does every 10 seconds, before the shard is evaluated in this
+            process.
         """
         self.debug('Using the following counting conditions:')
         for key, val in counting_conditions.items():
             self.debug(' *', key.__name__, '(weighting: {})'.format(val))
 
+        solver = get_assignment_solver(assignment_solver)
+
+        compile_commands = self.get_compile_commands(compile_commands)
+
         self.debug('Creating count matrices...')
+        conditions = list(counting_conditions.keys())
+        weightings = list(counting_conditions.values())
+        count_matrix_cache = (
+            CountMatrixCache(self.section['files'].origin,
+                             conditions,
+                             weightings)
+            if cache_count_matrices else None)
         count_matrices = get_count_matrices(
-            ClangCountVectorCreator(list(counting_conditions.keys()),
-                                    list(counting_conditions.values())),
+            ClangCountVectorCreator(conditions, weightings),
             list(self.file_dict.keys()),
             lambda prog: self.debug('{:2.4f}%...'.format(prog)),
             self.section['files'].origin,
-            collect_dirs(extra_include_paths))
+            collect_dirs(extra_include_paths),
+            parsing_processes or os.cpu_count() or 1,
+            lambda filename, seconds: self.debug(
+                'Parsed {} in {:.3f}s.'.format(filename, seconds)),
+            count_matrix_cache,
+            compile_commands)
+        if count_matrix_cache is not None:
+            self.debug('Took the count matrices of {} of {} files from the '
+                       'cache.'.format(count_matrix_cache.hits,
+                                       len(self.file_dict)))
+            count_matrix_cache.save()
 
         self.debug('Calculating differences...')
 
-        differences = []
         function_count = len(count_matrices)
         # Thats n over 2, hardcoded to simplify calculation
         combination_length = function_count * (function_count-1) / 2
+        # Convert every count matrix only once instead of for every pair
+        count_arrays = {function: get_count_array(count_matrix)
+                        for function, count_matrix in count_matrices.items()}
+        function_pairs = get_candidate_pairs(count_arrays,
+                                             max_clone_difference,
+                                             average_calculation,
+                                             poly_postprocessing,
+                                             exp_postprocessing)
+        self.debug('Comparing {} of {:.0f} function pairs, the others can\'t '
+                   'be clones.'.format(len(function_pairs),
+                                       combination_length))
+
+        difference_cache = (DifferenceCache(self.section['files'].origin,
+                                            (average_calculation,
+                                             poly_postprocessing,
+                                             exp_postprocessing,
+                                             max_clone_difference,
+                                             solver.__name__))
+                            if cache_differences else None)
+        known_differences = ({} if difference_cache is None
+                             else difference_cache.get(function_pairs,
+                                                       count_arrays))
+        new_pairs = [pair for pair in function_pairs
+                     if pair not in known_differences]
+        self.debug('Took the differences of {} function pairs from the '
+                   'cache.'.format(len(known_differences)))
+
         partial_get_difference = functools.partial(
-            get_difference,
-            count_matrices=count_matrices,
+            get_function_pair_difference,
+            count_matrices=count_arrays,
             average_calculation=average_calculation,
             poly_postprocessing=poly_postprocessing,
-            exp_postprocessing=exp_postprocessing)
-
-        for i, elem in enumerate(
-                map(partial_get_difference,
-                    [(f1, f2) for f1, f2 in combinations(count_matrices, 2)])):
-            if i % 50 == 0:
-                self.debug('{:2.4f}%...'.format(100*i/combination_length))
-            differences.append(elem)
+            exp_postprocessing=exp_postprocessing,
+            max_difference=max_clone_difference,
+            assignment_solver=solver)
+
+        processes = comparison_processes or os.cpu_count() or 1
+        if shard_directory and shard_count > 1:
+            self.debug('Comparing the function pairs in {} shards in {}.'
+                       .format(shard_count, shard_directory))
+            computed_differences = iter(evaluate_sharded(
+                shard_directory,
+                new_pairs,
+                partial_get_difference,
+                shard_count,
+                processes,
+                shard_timeout))
+        else:
+            computed_differences = get_differences(new_pairs,
+                                                   partial_get_difference,
+                                                   processes)
+        differences = DifferenceList(max_difference=max_stored_difference)
+        cached_differences = []
+        computed = 0
+        for function_pair in function_pairs:
+            difference = known_differences.get(function_pair)
+            if difference is None:
+                if computed % 50 == 0:
+                    self.debug('{:2.4f}%...'.format(
+                        100*computed/len(new_pairs)))
+                _, _, difference = next(computed_differences)
+                computed += 1
+
+            differences.append(function_pair + (difference,))
+            if difference_cache is not None:
+                cached_differences.append(function_pair + (difference,))
+
+        if difference_cache is not None:
+            difference_cache.save(cached_differences, count_arrays)
+
+        if max_stored_difference is not None:
+            self.debug('Keeping the differences of {} of {} function pairs.'
+                       .format(len(differences), len(function_pairs)))
+            count_matrices = {function: count_matrices[function]
+                              for function in differences.functions}
 
         yield ClangFunctionDifferenceResult(self, differences, count_matrices)
@@ -1,15 +1,18 @@
-import copy
+import functools
 import math
+import multiprocessing
 import os
+import time
+from itertools import combinations
 
-from munkres import Munkres
+import numpy
 
-from coalib.collecting.Collectors import collect_dirs
+from bears.c_languages.codeclone_detection.AssignmentSolvers import (
+    get_assignment_solver)
+from bears.c_languages.codeclone_detection.CompileCommands import (
+    get_project_include_paths)
 from bears.c_languages.codeclone_detection.CountVector import CountVector
 
-# Instantiate globally since this class is holding stateless public methods.
-munkres = Munkres()
-
 
 def exclude_function(count_matrix):
     """
@@ -36,22 +39,208 @@ def exclude_function(count_matrix):
             var_count < 2)
 
 
+def use_process_pool(processes, tasks):
+    """
+    Determines whether tasks should be distributed to a pool of worker
+    processes.
+
+    :param processes: The number of worker processes configured.
+    :param tasks:     The number of tasks.
+    :return:          True if there is more than one process and task and
+                      this process is allowed to start worker processes.
+                      Daemonic processes, like the workers of coala itself
+                      may be, can't.
+    """
+    return (processes > 1 and tasks > 1 and
+            not multiprocessing.current_process().daemon)
+
+
+# The function calculating the difference of a function pair in a worker
+# process of ``get_differences``.
+_difference_function = None
+
+
+def _init_difference_worker(difference_function):
+    global _difference_function
+    _difference_function = difference_function
+
+
+def _get_chunk_differences(function_pairs):
+    return [_difference_function(pair) for pair in function_pairs]
+
+
+def get_differences(function_pairs,
+                    difference_function,
+                    processes=1,
+                    chunk_size=500):
+    """
+    Calculates the differences of the given function pairs, in a pool of
+    worker processes if there is more than one chunk of pairs.
+
+    The difference function, including the count matrices it holds, is
+    passed to every worker once when it is started, with the ``fork`` start
+    method it is even shared copy-on-write. Only the function pairs are sent
+    with the tasks.
+
+    :param function_pairs:      A list of function pairs.
+    :param difference_function: A picklable function taking a function pair
+                                and returning a tuple of both functions and
+                                their difference, e.g. a partial of
+                                ``get_function_pair_difference``.
+    :param processes:           The maximum number of worker processes.
+    :param chunk_size:          The number of pairs compared per task.
+    :return:                    An iterator over the results of the
+                                difference function, in the order of the
+                                function pairs.
+    """
+    chunks = [function_pairs[i:i+chunk_size]
+              for i in range(0, len(function_pairs), chunk_size)]
+
+    if not use_process_pool(processes, len(chunks)):
+        yield from map(difference_function, function_pairs)
+        return
+
+    with multiprocessing.Pool(min(processes, len(chunks)),
+                              _init_difference_worker,
+                              (difference_function,)) as pool:
+        for chunk in pool.imap(_get_chunk_differences, chunks):
+            yield from chunk
+
+
+def pack_count_matrix(count_matrix):
+    """
+    Converts a count matrix into a compact form holding only plain values,
+    without the counting conditions, for sending or storing it.
+
+    :param count_matrix: A dictionary with count vectors representing all
+                         variables for a function.
+    :return:             A tuple of lists holding the names, categories,
+                         count vectors and unweighted count vectors of all
+                         variables.
+    """
+    count_vectors = list(count_matrix.values())
+    return ([cv.name for cv in count_vectors],
+            [cv.category for cv in count_vectors],
+            [list(cv.count_vector) for cv in count_vectors],
+            [list(cv.unweighted) for cv in count_vectors])
+
+
+def unpack_count_matrix(packed_count_matrix, conditions, weightings):
+    """
+    Restores a count matrix packed with ``pack_count_matrix``.
+
+    :param packed_count_matrix: The packed count matrix.
+    :param conditions:          The counting conditions it was created with.
+    :param weightings:          The weightings it was created with.
+    :return:                    A dictionary with count vectors representing
+                                all variables for a function.
+    """
+    count_matrix = {}
+    for name, category, counts, unweighted in zip(*packed_count_matrix):
+        count_vector = CountVector(name, category, conditions, weightings)
+        count_vector.count_vector = counts
+        count_vector.unweighted = unweighted
+        count_matrix[name] = count_vector
+    return count_matrix
+
+
+def _get_file_count_matrices(count_vector_creator, filename, args):
+    """
+    Parses a file and retrieves the count matrices of all functions in it
+    that aren't excluded by ``exclude_function``.
+
+    :return: A tuple of the seconds needed, a dict mapping (line, function)
+             tuples to count matrices and a list of the included files.
+    """
+    start = time.perf_counter()
+    count_dict, included_files = (
+        count_vector_creator.get_vectors_and_includes_for_file(
+            filename, args=args))
+    return (time.perf_counter() - start,
+            {function: count_matrix
+             for function, count_matrix in count_dict.items()
+             if not exclude_function(count_matrix)},
+            included_files)
+
+
+def _get_packed_file_count_matrices(count_vector_creator, task):
+    """
+    ``_get_file_count_matrices`` for worker processes, taking a tuple of the
+    filename and the arguments and returning packed count matrices.
+    """
+    seconds, count_dict, included_files = _get_file_count_matrices(
+        count_vector_creator, *task)
+    return (seconds,
+            {function: pack_count_matrix(count_matrix)
+             for function, count_matrix in count_dict.items()},
+            included_files)
+
+
+def _iter_file_count_matrices(count_vector_creator, tasks, processes):
+    """
+    Yields the results of ``_get_file_count_matrices`` for all tuples of a
+    filename and the arguments to parse it with in order, parsing them in a
+    pool of worker processes if configured.
+    """
+    if not use_process_pool(processes, len(tasks)):
+        for filename, args in tasks:
+            yield _get_file_count_matrices(count_vector_creator,
+                                           filename,
+                                           args)
+        return
+
+    conditions = count_vector_creator.conditions
+    weightings = count_vector_creator.weightings
+    with multiprocessing.Pool(min(processes, len(tasks))) as pool:
+        for seconds, count_dict, included_files in pool.imap(
+                functools.partial(_get_packed_file_count_matrices,
+                                  count_vector_creator),
+                tasks):
+            yield (seconds,
+                   {function: unpack_count_matrix(packed,
+                                                  conditions,
+                                                  weightings)
+                    for function, packed in count_dict.items()},
+                   included_files)
+
+
 def get_count_matrices(count_vector_creator,
                        filenames,
                        progress_callback,
                        base_path,
-                       extra_include_paths):
+                       extra_include_paths,
+                       processes=1,
+                       parse_time_callback=None,
+                       cache=None,
+                       compile_commands=None):
     """
     Retrieves matrices holding count vectors for all variables for all
     functions in the given file.
 
-    :param count_vector_creator: A object with a get_vectors_for_file method
-                                 taking a filename as argument.
+    :param count_vector_creator: A object with a
+                                 get_vectors_and_includes_for_file method
+                                 taking a filename and the clang arguments
+                                 as ``args`` argument.
     :param filenames:            The files to create count vectors for.
     :param progress_callback:    A function with one float argument which is
                                  called after processing each file with the
                                  progress percentage (float) as an argument.
+    :param base_path:            The path to the coafile, all directories
+                                 next to it are include paths for files not
+                                 in the compilation database.
     :param extra_include_paths:  A list containing additional include paths.
+    :param processes:            The number of worker processes parsing the
+                                 files in parallel. The count vector creator
+                                 has to be picklable if this is more than 1.
+    :param parse_time_callback:  A function called with the filename and the
+                                 seconds needed to parse and analyze it after
+                                 parsing each file.
+    :param cache:                A ``CountMatrixCache`` to take the count
+                                 matrices of unchanged files from and to
+                                 store the ones of parsed files in.
+    :param compile_commands:     A dict mapping filenames to the arguments
+                                 they are compiled with as returned by
+                                 ``load_compile_commands``.
     :return:                     A dict holding a tuple of (file, line,
                                  function) as key and as value a dict with
                                  variable names as key and count vector
@@ -59,50 +248,107 @@ def get_count_matrices(count_vector_creator,
     """
     result = {}
     maxlen = len(filenames)
-    include_paths = collect_dirs([os.path.dirname(base_path) + '/**'])
-    include_paths += extra_include_paths
+    compile_commands = compile_commands or {}
+    extra_args = ['-I' + path for path in extra_include_paths]
+    project_args = None
+
+    file_args = {}
+    for filename in filenames:
+        if filename in compile_commands:
+            file_args[filename] = compile_commands[filename] + extra_args
+            continue
+
+        if project_args is None:
+            project_args = ['-I' + path for path in get_project_include_paths(
+                os.path.dirname(base_path))]
+        file_args[filename] = project_args + extra_args
+
+    cached = {}
+    if cache is not None:
+        for filename in filenames:
+            count_dict = cache.get(filename, file_args[filename])
+            if count_dict is not None:
+                cached[filename] = count_dict
+
+    parsed = _iter_file_count_matrices(
+        count_vector_creator,
+        [(filename, file_args[filename])
+         for filename in filenames if filename not in cached],
+        processes)
 
     for i, filename in enumerate(filenames):
         progress_callback(100*(i/maxlen))
-        count_dict = count_vector_creator.get_vectors_for_file(filename,
-                                                               include_paths)
+        if filename in cached:
+            count_dict = cached[filename]
+        else:
+            seconds, count_dict, included_files = next(parsed)
+            if parse_time_callback is not None:
+                parse_time_callback(filename, seconds)
+            if cache is not None:
+                cache.set(filename, file_args[filename], included_files,
+                          count_dict)
         for function in count_dict:
-            if not exclude_function(count_dict[function]):
-                result[(filename,
-                        function[0],
-                        function[1])] = count_dict[function]
+            result[(filename,
+                    function[0],
+                    function[1])] = count_dict[function]
 
     return result
 
 
-def pad_count_vectors(cm1, cm2):
+def get_count_array(count_matrix):
+    """
+    Stores the count vectors of a count matrix in one array.
+
+    :param count_matrix: A dictionary with count vectors representing all
+                         variables for a function.
+    :return:             A 2D float array holding a row for each variable and
+                         a column for each counting condition.
+    """
+    return numpy.array([cv.count_vector for cv in count_matrix.values()],
+                       dtype=float)
+
+
+def pad_count_arrays(ca1, ca2):
     """
-    Pads the smaller count matrix with zeroed count vectors.
+    Pads the count array with less variables with zeroed rows.
 
-    :param cm1: First cm. Will not be modified.
-    :param cm2: Second cm. Will not be modified.
-    :return:    A tuple holding two cms.
+    :param ca1: First count array. Will not be modified.
+    :param ca2: Second count array. Will not be modified.
+    :return:    A tuple holding two count arrays with the same shape, the
+                larger one first.
     """
-    cm1len = len(cm1)
-    cm2len = len(cm2)
-    if cm1len != cm2len:
-        # Copy the smaller matrix as it will be altered
-        if cm1len > cm2len:
-            cm2 = copy.copy(cm2)
-        else:  # make cm1 the larger (or equal) one
-            tmp = cm2
-            cm2 = copy.copy(cm1)
-            cm1 = tmp
+    if len(ca1) != len(ca2):
+        if len(ca1) < len(ca2):  # make ca1 the larger one
+            ca1, ca2 = ca2, ca1
 
-        any_count_vector = list(cm1.values())[0]
-        # Fill up smaller count matrix with zero vectors. This way no
-        # padding is needed later and if count vectors are zero on both
-        # side, the difference is zero too which wouldn't be taken into
-        # account with simple padding of ones.
-        for i in range(len(cm1) - len(cm2)):
-            cm2[i] = any_count_vector.create_null_vector(i)
+        # Fill up smaller count array with zero rows. This way if count
+        # vectors are zero on both side, the difference is zero too which
+        # wouldn't be taken into account with simple padding of ones.
+        ca2 = numpy.concatenate(
+            (ca2, numpy.zeros((len(ca1) - len(ca2), ca2.shape[1]))))
 
-    return cm1, cm2
+    return ca1, ca2
+
+
+def get_cost_matrices(ca1, ca2):
+    """
+    Calculates the differences and the values to normalize them with between
+    all variables of the given count arrays.
+
+    The field i/j of the returned matrices holds the values for the i-th
+    variable of the first and the j-th variable of the second function, as
+    ``CountVector.difference`` and ``CountVector.maxabs`` would calculate
+    them.
+
+    :param ca1: First count array.
+    :param ca2: Second count array.
+    :return:    A tuple holding the difference and maxabs matrices.
+    """
+    rows = ca1[:, numpy.newaxis, :]
+    columns = ca2[numpy.newaxis, :, :]
+    differences = numpy.sqrt(numpy.square(rows - columns).sum(axis=2))
+    maxabs = numpy.sqrt(numpy.square(numpy.maximum(rows, columns)).sum(axis=2))
+    return differences, maxabs
 
 
 def relative_difference(difference, maxabs):
@@ -154,20 +400,195 @@ def get_difference(matching_iterator,
             sum(diff for diff, norm in matching_iterator),
             norm_sum)
 
+    return difference * postprocessing_factor(norm_sum,
+                                              poly_postprocessing,
+                                              exp_postprocessing)
+
+
+def postprocessing_factor(norm_sum,
+                          poly_postprocessing,
+                          exp_postprocessing):
+    """
+    Calculates the factor ``get_difference`` multiplies the difference of a
+    function pair with the given norm sum with. It decreases with growing
+    norm sums.
+    """
+    factor = 1
     if poly_postprocessing and norm_sum != 0:
         # This function starts at 1 and converges to .75 for norm_sum -> inf
-        difference *= (3*norm_sum+1)/(4*norm_sum)
+        factor *= (3*norm_sum+1)/(4*norm_sum)
     if exp_postprocessing and norm_sum != 0:
-        difference *= math.exp(1-norm_sum)/4 + 0.75
+        factor *= math.exp(1-norm_sum)/4 + 0.75
+    return factor
+
+
+def get_difference_lower_bound(differences,
+                               maxabs,
+                               cost_matrix,
+                               average_calculation,
+                               poly_postprocessing,
+                               exp_postprocessing):
+    """
+    Calculates a lower bound for the difference ``get_difference`` retrieves
+    for any matching of the given cost matrices, without solving the
+    assignment problem.
+
+    The matched differences can't sum up to less than the row or column
+    minimums do, the matched norms can't sum up to more than the row or
+    column maximums do.
+
+    :param differences: The matrix of the absolute differences.
+    :param maxabs:      The matrix of the values to normalize with.
+    :param cost_matrix: The matrix of the relative differences.
+    :return:            A lower bound of the difference value.
+    """
+    norm_bound = min(maxabs.max(axis=1).sum(), maxabs.max(axis=0).sum())
+
+    if average_calculation:
+        difference = max(cost_matrix.min(axis=1).sum(),
+                         cost_matrix.min(axis=0).sum()) / len(cost_matrix)
+    else:
+        difference = relative_difference(
+            max(differences.min(axis=1).sum(), differences.min(axis=0).sum()),
+            norm_bound)
 
-    return difference
+    # Norm sums below 1 may increase the difference, functions whose norm
+    # sum is 0 are not postprocessed at all.
+    return difference * min(1, postprocessing_factor(norm_bound,
+                                                     poly_postprocessing,
+                                                     exp_postprocessing))
+
+
+def get_norm_signature(count_array):
+    """
+    Retrieves the norms of all variables of a function in descending order.
+
+    :param count_array: The count array of the function.
+    :return:            A 1D array of the variable norms.
+    """
+    return -numpy.sort(-numpy.sqrt(numpy.square(count_array).sum(axis=1)))
+
+
+def get_signature_lower_bound(signature1,
+                              signature2,
+                              poly_postprocessing,
+                              exp_postprocessing):
+    """
+    Calculates a lower bound for the difference ``compare_functions``
+    calculates for two functions with non negative count vectors, using
+    only their norm signatures.
+
+    The difference of two variables is at least the difference of their
+    norms, the best matching of the norms is the one of the sorted norms.
+    The norm of the element-wise maximum of two variables is at most the sum
+    of their norms.
+
+    :param signature1: The norm signature of the first function.
+    :param signature2: The norm signature of the second function.
+    :return:           A lower bound of the difference value.
+    """
+    if len(signature1) < len(signature2):
+        signature1, signature2 = signature2, signature1
+    padding = numpy.zeros(len(signature1) - len(signature2))
+    difference_bound = numpy.abs(
+        signature1 - numpy.concatenate((signature2, padding))).sum()
+    norm_bound = signature1.sum() + signature2.sum()
+
+    return relative_difference(difference_bound, norm_bound) * min(
+        1, postprocessing_factor(norm_bound,
+                                 poly_postprocessing,
+                                 exp_postprocessing))
+
+
+def get_candidate_pairs(count_arrays,
+                        max_difference,
+                        average_calculation=False,
+                        poly_postprocessing=True,
+                        exp_postprocessing=False):
+    """
+    Retrieves all function pairs that may have a difference lower than
+    ``max_difference``. Other pairs are skipped without solving their
+    assignment problem, using ``get_signature_lower_bound``.
+
+    Functions are sorted by the sum of their variable norms first. Pairs
+    whose sums are too far apart are never looked at, even the bound is only
+    calculated for pairs within a window of similar sums.
+
+    Pruning is only done for the default difference calculation and if no
+    counting condition has a negative weighting.
+
+    :param count_arrays:        A dictionary mapping functions to their count
+                                arrays.
+    :param max_difference:      The maximum difference of a pair of clones.
+    :param average_calculation: Whether the average difference calculation
+                                will be used for the pairs.
+    :param poly_postprocessing: Whether polynomial postprocessing will be
+                                applied to the pairs.
+    :param exp_postprocessing:  Whether exponential postprocessing will be
+                                applied to the pairs.
+    :return:                    A list of function pairs in the order
+                                ``itertools.combinations`` would yield them.
+    """
+    functions = list(count_arrays)
+    if (max_difference is None or average_calculation or
+            any((count_array < 0).any()
+                for count_array in count_arrays.values())):
+        return list(combinations(functions, 2))
+
+    # Zero padded signatures of all functions, sorted by their sums
+    signatures = [get_norm_signature(count_arrays[function])
+                  for function in functions]
+    totals = numpy.array([signature.sum() for signature in signatures])
+    order = numpy.argsort(totals, kind='mergesort')
+    totals = totals[order]
+    padded = numpy.zeros((len(functions),
+                          max(map(len, signatures), default=0)))
+    for row, i in enumerate(order):
+        padded[row, :len(signatures[i])] = signatures[i]
+
+    # The postprocessing factor of the bound is never smaller than this, so
+    # the norm sums of a candidate pair can't differ by more than the
+    # ``ratio``.
+    min_factor = ((0.75 if poly_postprocessing else 1) *
+                  (0.75 if exp_postprocessing else 1))
+    max_relative = max_difference / min_factor + 1e-9
+    ratio = ((1 + max_relative) / (1 - max_relative) if max_relative < 1
+             else float('inf'))
+    ends = numpy.searchsorted(totals, totals * ratio, side='right')
+
+    candidates = []
+    for row in range(len(functions)):
+        others = slice(row + 1, ends[row])
+        # Same as get_signature_lower_bound for all pairs at once
+        difference_bounds = numpy.abs(padded[others] - padded[row]).sum(
+            axis=1)
+        norm_bounds = totals[others] + totals[row]
+        factors = numpy.ones_like(norm_bounds)
+        nonzero = norm_bounds != 0
+        if poly_postprocessing:
+            factors[nonzero] *= ((3*norm_bounds[nonzero] + 1) /
+                                 (4*norm_bounds[nonzero]))
+        if exp_postprocessing:
+            factors[nonzero] *= numpy.exp(1 - norm_bounds[nonzero])/4 + 0.75
+        bounds = numpy.ones_like(norm_bounds)
+        numpy.divide(difference_bounds, norm_bounds, out=bounds,
+                     where=nonzero)
+        bounds *= numpy.minimum(1, factors)
+
+        i = order[row]
+        for j in order[others][bounds <= max_difference + 1e-9]:
+            candidates.append((i, j) if i < j else (j, i))
+
+    return [(functions[i], functions[j]) for i, j in sorted(candidates)]
 
 
 def compare_functions(cm1,
                       cm2,
                       average_calculation=False,
                       poly_postprocessing=True,
-                      exp_postprocessing=False):
+                      exp_postprocessing=False,
+                      max_difference=None,
+                      assignment_solver=None):
     """
     Compares the functions represented by the given count matrices.
 
@@ -175,8 +596,10 @@ def compare_functions(cm1,
     clones at the same difference value than big functions which may provide a
     better refactoring opportunity for the user.
 
-    :param cm1:                 Count vector dict for the first function.
-    :param cm2:                 Count vector dict for the second function.
+    :param cm1:                 Count vector dict or count array for the first
+                                function.
+    :param cm2:                 Count vector dict or count array for the
+                                second function.
     :param average_calculation: If set to true the difference calculation
                                 function will take the average of all variable
                                 differences as the difference, else it will
@@ -188,17 +611,23 @@ def compare_functions(cm1,
     :param exp_postprocessing:  If set to true, the difference value of big
                                 function pairs will be reduced using an
                                 exponential approach.
+    :param max_difference:      If given, the assignment problem is not solved
+                                for functions whose difference can't be
+                                lower than this value. A lower bound of their
+                                difference is returned instead.
+    :param assignment_solver:   The function solving the assignment problem,
+                                see ``AssignmentSolvers``. Defaults to the
+                                fastest one available.
     :return:                    The difference between these functions, 0 is
                                 identical and 1 is not similar at all.
     """
     assert 0 not in (len(cm1), len(cm2))
 
-    cm1, cm2 = pad_count_vectors(cm1, cm2)
-
-    diff_table = [(cv1,
-                   [(cv2, cv1.difference(cv2), cv1.maxabs(cv2))
-                    for cv2 in cm2.values()])
-                  for cv1 in cm1.values()]
+    if isinstance(cm1, dict):
+        cm1 = get_count_array(cm1)
+    if isinstance(cm2, dict):
+        cm2 = get_count_array(cm2)
+    differences, maxabs = get_cost_matrices(*pad_count_arrays(cm1, cm2))
 
     # The cost matrix holds the difference between the two variables i and
     # j in the i/j field. This is a representation of a bipartite weighted
@@ -206,17 +635,75 @@ def compare_functions(cm1,
     # (rows) and the nodes representing the second function on the other
     #  side (columns). The fields in the matrix are the weighted nodes
     # connecting each element from one side to the other.
-    cost_matrix = [[relative_difference(difference, maxabs)
-                    for cv2, difference, maxabs in lst]
-                   for cv1, lst in diff_table]
-
-    # The munkres algorithm will calculate a matching such that the sum of
+    cost_matrix = numpy.ones_like(differences)
+    numpy.divide(differences, maxabs, out=cost_matrix, where=maxabs != 0)
+
+    if max_difference is not None:
+        lower_bound = get_difference_lower_bound(differences,
+                                                 maxabs,
+                                                 cost_matrix,
+                                                 average_calculation,
+                                                 poly_postprocessing,
+                                                 exp_postprocessing)
+        # Leave some room for rounding errors
+        if lower_bound > max_difference + 1e-9:
+            return lower_bound
+
+    # The assignment solver will calculate a matching such that the sum of
     # the taken fields is minimal. It thus will associate each variable
     # from one function to one on the other function.
-    matching = munkres.compute(cost_matrix)
+    if assignment_solver is None:
+        assignment_solver = get_assignment_solver()
+    matching = assignment_solver(cost_matrix)
 
-    return get_difference([(diff_table[x][1][y][1], diff_table[x][1][y][2])
+    differences = differences.tolist()
+    maxabs = maxabs.tolist()
+    return get_difference([(differences[x][y], maxabs[x][y])
                            for x, y in matching],
                           average_calculation,
                           poly_postprocessing,
                           exp_postprocessing)
+
+
+def get_function_pair_difference(function_pair,
+                                 count_matrices,
+                                 average_calculation,
+                                 poly_postprocessing,
+                                 exp_postprocessing,
+                                 max_difference=None,
+                                 assignment_solver=None):
+    """
+    Retrieves the difference between two functions by solving the assignment
+    problem of their variables.
+
+    :param function_pair:       A tuple containing both indices for the
+                                count_matrices dictionary.
+    :param count_matrices:      A dictionary holding CMs or count arrays.
+    :param average_calculation: If set to true the difference calculation
+                                function will take the average of all variable
+                                differences as the difference, else it will
+                                normalize the function as a whole and thus
+                                weighting in variables dependent on their size.
+    :param poly_postprocessing: If set to true, the difference value of big
+                                function pairs will be reduced using a
+                                polynomial approach.
+    :param exp_postprocessing:  If set to true, the difference value of big
+                                function pairs will be reduced using an
+                                exponential approach.
+    :param max_difference:      Function pairs that can't have a lower
+                                difference are not compared exactly, a lower
+                                bound of their difference is returned.
+    :param assignment_solver:   The function solving the assignment problem.
+    :return:                    A tuple containing both function ids and their
+                                difference.
+    """
+    function_1, function_2 = function_pair
+    return (function_1,
+            function_2,
+            compare_functions(count_matrices[function_1],
+                              count_matrices[function_2],
+                              average_calculation,
+                              poly_postprocessing,
+                              exp_postprocessing,
+                              max_difference,
+                              assignment_solver))
@@ -0,0 +1,153 @@
+"""
+Retrieves the arguments clang parses the files of a project with, either from
+a compilation database (``compile_commands.json``) or by using all
+directories of the project as include paths.
+"""
+
+import json
+import os
+import shlex
+
+from coalib.misc.CachingUtilities import pickle_dump, pickle_load
+from coalib.parsing.Globbing import iglob
+
+COMPILE_COMMANDS_FILENAME = 'compile_commands.json'
+
+# Arguments only concerning the output of the compiler, not how the file is
+# parsed. The ones in the second set take a value as next argument.
+_OUTPUT_ARGUMENTS = {'-c', '-S', '-E', '-M', '-MM', '-MD', '-MMD', '-MG',
+                     '-MP'}
+_OUTPUT_ARGUMENTS_WITH_VALUE = {'-o', '-MF', '-MT', '-MQ'}
+
+# Arguments taking a path, they have to be absolute as clang doesn't run in
+# the directory of the compile command.
+_PATH_ARGUMENTS = ('-I', '-isystem', '-iquote', '-idirafter', '-include',
+                   '-imacros')
+
+
+def get_clang_args(arguments, directory, filename):
+    """
+    Extracts the arguments relevant for parsing a file from a compile
+    command.
+
+    >>> get_clang_args(['gcc', '-Iinc', '-DX=1', '-c', '-o', 'a.o', 'a.c'],
+    ...                '/src', '/src/a.c')
+    ['-I/src/inc', '-DX=1']
+
+    :param arguments: The arguments of the compile command, starting with the
+                      compiler.
+    :param directory: The working directory of the compile command.
+    :param filename:  The absolute path to the compiled file.
+    :return:          A list of arguments for clang.
+    """
+    result = []
+    arguments = iter(arguments[1:])
+    for argument in arguments:
+        if argument in _OUTPUT_ARGUMENTS:
+            continue
+        if argument in _OUTPUT_ARGUMENTS_WITH_VALUE:
+            next(arguments, None)
+            continue
+        if argument.startswith(('-MF', '-MT', '-MQ', '-o')):
+            continue
+        if (not argument.startswith('-') and
+                os.path.normpath(os.path.join(directory, argument)) ==
+                filename):
+            continue
+
+        if argument in _PATH_ARGUMENTS:
+            value = next(arguments, None)
+            if value is not None:
+                result += [argument, os.path.join(directory, value)]
+            continue
+        for prefix in _PATH_ARGUMENTS:
+            if argument.startswith(prefix):
+                argument = prefix + os.path.join(directory,
+                                                 argument[len(prefix):])
+                break
+        result.append(argument)
+
+    return result
+
+
+def load_compile_commands(path):
+    """
+    Loads a compilation database.
+
+    :param path: The path to a ``compile_commands.json`` file or to a
+                 directory containing one.
+    :return:     A dict mapping the absolute paths of all files in the
+                 database to a list of arguments for clang. The first
+                 command is used if a file is compiled several times.
+    :raises OSError:    If the file can't be read.
+    :raises ValueError: If the file is no valid compilation database.
+    """
+    if os.path.isdir(path):
+        path = os.path.join(path, COMPILE_COMMANDS_FILENAME)
+
+    with open(path) as file:
+        commands = json.load(file)
+
+    result = {}
+    for command in commands:
+        try:
+            directory = command['directory']
+            filename = os.path.normpath(os.path.join(directory,
+                                                     command['file']))
+            arguments = (command['arguments'] if 'arguments' in command
+                         else shlex.split(command['command']))
+        except (KeyError, TypeError) as exception:
+            raise ValueError('Invalid compile command {!r} in {}.'.format(
+                command, path)) from exception
+
+        if filename not in result:
+            result[filename] = get_clang_args(arguments, directory, filename)
+
+    return result
+
+
+def _get_directory_fingerprint(directories):
+    """
+    Retrieves the modification times and link counts of the given
+    directories. They change when a directory is added to or removed from one
+    of them, so all directories of a tree didn't change as long as this
+    doesn't. The link count catches changes within the resolution of the
+    modification time.
+
+    :return: A tuple of tuples of the modification time in nanoseconds and
+             the link count, None for directories that don't exist anymore.
+    """
+    fingerprint = []
+    for directory in directories:
+        try:
+            stat = os.stat(directory)
+            fingerprint.append((stat.st_mtime_ns, stat.st_nlink))
+        except OSError:
+            fingerprint.append(None)
+    return tuple(fingerprint)
+
+
+def get_project_include_paths(project_dir):
+    """
+    Retrieves all directories of a project to use them as include paths.
+
+    The directories are cached on disk with the modification times of all of
+    them, the tree is only searched again when a directory was added or
+    removed.
+
+    :param project_dir: The root directory of the project.
+    :return:            A list of all directories in the project.
+    """
+    identifier = 'ClangFunctionDifferenceBear_include_paths_{}'.format(
+        project_dir)
+    directories, fingerprint = pickle_load(None, identifier, ([], None))
+    if (not directories or
+            _get_directory_fingerprint(directories) != fingerprint):
+        # Not collect_dirs, it caches the directories for the whole process
+        directories = [path
+                       for path in iglob(os.path.join(project_dir, '**'))
+                       if os.path.isdir(path)]
+        pickle_dump(None, identifier,
+                    (directories, _get_directory_fingerprint(directories)))
+
+    return list(directories)
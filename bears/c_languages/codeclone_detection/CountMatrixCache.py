@@ -0,0 +1,127 @@
+import hashlib
+
+from coalib.misc.CachingUtilities import pickle_dump, pickle_load
+from bears.c_languages.codeclone_detection.CloneDetectionRoutines import (
+    pack_count_matrix, unpack_count_matrix)
+
+
+def hash_file(filename):
+    """
+    Hashes the contents of a file.
+
+    :param filename: The path to the file.
+    :return:         The hex digest of the SHA-1 hash of the file contents or
+                     None if the file can't be read.
+    """
+    try:
+        with open(filename, 'rb') as file:
+            return hashlib.sha1(file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class CountMatrixCache:
+    """
+    Stores the count matrices of all functions of the analyzed files on disk
+    so only files that changed since the last run need to be parsed again.
+
+    The count matrices of a file are valid as long as the contents of the
+    file and of all files it includes, the counting conditions, their
+    weightings and the arguments for clang are the same. They are stored packed
+    with ``pack_count_matrix``, i.e. without any clang objects or counting
+    conditions::
+
+        cache = CountMatrixCache('project', conditions, weightings)
+        count_dict = cache.get(filename, args)
+        if count_dict is None:
+            count_dict, included_files = ...
+            cache.set(filename, args, included_files, count_dict)
+        cache.save()
+    """
+
+    def __init__(self, identifier, conditions, weightings):
+        """
+        Loads the cached count matrices.
+
+        :param identifier: Identifies the cache, e.g. by the project.
+        :param conditions: The counting conditions the count matrices are
+                           created with.
+        :param weightings: The weightings of the counting conditions.
+        """
+        self.identifier = 'ClangFunctionDifferenceBear_count_matrices_{}' \
+            .format(identifier)
+        self.conditions = conditions
+        self.weightings = weightings
+        self.conditions_key = tuple(
+            (getattr(condition, '__name__', repr(condition)), weighting)
+            for condition, weighting in zip(conditions, weightings))
+
+        self.entries = pickle_load(None, self.identifier, {})
+        self.used_entries = {}
+        self.file_hashes = {}
+        self.hits = 0
+
+    def get_file_hash(self, filename):
+        """
+        Hashes a file once per run.
+        """
+        if filename not in self.file_hashes:
+            self.file_hashes[filename] = hash_file(filename)
+        return self.file_hashes[filename]
+
+    def get_key(self, filename, args):
+        return (self.get_file_hash(filename),
+                tuple(args),
+                self.conditions_key)
+
+    def get(self, filename, args):
+        """
+        Retrieves the count matrices of all functions in the file if the file
+        and the files it includes didn't change.
+
+        :param filename: The path to the file.
+        :param args:     The arguments clang would parse the file with.
+        :return:         A dict mapping (line, function) tuples to count
+                         matrices or None if nothing valid is cached.
+        """
+        entry = self.entries.get(filename)
+        if entry is None:
+            return None
+
+        key, header_hashes, packed_count_dict = entry
+        if (self.get_file_hash(filename) is None or
+                key != self.get_key(filename, args) or
+                any(self.get_file_hash(header) != header_hash
+                    for header, header_hash in header_hashes)):
+            return None
+
+        self.used_entries[filename] = entry
+        self.hits += 1
+        return {function: unpack_count_matrix(packed,
+                                              self.conditions,
+                                              self.weightings)
+                for function, packed in packed_count_dict.items()}
+
+    def set(self, filename, args, included_files, count_dict):
+        """
+        Stores the count matrices of all functions in the file.
+
+        :param filename:       The path to the file.
+        :param args:           The arguments clang parsed the file with.
+        :param included_files: The files the file includes.
+        :param count_dict:     A dict mapping (line, function) tuples to
+                               count matrices.
+        """
+        self.used_entries[filename] = (
+            self.get_key(filename, args),
+            tuple((header, self.get_file_hash(header))
+                  for header in included_files),
+            {function: pack_count_matrix(count_matrix)
+             for function, count_matrix in count_dict.items()})
+
+    def save(self):
+        """
+        Writes the count matrices of all files retrieved or stored in this
+        run to disk, dropping the ones of all other files.
+        """
+        pickle_dump(None, self.identifier, self.used_entries)
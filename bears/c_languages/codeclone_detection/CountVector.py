@@ -1,4 +1,4 @@
-from math import sqrt
+import numpy
 
 from coala_utils.decorators import generate_repr
 
@@ -70,7 +70,7 @@ class CountVector:
         return iter(self.count_vector)
 
     def __abs__(self):
-        return sqrt(sum(x**2 for x in self))
+        return float(numpy.linalg.norm(self.count_vector))
 
     def maxabs(self, other):
         """
@@ -83,7 +83,8 @@ class CountVector:
         :return:      A float value bigger or equal than the difference
                       between self and other.
         """
-        return sqrt(sum(max(x, y)**2 for x, y in zip(self, other)))
+        return float(numpy.linalg.norm(numpy.maximum(self.count_vector,
+                                                     other.count_vector)))
 
     def difference(self, other):
         """
@@ -96,4 +97,5 @@ class CountVector:
         assert isinstance(other, CountVector)
         assert len(other) == len(self)
 
-        return sqrt(sum((x-y)**2 for x, y in zip(self, other)))
+        return float(numpy.linalg.norm(numpy.subtract(self.count_vector,
+                                                      other.count_vector)))
@@ -0,0 +1,169 @@
+import hashlib
+from array import array
+
+import numpy
+
+from coalib.misc.CachingUtilities import pickle_dump, pickle_load
+
+# Length of a fingerprint in bytes
+FINGERPRINT_SIZE = hashlib.sha1().digest_size
+
+
+def get_count_array_fingerprint(count_array):
+    """
+    Hashes a count array. The difference of two functions only depends on
+    their count arrays, so the fingerprints of both identify their
+    difference even if the functions moved or were renamed.
+
+    :param count_array: The count array of a function.
+    :return:            The digest of the SHA-1 hash of the shape and the
+                        values of the count array.
+    """
+    return hashlib.sha1(str(count_array.shape).encode() +
+                        count_array.astype(float).tobytes()).digest()
+
+
+def _get_pair_keys(first, second):
+    """
+    Combines the fingerprint indices of the pairs into one integer per pair.
+    """
+    return (numpy.asarray(first, dtype=numpy.uint64) << numpy.uint64(32) |
+            numpy.asarray(second, dtype=numpy.uint64))
+
+
+class DifferenceCache:
+    """
+    Stores the differences of all compared function pairs on disk so only
+    pairs involving functions whose count matrices changed need to be
+    compared in the next run::
+
+        cache = DifferenceCache('project', settings)
+        known_differences = cache.get(function_pairs, count_arrays)
+        ...
+        cache.save(differences, count_arrays)
+
+    Like in ``DifferenceList``, every fingerprint is stored only once and the
+    pairs are stored as indices into the fingerprints in parallel arrays
+    along with the differences.
+    """
+
+    def __init__(self, identifier, settings):
+        """
+        Loads the cached differences.
+
+        :param identifier: Identifies the cache, e.g. by the project.
+        :param settings:   A tuple of all settings besides the count arrays
+                           the differences depend on. Differences cached
+                           with other settings are ignored.
+        """
+        self.identifier = 'ClangFunctionDifferenceBear_differences_{}' \
+            .format(identifier)
+        self.settings = settings
+        cached = pickle_load(None, self.identifier, {})
+        if cached.get('settings') != settings or 'fingerprints' not in cached:
+            cached = {'fingerprints': b'',
+                      'first': array('I'),
+                      'second': array('I'),
+                      'differences': array('d')}
+
+        fingerprints = cached['fingerprints']
+        self._fingerprint_indices = {
+            fingerprints[start:start + FINGERPRINT_SIZE]:
+                start // FINGERPRINT_SIZE
+            for start in range(0, len(fingerprints), FINGERPRINT_SIZE)}
+        # Sorted, so the differences are found by a binary search
+        keys = _get_pair_keys(cached['first'], cached['second'])
+        order = numpy.argsort(keys, kind='mergesort')
+        self._keys = keys[order]
+        self._differences = numpy.array(cached['differences'],
+                                        dtype=float)[order]
+        self.fingerprints = {}
+
+    def get_fingerprint(self, function, count_arrays):
+        if function not in self.fingerprints:
+            self.fingerprints[function] = get_count_array_fingerprint(
+                count_arrays[function])
+        return self.fingerprints[function]
+
+    def _lookup(self, keys):
+        """
+        :return: The positions of the keys in ``self._keys`` and whether
+                 they were found.
+        """
+        if not len(self._keys):
+            return (numpy.zeros(len(keys), dtype=int),
+                    numpy.zeros(len(keys), dtype=bool))
+        positions = numpy.searchsorted(self._keys, keys)
+        positions[positions == len(self._keys)] = 0
+        return positions, self._keys[positions] == keys
+
+    def get(self, function_pairs, count_arrays):
+        """
+        Retrieves the cached differences of the given function pairs.
+
+        :param function_pairs: A list of function pairs.
+        :param count_arrays:   A dict mapping the functions to their count
+                               arrays.
+        :return:               A dict mapping the function pairs with a
+                               cached difference to their difference.
+        """
+        known_pairs = []
+        first = array('I')
+        second = array('I')
+        for function_pair in function_pairs:
+            index_1, index_2 = (self._fingerprint_indices.get(
+                self.get_fingerprint(function, count_arrays))
+                for function in function_pair)
+            if index_1 is not None and index_2 is not None:
+                known_pairs.append(function_pair)
+                first.append(index_1)
+                second.append(index_2)
+        if not known_pairs:
+            return {}
+
+        positions, found = self._lookup(_get_pair_keys(first, second))
+        swapped_positions, swapped_found = self._lookup(
+            _get_pair_keys(second, first))
+        positions = numpy.where(found, positions, swapped_positions)
+        found |= swapped_found
+        return {function_pair: float(self._differences[position])
+                for function_pair, position, is_found
+                in zip(known_pairs, positions, found)
+                if is_found}
+
+    def save(self, differences, count_arrays):
+        """
+        Writes the given differences to disk, dropping all others, e.g. the
+        ones of deleted functions.
+
+        :param differences:  A list of tuples of two functions and their
+                             difference.
+        :param count_arrays: A dict mapping the functions to their count
+                             arrays.
+        """
+        fingerprints = []
+        fingerprint_indices = {}
+        first = array('I')
+        second = array('I')
+        stored_differences = array('d')
+
+        def get_index(function):
+            fingerprint = self.get_fingerprint(function, count_arrays)
+            index = fingerprint_indices.get(fingerprint)
+            if index is None:
+                index = len(fingerprints)
+                fingerprint_indices[fingerprint] = index
+                fingerprints.append(fingerprint)
+            return index
+
+        for function_1, function_2, difference in differences:
+            first.append(get_index(function_1))
+            second.append(get_index(function_2))
+            stored_differences.append(difference)
+
+        pickle_dump(None, self.identifier, {
+            'settings': self.settings,
+            'fingerprints': b''.join(fingerprints),
+            'first': first,
+            'second': second,
+            'differences': stored_differences})
@@ -0,0 +1,81 @@
+from array import array
+
+from coala_utils.decorators import generate_repr
+
+
+@generate_repr('max_difference')
+class DifferenceList:
+    """
+    A compact list of tuples of two functions and their difference.
+
+    Every function is stored only once, the pairs are stored as indices into
+    the list of functions in parallel arrays along with the differences. A
+    pair needs 16 bytes instead of the hundreds of bytes needed by a tuple
+    of tuples.
+
+    >>> differences = DifferenceList(max_difference=0.5)
+    >>> differences.append((('a.c', 1, 'a()'), ('b.c', 1, 'b()'), 0.25))
+    >>> differences.append((('a.c', 1, 'a()'), ('c.c', 1, 'c()'), 0.75))
+    >>> list(differences)
+    [(('a.c', 1, 'a()'), ('b.c', 1, 'b()'), 0.25)]
+    """
+
+    def __init__(self, differences=(), max_difference=None):
+        """
+        :param differences:    Tuples of two functions and their difference
+                               to append.
+        :param max_difference: Pairs with a greater difference are not
+                               appended. None to append all pairs.
+        """
+        self.max_difference = max_difference
+        self.functions = []
+        self._function_indices = {}
+        self._first = array('I')
+        self._second = array('I')
+        self._differences = array('d')
+        for elem in differences:
+            self.append(elem)
+
+    def _get_function_index(self, function):
+        index = self._function_indices.get(function)
+        if index is None:
+            index = len(self.functions)
+            self._function_indices[function] = index
+            self.functions.append(function)
+        return index
+
+    def append(self, elem):
+        """
+        Appends the tuple of two functions and their difference unless the
+        difference is greater than ``max_difference``.
+        """
+        function_1, function_2, difference = elem
+        if self.max_difference is not None and (difference >
+                                                self.max_difference):
+            return
+
+        self._first.append(self._get_function_index(function_1))
+        self._second.append(self._get_function_index(function_2))
+        self._differences.append(difference)
+
+    def __len__(self):
+        return len(self._differences)
+
+    def __getitem__(self, index):
+        return (self.functions[self._first[index]],
+                self.functions[self._second[index]],
+                self._differences[index])
+
+    def __iter__(self):
+        functions = self.functions
+        for first, second, difference in zip(self._first,
+                                             self._second,
+                                             self._differences):
+            yield functions[first], functions[second], difference
+
+    def __eq__(self, other):
+        try:
+            return len(self) == len(other) and all(
+                elem == other_elem for elem, other_elem in zip(self, other))
+        except TypeError:
+            return NotImplemented
@@ -0,0 +1,343 @@
+"""
+Evaluates function pairs in shards that independent workers, e.g. on
+several machines, process through a shared directory.
+
+The coordinator writes a job holding the difference function (including the
+count matrices) and the pairs once. The pairs are partitioned
+deterministically, shard ``i`` of ``n`` holds every ``n``-th pair starting
+with pair ``i``. The coordinator and all workers claim shards by creating a
+claim file exclusively, evaluate them and write their differences. The
+coordinator merges them in the order of the pairs.
+
+While evaluating a shard, a worker refreshes the modification time of its
+claim file every ``HEARTBEAT_INTERVAL`` seconds. The coordinator evaluates
+shards itself whose claim it didn't see refreshed for the timeout, e.g.
+because their worker died. It measures this with its own clock, so the
+clocks of the machines don't need to agree.
+
+The job and result files are pickles, which the workers and the coordinator
+load. The job includes the difference function, so anyone who can write to
+the directory can run arbitrary code on every worker and the coordinator.
+Only use a directory that nobody but trusted users can write to.
+
+Start a worker on every machine with access to the directory with::
+
+    python3 -m bears.c_languages.codeclone_detection.ShardedComparison DIR
+
+The directory contains these files for every job:
+
+- ``<job>.job``: The pickled job.
+- ``<job>.<shard>.claim``: Created by the process evaluating the shard.
+- ``<job>.<shard>.result``: The pickled differences of the shard.
+
+Once all differences are merged, the coordinator removes the job file
+first and then the claim and result files. A worker finding the job or its
+own temporary files removed treats the job as cancelled and drops its
+result.
+"""
+
+import argparse
+import glob
+import os
+import pickle
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import numpy
+
+from bears.c_languages.codeclone_detection.CloneDetectionRoutines import (
+    get_differences)
+
+JOB_SUFFIX = '.job'
+
+# Seconds between refreshing the claim of a shard being evaluated
+HEARTBEAT_INTERVAL = 10
+
+
+def _dump(path, data):
+    """
+    Pickles the data to the given path atomically, readers never see a
+    partially written file.
+    """
+    temporary_path = '{}.{}.tmp'.format(path, uuid.uuid4().hex)
+    try:
+        with open(temporary_path, 'wb') as file:
+            pickle.dump(data, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, path)
+    except BaseException:
+        _remove(temporary_path)
+        raise
+
+
+def _load(path):
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _get_shard_path(job_path, shard, suffix):
+    return '{}.{}.{}'.format(job_path[:-len(JOB_SUFFIX)], shard, suffix)
+
+
+def _claim(job_path, shard):
+    """
+    :return: True if this process claimed the shard, False if another one
+             already did.
+    """
+    try:
+        os.close(os.open(_get_shard_path(job_path, shard, 'claim'),
+                         os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        return True
+    except FileExistsError:
+        return False
+
+
+@contextmanager
+def _heartbeat(claim_path, interval=None):
+    """
+    Refreshes the modification time of the claim file every ``interval``
+    seconds while the block runs, telling the coordinator that the shard is
+    still being evaluated.
+    """
+    interval = HEARTBEAT_INTERVAL if interval is None else interval
+    stopped = threading.Event()
+
+    def refresh():
+        while not stopped.wait(interval):
+            try:
+                os.utime(claim_path)
+            except OSError:
+                # The job was cancelled and its files removed
+                return
+
+    thread = threading.Thread(target=refresh, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def _get_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def write_job(directory, function_pairs, difference_function, shard_count):
+    """
+    Writes a job for evaluating the given function pairs to the directory.
+
+    :param directory:           The shared directory.
+    :param function_pairs:      A list of function pairs.
+    :param difference_function: A picklable function taking a function pair
+                                and returning a tuple of both functions and
+                                their difference, e.g. a partial of
+                                ``get_function_pair_difference``.
+    :param shard_count:         The number of shards to partition the pairs
+                                into.
+    :return:                    The path to the job file.
+    """
+    functions = sorted({function
+                        for function_pair in function_pairs
+                        for function in function_pair})
+    indices = {function: index for index, function in enumerate(functions)}
+    pairs = numpy.array([(indices[function_1], indices[function_2])
+                         for function_1, function_2 in function_pairs],
+                        dtype=numpy.uint32).reshape(-1, 2)
+
+    os.makedirs(directory, exist_ok=True)
+    job_path = os.path.join(directory, uuid.uuid4().hex + JOB_SUFFIX)
+    _dump(job_path, {'functions': functions,
+                     'pairs': pairs,
+                     'difference_function': difference_function,
+                     'shard_count': shard_count})
+    return job_path
+
+
+def evaluate_shard(job_path, shard, processes=1, job=None):
+    """
+    Evaluates the pairs of a shard and writes their differences.
+
+    :param job_path:  The path to the job file.
+    :param shard:     The index of the shard.
+    :param processes: The number of local worker processes.
+    :param job:       The loaded job, it is loaded from the job file if
+                      omitted.
+    """
+    job = job or _load(job_path)
+    functions = job['functions']
+    function_pairs = [(functions[first], functions[second])
+                      for first, second
+                      in job['pairs'][shard::job['shard_count']]]
+    differences = numpy.array(
+        [difference for _, _, difference in get_differences(
+            function_pairs, job['difference_function'], processes)],
+        dtype=float)
+    _dump(_get_shard_path(job_path, shard, 'result'), differences)
+
+
+def work_on_job(job_path, processes=1):
+    """
+    Claims and evaluates shards of the job until all are claimed.
+
+    :param job_path:  The path to the job file.
+    :param processes: The number of local worker processes.
+    :return:          The number of shards evaluated.
+    """
+    try:
+        job = _load(job_path)
+    except FileNotFoundError:
+        # The job was finished and removed meanwhile
+        return 0
+
+    evaluated = 0
+    for shard in range(job['shard_count']):
+        claim_path = _get_shard_path(job_path, shard, 'claim')
+        try:
+            if not _claim(job_path, shard):
+                continue
+            if not os.path.exists(job_path):
+                # The coordinator evaluated the remaining shards itself
+                _remove(claim_path)
+                break
+
+            with _heartbeat(claim_path):
+                evaluate_shard(job_path, shard, processes, job)
+        except FileNotFoundError:
+            # The job was cancelled and its files or directory removed
+            _remove(claim_path)
+            break
+
+        if not os.path.exists(job_path):
+            # The job was finished or cancelled meanwhile, nobody reads the
+            # result anymore.
+            _remove(_get_shard_path(job_path, shard, 'result'))
+            _remove(claim_path)
+            break
+        evaluated += 1
+    return evaluated
+
+
+def work(directory, processes=1, wait=0, poll_interval=1):
+    """
+    Works on all jobs in the directory, waiting for jobs to appear.
+
+    :param directory:     The shared directory.
+    :param processes:     The number of local worker processes.
+    :param wait:          Seconds to wait for new jobs after the last one.
+    :param poll_interval: Seconds between looking for new jobs.
+    :return:              The number of shards evaluated.
+    """
+    evaluated = 0
+    deadline = time.monotonic() + wait
+    while True:
+        for job_path in sorted(glob.glob(os.path.join(directory,
+                                                      '*' + JOB_SUFFIX))):
+            shards = work_on_job(job_path, processes)
+            if shards:
+                evaluated += shards
+                deadline = time.monotonic() + wait
+
+        if time.monotonic() >= deadline:
+            return evaluated
+        time.sleep(poll_interval)
+
+
+def evaluate_sharded(directory,
+                     function_pairs,
+                     difference_function,
+                     shard_count,
+                     processes=1,
+                     timeout=60,
+                     poll_interval=1):
+    """
+    Evaluates the function pairs in shards together with the workers working
+    on the given directory.
+
+    :param directory:           The shared directory.
+    :param function_pairs:      A list of function pairs.
+    :param difference_function: A picklable function taking a function pair
+                                and returning a tuple of both functions and
+                                their difference.
+    :param shard_count:         The number of shards.
+    :param processes:           The number of local worker processes.
+    :param timeout:             Seconds a claim of another worker may go
+                                without being refreshed before its shard is
+                                evaluated here. Has to be well above
+                                ``HEARTBEAT_INTERVAL``.
+    :param poll_interval:       Seconds between looking for results.
+    :return:                    A list of tuples of both functions and their
+                                difference in the order of the pairs.
+    """
+    job_path = write_job(directory, function_pairs, difference_function,
+                         shard_count)
+    try:
+        work_on_job(job_path, processes)
+
+        missing = set(range(shard_count))
+        # Maps shards to the last modification time seen of their claim and
+        # when it was seen first
+        claims = {}
+        while missing:
+            missing = {shard for shard in missing
+                       if not os.path.exists(_get_shard_path(job_path,
+                                                             shard,
+                                                             'result'))}
+            now = time.monotonic()
+            for shard in sorted(missing):
+                mtime = _get_mtime(_get_shard_path(job_path, shard, 'claim'))
+                if shard not in claims or claims[shard][0] != mtime:
+                    claims[shard] = mtime, now
+                elif now - claims[shard][1] >= timeout:
+                    # The worker died or lost access to the directory
+                    evaluate_shard(job_path, shard, processes)
+                    missing.remove(shard)
+            if missing:
+                time.sleep(poll_interval)
+
+        differences = numpy.empty(len(function_pairs))
+        for shard in range(shard_count):
+            differences[shard::shard_count] = _load(
+                _get_shard_path(job_path, shard, 'result'))
+    finally:
+        # Workers stop claiming shards once the job is removed. Their
+        # temporary files are left to them, they may still be written.
+        _remove(job_path)
+        for shard in range(shard_count):
+            _remove(_get_shard_path(job_path, shard, 'claim'))
+            _remove(_get_shard_path(job_path, shard, 'result'))
+
+    return [(function_1, function_2, float(difference))
+            for (function_1, function_2), difference
+            in zip(function_pairs, differences)]
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(
+        description='Evaluates shards of clone detection jobs written to a '
+                    'shared directory by ClangFunctionDifferenceBear.')
+    parser.add_argument('directory', help='the shared directory')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help='number of local worker processes')
+    parser.add_argument('--wait', type=float, default=0,
+                        help='seconds to wait for new jobs')
+    args = parser.parse_args(args)
+
+    print('Evaluated {} shards.'.format(
+        work(args.directory, args.processes, args.wait)))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,11 @@
+import gzip
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from os.path import abspath, dirname, join
 from urllib.parse import urlparse
 
+import requests
+
 from bears.general.URLHeadBear import URLHeadBear
 from coalib.bears.LocalBear import LocalBear
 from coalib.results.Result import Result
@@ -8,6 +14,35 @@ from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
 from coalib.results.Diff import Diff
 from coalib.settings.Setting import typed_dict
 
+hsts_preload_file = join(dirname(abspath(__file__)), 'hsts_preload.txt.gz')
+
+
+@lru_cache(maxsize=1)
+def load_hsts_preload(path=hsts_preload_file):
+    """
+    Loads a snapshot of the HSTS preload list of Chromium.
+
+    The shipped snapshot is of January 2025, it is generated from the list in
+    the Chromium sources by ``.ci/generate_hsts_preload.py``.
+
+    The file lists one host per line. Hosts whose subdomains are preloaded
+    as well are prefixed with a dot.
+
+    :param path: The path to the gzipped list.
+    :return:     A tuple of the set of all preloaded hosts and the set of
+                 the hosts whose subdomains are preloaded.
+    """
+    hosts = set()
+    domains = set()
+    with gzip.open(path, 'rt', encoding='ascii') as file:
+        for line in file:
+            host = line.strip()
+            if host.startswith('.'):
+                host = host[1:]
+                domains.add(host)
+            hosts.add(host)
+    return hosts, domains
+
 
 class HTTPSBear(LocalBear):
     DEFAULT_TIMEOUT = 15
@@ -21,15 +56,68 @@ class HTTPSBear(LocalBear):
     HTTPS_PREFIX = 'https'
     HTTP_PREFIX = 'http'
 
+    # Maps hosts to whether they serve https, shared by all runs in this
+    # process so every host is probed only once. Hosts that couldn't be
+    # reached are left out and probed again by the next run.
+    https_hosts = {}
+
+    @staticmethod
+    def is_hsts_preloaded(host):
+        """
+        Checks if browsers are told to use https for the given host by the
+        snapshot of the HSTS preload list shipped with this bear.
+
+        :param host: The host, optionally including a port.
+        :return:     True if the host is on the HSTS preload list.
+        """
+        hostname = urlparse('//' + host).hostname
+        if not hostname:
+            return False
+
+        hosts, domains = load_hsts_preload()
+        if hostname in hosts:
+            return True
+        labels = hostname.split('.')
+        return any('.'.join(labels[index:]) in domains
+                   for index in range(1, len(labels)))
+
+    def probe_https(self, https_link, timeout):
+        """
+        Checks if the given https link is valid, i.e. responds with a 2xx
+        code. The request is sent with the rate limiter configured for
+        ``URLHeadBear`` in the section.
+
+        :return: None if the host couldn't be reached because of a timeout
+                 or connection error, else whether the link is valid.
+        """
+        https_response = URLHeadBear.get_head_response(
+            https_link, timeout,
+            rate_limiter=URLHeadBear.get_rate_limiter(self.section))
+        # An SSL error is a connection error too, but the host is reachable
+        if (isinstance(https_response, (requests.exceptions.Timeout,
+                                        requests.exceptions.ConnectionError))
+                and not isinstance(https_response,
+                                   requests.exceptions.SSLError)):
+            return None
+        try:
+            https_code = https_response.status_code
+        except AttributeError:
+            return False
+
+        return bool(https_code) and 200 <= https_code < 300
+
     def run(self, filename, file, dependency_results=dict(),
-            network_timeout: typed_dict(str, int, DEFAULT_TIMEOUT) = dict()):
+            network_timeout: typed_dict(str, int, DEFAULT_TIMEOUT) = dict(),
+            use_hsts_preload: bool = True,
+            max_concurrent_probes: int = 8):
         """
         Find http links in any text file and check if the https version of
         link is valid. If so, an option is provided for replacing them with
         https.
 
         An https link is considered valid if the server responds with a 2xx
-        code.
+        code. Only one link per host is checked, if it is valid https is
+        suggested for all links to that host.
 
         Warning: This bear will make HEAD requests to all URLs mentioned in
         your codebase, which can potentially be destructive. As an example,
@@ -45,7 +133,19 @@ class HTTPSBear(LocalBear):
                                       '*'. The timeout of all the websites not
                                       in the dict will be the value of the key
                                       '*'.
+        :param use_hsts_preload:      Set to true to suggest https for hosts
+                                      on the HSTS preload list of browsers
+                                      without making any request.
+        :param max_concurrent_probes: Maximum number of hosts checked
+                                      concurrently.
         """
+        network_timeout = {
+            urlparse(url).netloc if not url == '*' else '*': timeout
+            for url, timeout in network_timeout.items()}
+
+        http_links = []
+        preloaded_hosts = set()
+        probe_links = {}
         for result in dependency_results.get(URLHeadBear.name, []):
             line_number, link, code, context = result.contents
             if link.startswith(self.HTTPS_PREFIX):
@@ -53,23 +153,45 @@ class HTTPSBear(LocalBear):
 
             https_link = self.HTTPS_PREFIX + link[len(self.HTTP_PREFIX):]
             host = urlparse(https_link).netloc
-            network_timeout = {
-                urlparse(url).netloc if not url == '*' else '*': timeout
-                for url, timeout in network_timeout.items()}
-            https_response = URLHeadBear.get_head_response(
-                https_link,
-                network_timeout.get(host)
-                if host in network_timeout
-                else network_timeout.get('*')
-                if '*' in network_timeout
-                else HTTPSBear.DEFAULT_TIMEOUT)
-
-            try:
-                https_code = https_response.status_code
-            except AttributeError:  # pragma: no cover
+            http_links.append((line_number, link, host))
+
+            # Preloaded hosts are kept out of https_hosts, which other runs
+            # share regardless of their use_hsts_preload setting.
+            if use_hsts_preload and self.is_hsts_preloaded(host):
+                preloaded_hosts.add(host)
+                continue
+            if host in self.https_hosts:
                 continue
 
-            if not https_code or not 200 <= https_code < 300:
+            # Prefer probing a link that works with http, an invalid one
+            # tells nothing about the host.
+            http_valid = bool(code) and 200 <= code < 300
+            if host not in probe_links or (http_valid and
+                                           not probe_links[host][1]):
+                probe_links[host] = (https_link, http_valid)
+
+        probed_hosts = {}
+        if probe_links:
+            hosts = list(probe_links)
+            timeouts = [network_timeout.get(host)
+                        if host in network_timeout
+                        else network_timeout.get('*')
+                        if '*' in network_timeout
+                        else HTTPSBear.DEFAULT_TIMEOUT
+                        for host in hosts]
+            with ThreadPoolExecutor(
+                    max(1, min(max_concurrent_probes, len(hosts)))) as pool:
+                probed_hosts.update(zip(hosts, pool.map(
+                    self.probe_https,
+                    [probe_links[host][0] for host in hosts],
+                    timeouts)))
+            self.https_hosts.update((host, valid)
+                                    for host, valid in probed_hosts.items()
+                                    if valid is not None)
+
+        for line_number, link, host in http_links:
+            if (host not in preloaded_hosts and
+                    not self.https_hosts.get(host, probed_hosts.get(host))):
                 continue
 
             diff = Diff(file)
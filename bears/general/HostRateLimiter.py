@@ -0,0 +1,312 @@
+"""
+Utilities to throttle the HTTP requests the link checking bears make.
+
+Requests are throttled per host with a token bucket, rate limited responses
+(HTTP 429 or 503 with a ``Retry-After`` header) are retried with exponential
+backoff and hosts that keep failing to connect are skipped for a while by a
+circuit breaker, so that a single unreachable host does not make the whole
+run wait for its timeouts.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from urllib.parse import urlparse
+
+import requests
+
+
+class HostUnavailableError(requests.exceptions.ConnectionError):
+
+    def __init__(self, host):
+        requests.exceptions.ConnectionError.__init__(
+            self, 'Skipping request, ' + host + ' failed to respond '
+                  'repeatedly.')
+        self.host = host
+
+
+class TokenBucket:
+    """
+    A token bucket holding up to ``capacity`` tokens, refilled with ``rate``
+    tokens per second.
+    """
+
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        """
+        :param rate:     Tokens added to the bucket per second.
+        :param capacity: Maximum number of tokens, i.e. the allowed burst.
+        :param clock:    A function returning the current time in seconds.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._last_refill = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def take(self):
+        """
+        Takes one token out of the bucket.
+
+        :return: The number of seconds to wait until a token is available,
+                 0 if the token was taken.
+        """
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+
+class CircuitBreaker:
+    """
+    Counts consecutive connection failures and opens after
+    ``failure_threshold`` of them. While open, no requests are allowed until
+    ``reset_timeout`` seconds have passed, then a single trial request is let
+    through which closes the breaker again on success.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout, clock=time.monotonic):
+        """
+        :param failure_threshold: Number of consecutive failures opening the
+                                  breaker.
+        :param reset_timeout:     Seconds to wait before allowing a trial
+                                  request to an open breaker.
+        :param clock:             A function returning the current time in
+                                  seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._clock = clock
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def allow_request(self):
+        """
+        :return: True if a request may be sent.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._clock() - self._opened_at >= self.reset_timeout:
+                # Half open: let one trial request through, opening the
+                # breaker again right away if it fails.
+                self._opened_at = None
+                self.failures = self.failure_threshold - 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+
+
+def parse_retry_after(value, now=time.time):
+    """
+    Parses the value of a ``Retry-After`` header.
+
+    >>> parse_retry_after('120')
+    120.0
+    >>> parse_retry_after('soon') is None
+    True
+
+    :param value: The header value, either seconds or an HTTP date.
+    :param now:   A function returning the current unix time, used to convert
+                  HTTP dates.
+    :return:      The number of seconds to wait or None if the value is
+                  invalid.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date is None:  # pragma: no cover
+        return None
+    return max(0.0, date.timestamp() - now())
+
+
+class HostRateLimiter:
+    """
+    Sends HTTP requests, throttled per host.
+
+    Every host gets its own ``TokenBucket`` and ``CircuitBreaker``. The
+    limiter is thread safe so it can be shared by concurrent probes.
+    """
+
+    DEFAULT_RATE = 10
+    DEFAULT_BURST = 20
+    DEFAULT_MAX_RETRIES = 3
+    DEFAULT_BACKOFF_FACTOR = 0.5
+    DEFAULT_MAX_BACKOFF = 60
+    DEFAULT_FAILURE_THRESHOLD = 5
+    DEFAULT_RESET_TIMEOUT = 300
+
+    RETRY_STATUS_CODES = (429, 503)
+
+    def __init__(self,
+                 rate=DEFAULT_RATE,
+                 burst=DEFAULT_BURST,
+                 max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_factor=DEFAULT_BACKOFF_FACTOR,
+                 max_backoff=DEFAULT_MAX_BACKOFF,
+                 failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout=DEFAULT_RESET_TIMEOUT,
+                 clock=time.monotonic,
+                 sleep=time.sleep):
+        """
+        :param rate:              Requests per second allowed per host.
+        :param burst:             Number of requests that may be sent to a
+                                  host at once before throttling.
+        :param max_retries:       How often a rate limited request is
+                                  retried.
+        :param backoff_factor:    Base of the exponential backoff in seconds,
+                                  used if the server sends no valid
+                                  ``Retry-After`` header.
+        :param max_backoff:       Maximum number of seconds to wait before a
+                                  retry. Responses asking for longer waits
+                                  are returned as they are.
+        :param failure_threshold: Number of consecutive connection failures
+                                  after which a host is skipped.
+        :param reset_timeout:     Seconds after which a skipped host is tried
+                                  again.
+        :param clock:             A function returning the current time in
+                                  seconds.
+        :param sleep:             A function to wait the given seconds.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets = {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_host(url):
+        return urlparse(url).netloc.lower()
+
+    def _get_host_state(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(
+                    self.rate, self.burst, self._clock)
+                self._breakers[host] = CircuitBreaker(
+                    self.failure_threshold, self.reset_timeout, self._clock)
+            return self._buckets[host], self._breakers[host]
+
+    def is_available(self, url):
+        """
+        :return: False if requests to the host of ``url`` are currently
+                 skipped because it failed to respond repeatedly.
+        """
+        return not self._get_host_state(self.get_host(url))[1].is_open
+
+    def _throttle(self, bucket):
+        wait = bucket.take()
+        while wait:
+            self._sleep(wait)
+            wait = bucket.take()
+
+    def _get_backoff(self, response, attempt):
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        if retry_after is None:
+            if response.status_code != 429:
+                # A 503 without Retry-After is just a broken server.
+                return None
+            retry_after = self.backoff_factor * 2 ** attempt
+        return retry_after if retry_after <= self.max_backoff else None
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends a request using the function of the ``requests`` module with the
+        same name as ``method``.
+
+        :param method: The HTTP method, e.g. ``'head'``.
+        :param url:    The URL to request.
+        :param kwargs: Passed to the ``requests`` function.
+        :return:       The ``requests.Response`` object.
+        :raises HostUnavailableError:
+                       If the host failed to respond repeatedly.
+        :raises requests.exceptions.RequestException:
+                       If the request fails.
+        """
+        host = self.get_host(url)
+        bucket, breaker = self._get_host_state(host)
+
+        attempt = 0
+        while True:
+            if not breaker.allow_request():
+                raise HostUnavailableError(host)
+
+            self._throttle(bucket)
+            try:
+                response = getattr(requests, method)(url, **kwargs)
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout):
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+
+            if (response.status_code not in self.RETRY_STATUS_CODES or
+                    attempt >= self.max_retries):
+                return response
+
+            backoff = self._get_backoff(response, attempt)
+            if backoff is None:
+                return response
+
+            self._sleep(backoff)
+            attempt += 1
+
+    def head(self, url, **kwargs):
+        return self.request('head', url, **kwargs)
+
+
+@lru_cache()
+def _get_host_rate_limiter(rate, burst, max_retries, failure_threshold):
+    return HostRateLimiter(rate=rate,
+                           burst=burst,
+                           max_retries=max_retries,
+                           failure_threshold=failure_threshold)
+
+
+def get_host_rate_limiter(rate=HostRateLimiter.DEFAULT_RATE,
+                          burst=HostRateLimiter.DEFAULT_BURST,
+                          max_retries=HostRateLimiter.DEFAULT_MAX_RETRIES,
+                          failure_threshold=(
+                              HostRateLimiter.DEFAULT_FAILURE_THRESHOLD)):
+    """
+    Retrieves the ``HostRateLimiter`` shared by all link bears in this
+    process that uses the given configuration.
+    """
+    return _get_host_rate_limiter(rate, burst, max_retries, failure_threshold)
@@ -1,5 +1,3 @@
-import requests
-
 from difflib import SequenceMatcher
 
 from bears.general.URLHeadBear import URLHeadBear
@@ -41,6 +39,8 @@ class InvalidLinkBear(LocalBear):
         :param dependency_results: Results given by URLBear.
         :param follow_redirects: Set to true to autocorrect redirects.
         """
+        rate_limiter = (URLHeadBear.get_rate_limiter(self.section)
+                        if follow_redirects else None)
         for result in dependency_results.get(URLHeadBear.name, []):
             line_number, link, code, context = result.contents
             if context is context.xml_namespace:
@@ -74,8 +74,8 @@ class InvalidLinkBear(LocalBear):
                         line=line_number,
                         severity=RESULT_SEVERITY.NORMAL)
                 if follow_redirects and 300 <= code < 400:  # HTTP status 30x
-                    redirect_url = requests.head(link,
-                                                 allow_redirects=True).url
+                    redirect_url = rate_limiter.head(
+                        link, allow_redirects=True).url
                     matcher = SequenceMatcher(
                         None, redirect_url, link)
                     if (matcher.real_quick_ratio() > 0.7 and
@@ -1,8 +1,12 @@
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
+from bears.general.HostRateLimiter import get_host_rate_limiter
 from bears.general.URLHeadBear import URLHeadBear
 
 from coalib.bears.LocalBear import LocalBear
+from coalib.misc.CachingUtilities import pickle_dump, pickle_load
 from coalib.results.Result import Result
 from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
 
@@ -21,6 +25,23 @@ class MementoBear(LocalBear):
     CAN_DETECT = {'Documentation'}
     BEAR_DEPS = {URLHeadBear}
 
+    ARCHIVE_CACHE_IDENTIFIER = 'MementoBear_archived_links'
+
+    # The TimeGate asked for mementos of links without a native TimeGate.
+    timegate_uri = 'http://timetravel.mementoweb.org/timegate/'
+
+    # Maps links to the time they were found archived. Loaded from the coala
+    # data directory on first use and shared by all runs in this process.
+    # Only archived links are remembered across runs, a link that is not
+    # archived yet may be archived any time.
+    archived_links = None
+
+    def __init__(self, section, message_queue, timeout=0):
+        LocalBear.__init__(self, section, message_queue, timeout)
+        # Links found not archived by this run, they aren't checked again
+        # for other files.
+        self.unarchived_links = set()
+
     @staticmethod
     def check_archive(mc, link):
         """
@@ -37,17 +58,64 @@ class MementoBear(LocalBear):
         return True
 
     @staticmethod
-    def get_redirect_urls(link):
+    def get_redirect_urls(link, rate_limiter=None):
+        """
+        Retrieves the URLs the link redirects to.
+
+        :param link:         The link to follow.
+        :param rate_limiter: The ``HostRateLimiter`` to send the requests
+                             with. Defaults to the one shared by all link
+                             bears with the default limits.
+        :return:             A list of the URLs of all redirects.
+        """
         urls = []
 
-        resp = requests.head(link, allow_redirects=True)
+        if rate_limiter is None:
+            rate_limiter = get_host_rate_limiter()
+        resp = rate_limiter.head(link, allow_redirects=True)
         for redirect in resp.history:
             urls.append(redirect.url)
 
         return urls
 
+    @classmethod
+    def load_archived_links(cls, cache_ttl):
+        """
+        Loads the archived links cache, dropping entries older than
+        ``cache_ttl`` seconds.
+        """
+        if cls.archived_links is None:
+            cls.archived_links = pickle_load(
+                None, cls.ARCHIVE_CACHE_IDENTIFIER, {})
+
+        expired_before = time.time() - cache_ttl
+        for link, archived_at in list(cls.archived_links.items()):
+            if archived_at < expired_before:
+                del cls.archived_links[link]
+
+        return cls.archived_links
+
+    @classmethod
+    def store_archived_links(cls, new_archived_links):
+        """
+        Adds the links to the archived links cache and writes it to the coala
+        data directory, merged with the links other processes wrote
+        meanwhile.
+
+        :param new_archived_links: A dict mapping links to the time they were
+                                   found archived.
+        """
+        cls.archived_links.update(new_archived_links)
+        stored_links = pickle_load(None, cls.ARCHIVE_CACHE_IDENTIFIER, {})
+        for link, archived_at in stored_links.items():
+            if archived_at > cls.archived_links.get(link, 0):
+                cls.archived_links[link] = archived_at
+        pickle_dump(None, cls.ARCHIVE_CACHE_IDENTIFIER, cls.archived_links)
+
     def run(self, filename, file, dependency_results=dict(),
             follow_redirects: bool = True,
+            max_concurrent_lookups: int = 8,
+            archive_cache_days: int = 30,
             ):
         """
         Find links in any text file and check if they are archived.
@@ -63,19 +131,68 @@ class MementoBear(LocalBear):
         `do_not_ever_open = 'https://api.acme.inc/delete-all-data'` wiping out
         all your data.
 
-        :param dependency_results: Results given by URLHeadBear.
-        :param follow_redirects:   Set to true to check all redirect urls.
+        :param dependency_results:     Results given by URLHeadBear.
+        :param follow_redirects:       Set to true to check all redirect urls.
+        :param max_concurrent_lookups: Maximum number of archive lookups and
+                                       redirect resolutions done
+                                       concurrently.
+        :param archive_cache_days:     Number of days an archived link is
+                                       remembered without checking it again.
+                                       Set to 0 to always check all links.
         """
-        self._mc = MementoClient()
+        self._mc = MementoClient(timegate_uri=self.timegate_uri)
 
+        links = []
+        redirected_links = set()
         for result in dependency_results.get(URLHeadBear.name, []):
             line_number, link, code, context = result.contents
 
             if not (code and 200 <= code < 400):
                 continue
 
-            status = MementoBear.check_archive(self._mc, link)
-            if not status:
+            links.append((line_number, link))
+            if follow_redirects and 300 <= code < 400:  # HTTP status 30x
+                redirected_links.add(link)
+
+        if not links:
+            return
+
+        archived_links = self.load_archived_links(
+            archive_cache_days * 24 * 60 * 60)
+        workers = max(1, max_concurrent_lookups)
+
+        with ThreadPoolExecutor(workers) as pool:
+            redirected_links = sorted(redirected_links)
+            get_redirect_urls = partial(
+                MementoBear.get_redirect_urls,
+                rate_limiter=(URLHeadBear.get_rate_limiter(self.section)
+                              if redirected_links else None))
+            redirect_urls = dict(zip(
+                redirected_links,
+                pool.map(get_redirect_urls, redirected_links)))
+
+            unchecked_links = {link for _, link in links}
+            unchecked_links.update(*redirect_urls.values())
+            unchecked_links = sorted(unchecked_links - set(archived_links) -
+                                     self.unarchived_links)
+            statuses = dict(zip(
+                unchecked_links,
+                pool.map(lambda link: MementoBear.check_archive(self._mc,
+                                                                link),
+                         unchecked_links)))
+
+        self.unarchived_links.update(link
+                                     for link, status in statuses.items()
+                                     if not status)
+        now = time.time()
+        new_archived_links = {link: now
+                              for link, status in statuses.items()
+                              if status}
+        if archive_cache_days > 0 and new_archived_links:
+            self.store_archived_links(new_archived_links)
+
+        for line_number, link in links:
+            if link in self.unarchived_links:
                 yield Result.from_values(
                     self,
                     ('This link is not archived yet, visit '
@@ -86,19 +203,15 @@ class MementoBear(LocalBear):
                     severity=RESULT_SEVERITY.INFO
                 )
 
-            if follow_redirects and 300 <= code < 400:  # HTTP status 30x
-                redirect_urls = MementoBear.get_redirect_urls(link)
-
-                for url in redirect_urls:
-                    status = MementoBear.check_archive(self._mc, url)
-                    if not status:
-                        yield Result.from_values(
-                            self,
-                            ('This link redirects to %s and not archived yet, '
-                             'visit https://web.archive.org/save/%s to get it '
-                             'archived.'
-                             % (url, url)),
-                            file=filename,
-                            line=line_number,
-                            severity=RESULT_SEVERITY.INFO
-                        )
+            for url in redirect_urls.get(link, []):
+                if url in self.unarchived_links:
+                    yield Result.from_values(
+                        self,
+                        ('This link redirects to %s and not archived yet, '
+                         'visit https://web.archive.org/save/%s to get it '
+                         'archived.'
+                         % (url, url)),
+                        file=filename,
+                        line=line_number,
+                        severity=RESULT_SEVERITY.INFO
+                    )
@@ -1,4 +1,6 @@
+import os
 import re
+from functools import lru_cache
 
 from aenum import Flag
 
@@ -9,11 +11,150 @@ from coalib.settings.Setting import typed_list
 from coalib.results.HiddenResult import HiddenResult
 from coalib.results.Result import Result
 from coalib.results.SourceRange import SourceRange
-from coalib.parsing.Globbing import fnmatch
+from coalib.parsing.Globbing import translate
 from coala_utils.decorators import (enforce_signature, generate_ordering,
                                     generate_repr)
 
 
+URL_REGEX = re.compile(
+    r"""
+    ((git\+|bzr\+|svn\+|hg\+|)  # For VCS URLs
+    https?://                   # http:// or https:// as only these
+                                # are supported by the ``requests``
+                                # library
+    [^.:%\s_/?#[\]@\\]+         # Initial part of domain
+    \.                          # A required dot `.`
+    (
+        ((?:%[A-Fa-f0-9][A-Fa-f0-9])*[^\s()%\'"`<>|\\\[\]]+)
+                                # Path name
+                                # This part allows precentage
+                                # encoding like %3F
+                                # and does not allow
+                                # any parenthesis: balanced or
+                                # unbalanced.
+    |                           # OR
+        \((?:%[A-Fa-f0-9][A-Fa-f0-9])*[^\s()%\'"`<>|\\\[\]]*\)
+                                # Path name contained within ()
+                                # This part allows path names that
+                                # are explicitly enclosed within one
+                                # set of parenthesis.
+                                # An example can be:
+                                # http://wik.org/Hello_(Adele_song)/200
+    )
+    *)
+                                # Thus, the whole part above
+                                # prevents matching of
+                                # Unbalanced parenthesis
+    (?<!\.)(?<!,)               # Exclude trailing `.` or `,` from URL
+    """, re.VERBOSE)
+
+XMLNS_REGEX = re.compile(r'xmlns:?\w*="(.*)"')
+
+# Inline flags ``translate`` puts in front of every regex it creates.
+_GLOB_REGEX_FLAGS = '(?ms)'
+
+
+# The following helpers split globs into their alternatives the same way
+# ``coalib.parsing.Globbing`` does, which doesn't make them public.
+
+def _end_of_set_index(glob, start_index):
+    """
+    Returns the index of the bracket closing the set of the glob starting at
+    ``start_index``, right behind the opening bracket.
+    """
+    length = len(glob)
+    closing_index = start_index
+    if closing_index < length and glob[closing_index] == '!':
+        closing_index += 1
+    # The set can't be closed by a bracket here
+    if closing_index < length:
+        closing_index += 1
+    while closing_index < length and glob[closing_index] != ']':
+        closing_index += 1
+    return closing_index
+
+
+def _position_is_bracketed(glob, position):
+    """
+    Checks if the character at the position is inside a set of the glob and
+    therefore loses its special meaning.
+    """
+    position = len(glob[:position])
+    index, length = 0, len(glob)
+    while index < position:
+        char = glob[index]
+        index += 1
+        if char == '[':
+            closing_index = _end_of_set_index(glob, index)
+            if closing_index >= length:
+                return False
+            if index <= position < closing_index:
+                return True
+            index = closing_index + 1
+    return False
+
+
+def _iter_alternatives(glob):
+    """
+    Iterates through all globs without alternatives the glob matches the
+    union of, e.g. ``a(b|c)`` yields ``ab`` and ``ac``.
+    """
+    # The leftmost closing and the rightmost opening parenthesis left of it
+    # belong together and are the innermost ones.
+    end_pos = next((match.start() for match in re.finditer(r'\)', glob)
+                    if not _position_is_bracketed(glob, match.start())),
+                   None)
+    start_pos = None
+    for match in re.finditer(r'\(', glob[:end_pos]):
+        if not _position_is_bracketed(glob, match.start()):
+            start_pos = match.end()
+
+    if None in (start_pos, end_pos):
+        yield glob
+        return
+
+    choices = glob[start_pos:end_pos]
+    split_positions = [match.start() for match in re.finditer(r'\|', choices)
+                       if not _position_is_bracketed(choices, match.start())]
+    seen = set()
+    for start, end in zip([-1] + split_positions,
+                          split_positions + [len(choices)]):
+        choice = choices[start + 1:end]
+        if choice in seen:
+            continue
+        seen.add(choice)
+        yield from _iter_alternatives(
+            glob[:start_pos - 1] + choice + glob[end_pos + 1:])
+
+
+@lru_cache()
+def compile_globs(globs):
+    """
+    Compiles the given globs into one regex object. Its ``match`` method
+    matches a string normalized with ``os.path.normcase`` if
+    ``coalib.parsing.Globbing.fnmatch`` would match the string with these
+    globs.
+
+    :param globs: A tuple of glob strings.
+    :return:      A compiled regex object.
+    """
+    if not globs:
+        # fnmatch matches everything if no globs are given
+        return re.compile('')
+
+    regexes = []
+    for glob in globs:
+        for alternative in _iter_alternatives(glob):
+            regex = translate(os.path.normcase(os.path.expanduser(
+                alternative)))
+            # Flags are only allowed at the start of the combined regex
+            if regex.startswith(_GLOB_REGEX_FLAGS):
+                regex = regex[len(_GLOB_REGEX_FLAGS):]
+            regexes.append('(?:' + regex + ')')
+
+    return re.compile('|'.join(regexes), re.MULTILINE | re.DOTALL)
+
+
 class LINK_CONTEXT(Flag):
     no_context = 0
     xml_namespace = 1
@@ -71,53 +212,37 @@ class URLBear(LocalBear):
     @staticmethod
     def extract_links_from_file(file, link_ignore_regex, link_ignore_list):
         link_ignore_regex = re.compile(link_ignore_regex)
-        regex = re.compile(
-            r"""
-            ((git\+|bzr\+|svn\+|hg\+|)  # For VCS URLs
-            https?://                   # http:// or https:// as only these
-                                        # are supported by the ``requests``
-                                        # library
-            [^.:%\s_/?#[\]@\\]+         # Initial part of domain
-            \.                          # A required dot `.`
-            (
-                ((?:%[A-Fa-f0-9][A-Fa-f0-9])*[^\s()%\'"`<>|\\\[\]]+)
-                                        # Path name
-                                        # This part allows precentage
-                                        # encoding like %3F
-                                        # and does not allow
-                                        # any parenthesis: balanced or
-                                        # unbalanced.
-            |                           # OR
-                \((?:%[A-Fa-f0-9][A-Fa-f0-9])*[^\s()%\'"`<>|\\\[\]]*\)
-                                        # Path name contained within ()
-                                        # This part allows path names that
-                                        # are explicitly enclosed within one
-                                        # set of parenthesis.
-                                        # An example can be:
-                                        # http://wik.org/Hello_(Adele_song)/200
-            )
-            *)
-                                        # Thus, the whole part above
-                                        # prevents matching of
-                                        # Unbalanced parenthesis
-            (?<!\.)(?<!,)               # Exclude trailing `.` or `,` from URL
-            """, re.VERBOSE)
+        link_ignore_glob = compile_globs(
+            (link_ignore_list,) if isinstance(link_ignore_list, str)
+            else tuple(link_ignore_list))
+        ignored_links = {}
         file_context = {}
         for line_number, line in enumerate(file):
-            xmlns_regex = re.compile(r'xmlns:?\w*="(.*)"')
-            for match in re.findall(regex, line):
+            # Every link contains the scheme separator, most lines don't.
+            if '://' not in line:
+                continue
+            xmlns_links = None
+            for match in URL_REGEX.findall(line):
                 link = match[0]
                 link_context = file_context.get(link)
                 if not link_context:
                     link_context = LINK_CONTEXT.no_context
-                    xmlns_match = xmlns_regex.search(line)
-                    if xmlns_match and link in xmlns_match.groups():
+                    if xmlns_links is None:
+                        xmlns_match = XMLNS_REGEX.search(line)
+                        xmlns_links = (xmlns_match.groups() if xmlns_match
+                                       else ())
+                    if link in xmlns_links:
                         link_context |= LINK_CONTEXT.xml_namespace
                     if link.startswith(('hg+', 'bzr+', 'git+', 'svn+')):
                         link_context |= LINK_CONTEXT.pip_vcs_url
                     file_context[link] = link_context
-                if not (link_ignore_regex.search(link) or
-                        fnmatch(link, link_ignore_list)):
+                ignored = ignored_links.get(link)
+                if ignored is None:
+                    ignored = bool(link_ignore_regex.search(link) or
+                                   link_ignore_glob.match(
+                                       os.path.normcase(link)))
+                    ignored_links[link] = ignored
+                if not ignored:
                     yield link, line_number, link_context
 
     def analyze_links_in_file(self, file, link_ignore_regex,
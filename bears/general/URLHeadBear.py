@@ -1,6 +1,9 @@
+import os
 import requests
 from urllib.parse import urlparse
 
+from bears.general.HostRateLimiter import (HostRateLimiter,
+                                           get_host_rate_limiter)
 from bears.general.URLBear import URLBear, LINK_CONTEXT
 
 from coalib.bears.LocalBear import LocalBear
@@ -69,8 +72,11 @@ class URLHeadBear(LocalBear):
     LICENSE = 'AGPL-3.0'
     CAN_DETECT = {'Documentation'}
 
-    # IP Address of www.google.com
-    check_connection_url = 'http://216.58.218.174'
+    # IP Address of www.google.com, set the COALA_CHECK_CONNECTION_URL
+    # environment variable to check the connection to another server, e.g.
+    # when running offline against a local server.
+    check_connection_url = os.environ.get('COALA_CHECK_CONNECTION_URL',
+                                          'http://216.58.218.174')
 
     @classmethod
     def check_prerequisites(cls):
@@ -80,17 +86,55 @@ class URLHeadBear(LocalBear):
                 if isinstance(head_resp, Exception) else True)
 
     @staticmethod
-    def get_head_response(url, timeout):
+    def get_head_response(url, timeout, rate_limiter=None):
+        """
+        Sends a HEAD request to the given URL.
+
+        :param url:          The URL to request.
+        :param timeout:      The timeout of the request in seconds.
+        :param rate_limiter: The ``HostRateLimiter`` to send the request
+                             with. Defaults to the one shared by all link
+                             bears.
+        :return:             The ``requests.models.Response`` object or the
+                             exception raised while sending the request.
+        """
+        if rate_limiter is None:
+            rate_limiter = get_host_rate_limiter()
         try:
-            head_resp = requests.head(url, allow_redirects=False,
-                                      timeout=timeout)
+            head_resp = rate_limiter.head(url, allow_redirects=False,
+                                          timeout=timeout)
             return head_resp
         except requests.exceptions.RequestException as exc:
             return exc
 
+    @classmethod
+    def get_rate_limiter(cls, section):
+        """
+        Retrieves the ``HostRateLimiter`` configured by the settings of this
+        bear in the given section, so bears depending on it send their own
+        requests with the same limits.
+
+        :param section: The section the bear runs in.
+        :return:        The shared ``HostRateLimiter`` for these settings.
+        """
+        # Only contains the settings given in the section
+        params = cls.get_metadata().create_params_from_section(section)
+        return get_host_rate_limiter(
+            params.get('host_request_rate', HostRateLimiter.DEFAULT_RATE),
+            params.get('host_request_burst', HostRateLimiter.DEFAULT_BURST),
+            params.get('max_request_retries',
+                       HostRateLimiter.DEFAULT_MAX_RETRIES),
+            params.get('host_failure_threshold',
+                       HostRateLimiter.DEFAULT_FAILURE_THRESHOLD))
+
     @deprecate_settings(network_timeout=('timeout', lambda t: {'*': t}))
     def run(self, filename, file, dependency_results=dict(),
             network_timeout: typed_dict(str, int, DEFAULT_TIMEOUT) = dict(),
+            host_request_rate: float = HostRateLimiter.DEFAULT_RATE,
+            host_request_burst: int = HostRateLimiter.DEFAULT_BURST,
+            max_request_retries: int = HostRateLimiter.DEFAULT_MAX_RETRIES,
+            host_failure_threshold: int = (
+                HostRateLimiter.DEFAULT_FAILURE_THRESHOLD),
             ):
         """
         Find links in any text file and tells its head response and
@@ -110,9 +154,27 @@ class URLHeadBear(LocalBear):
                                 '*'. The timeout of all the websites not
                                 in the dict will be the value of the key
                                 '*'.
+        :param host_request_rate:
+            Maximum number of requests per second sent to one host.
+        :param host_request_burst:
+            Number of requests that may be sent to one host at once before
+            the ``host_request_rate`` applies.
+        :param max_request_retries:
+            How often a request is retried when the host responds with HTTP
+            429 (Too Many Requests) or with HTTP 503 and a ``Retry-After``
+            header. The ``Retry-After`` header is respected, else the wait
+            time is doubled on every retry.
+        :param host_failure_threshold:
+            Number of consecutive connection failures after which all further
+            requests to a host fail immediately instead of waiting for the
+            timeout.
         :param link_ignore_regex: A regex for urls to ignore.
         :param link_ignore_list: Comma separated url globs to ignore
         """
+        rate_limiter = get_host_rate_limiter(host_request_rate,
+                                             host_request_burst,
+                                             max_request_retries,
+                                             host_failure_threshold)
         network_timeout = {urlparse(url).netloc
                            if not url == '*' else '*': timeout
                            for url, timeout in network_timeout.items()}
@@ -125,7 +187,8 @@ class URLHeadBear(LocalBear):
                 if host in network_timeout
                 else network_timeout.get('*')
                 if '*' in network_timeout
-                else URLHeadBear.DEFAULT_TIMEOUT)
+                else URLHeadBear.DEFAULT_TIMEOUT,
+                rate_limiter)
 
             yield URLHeadResult(self, result.affected_code, result.link,
                                 head_resp, result.link_context)
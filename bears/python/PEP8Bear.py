@@ -1,6 +1,7 @@
 import autopep8
 import sys
 
+from bears.python.PythonFormatterCache import get_corrected_file
 from coalib.bearlib import deprecate_settings
 from coalib.bearlib.spacing.SpacingHelper import SpacingHelper
 from coalib.bears.LocalBear import LocalBear
@@ -26,6 +27,7 @@ class PEP8Bear(LocalBear):
             pep_ignore: typed_list(str) = (),
             pep_select: typed_list(str) = (),
             local_pep8_config: bool = False,
+            cache_corrections: bool = False,
             ):
         """
         Detects and fixes PEP8 incompliant code. This bear will not change
@@ -39,6 +41,9 @@ class PEP8Bear(LocalBear):
                                   apply.
         :param local_pep8_config: Set to true if autopep8 should use a config
                                   file as if run normally from this directory.
+        :param cache_corrections: Set to true to store the corrected file on
+                                  disk, so unchanged files aren't corrected
+                                  again in the next run.
         """
         if not max_line_length:
             max_line_length = sys.maxsize
@@ -48,9 +53,18 @@ class PEP8Bear(LocalBear):
                    'max_line_length': max_line_length,
                    'indent_size': indent_size}
 
-        corrected = autopep8.fix_code(''.join(file),
-                                      apply_config=local_pep8_config,
-                                      options=options).splitlines(True)
+        def fix(source):
+            return autopep8.fix_code(source,
+                                     apply_config=local_pep8_config,
+                                     options=options).splitlines(True)
+
+        if local_pep8_config:
+            # The config files may change while the file doesn't
+            corrected = fix(''.join(file))
+        else:
+            corrected = get_corrected_file(
+                'PEP8Bear', dict(options, version=autopep8.__version__),
+                file, fix, cache_corrections)
 
         diffs = Diff.from_string_arrays(file, corrected).split_diff()
 
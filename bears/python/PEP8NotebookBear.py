@@ -1,6 +1,11 @@
+import difflib
+import json
+import re
+
 import autopep8
 import nbformat
 
+from bears.python.PythonFormatterCache import get_corrected_file
 from coalib.bearlib.spacing.SpacingHelper import SpacingHelper
 from coalib.bears.LocalBear import LocalBear
 from dependency_management.requirements.PipRequirement import PipRequirement
@@ -62,6 +67,111 @@ def autopep8_fix_code_cell(source, options=None, apply_config=None):
     return source_corrected
 
 
+# nbformat writes the keys of cells with an indentation of three spaces, the
+# items of lists one deeper.
+CELL_SOURCE_REGEX = re.compile(r'   "source": (.*)\n?$')
+CELL_SOURCE_END_REGEX = re.compile(r'   \](,?)\n?$')
+
+
+def get_cell_source_spans(file):
+    """
+    Finds the lines holding the sources of all cells of a notebook written
+    by nbformat.
+
+    :param file: The notebook file contents as list of strings (linewise).
+    :return:     A list of tuples of the first and last line number of the
+                 source of every cell, starting at 1.
+    """
+    spans = []
+    start = None
+    for line_number, line in enumerate(file, start=1):
+        if start is None:
+            match = CELL_SOURCE_REGEX.match(line)
+            if match is None:
+                continue
+            if match.group(1) == '[':
+                start = line_number
+            else:
+                spans.append((line_number, line_number))
+        elif CELL_SOURCE_END_REGEX.match(line):
+            spans.append((start, line_number))
+            start = None
+    return spans
+
+
+def cell_source_to_string_list(source, separator=''):
+    """
+    Writes the source of a cell the way nbformat does.
+
+    :param source:    The source of the cell.
+    :param separator: The character following the closing bracket, i.e. a
+                      comma if more keys follow.
+    :return:          The lines of the source key of the cell.
+    """
+    lines = [json.dumps(line, ensure_ascii=False)
+             for line in source.splitlines(True)]
+    if not lines:
+        return ['   "source": []' + separator + '\n']
+    return (['   "source": [\n'] +
+            ['    ' + line + ',\n' for line in lines[:-1]] +
+            ['    ' + lines[-1] + '\n', '   ]' + separator + '\n'])
+
+
+def add_changes(diff, first_line, original, corrected):
+    """
+    Adds the changes turning the original lines into the corrected ones to
+    the diff, like ``Diff.from_string_arrays`` does for whole files.
+
+    :param diff:       The diff of the whole file.
+    :param first_line: The line number of the first original line.
+    :param original:   The original lines.
+    :param corrected:  The corrected lines.
+    """
+    offset = first_line - 1
+    matcher = difflib.SequenceMatcher(None, original, corrected)
+    for tag, a_index_1, a_index_2, b_index_1, b_index_2 in (
+            matcher.get_opcodes()):
+        if tag == 'delete':
+            diff.delete_lines(offset+a_index_1+1, offset+a_index_2)
+        elif tag == 'insert':
+            diff.add_lines(offset+a_index_1, corrected[b_index_1:b_index_2])
+        elif tag == 'replace':
+            diff.modify_line(offset+a_index_1+1, corrected[b_index_1])
+            diff.add_lines(offset+a_index_1+1,
+                           corrected[b_index_1+1:b_index_2])
+            if a_index_2 > a_index_1+1:
+                diff.delete_lines(offset+a_index_1+2, offset+a_index_2)
+
+
+def get_cell_diff(file, cells, corrected_sources):
+    """
+    Creates a diff changing only the sources of the corrected cells, without
+    writing and comparing the whole notebook.
+
+    :param file:              The notebook file contents as list of strings.
+    :param cells:             The cells of the notebook.
+    :param corrected_sources: A dict mapping the indices of the changed cells
+                              to their corrected sources.
+    :return:                  The diff or None if the notebook isn't written
+                              the way nbformat writes notebooks.
+    """
+    spans = get_cell_source_spans(file)
+    if len(spans) != len(cells):
+        return None
+
+    diff = Diff(file)
+    for index, corrected_source in sorted(corrected_sources.items()):
+        first, last = spans[index]
+        original = file[first-1:last]
+        separator = ',' if original[-1].rstrip('\n').endswith(',') else ''
+        if original != cell_source_to_string_list(cells[index]['source'],
+                                                  separator):
+            return None
+        add_changes(diff, first, original,
+                    cell_source_to_string_list(corrected_source, separator))
+    return diff
+
+
 class PEP8NotebookBear(LocalBear):
     LANGUAGES = {'Python', 'Python 2', 'Python 3'}
     REQUIREMENTS = {PipRequirement('autopep8', '1.2'),
@@ -78,6 +188,7 @@ class PEP8NotebookBear(LocalBear):
             pep_ignore: typed_list(str) = (),
             pep_select: typed_list(str) = (),
             local_pep8_config: bool = False,
+            cache_corrections: bool = False,
             ):
         """
         Detects and fixes PEP8 incompliant code in Jupyter Notebooks. This bear
@@ -90,6 +201,9 @@ class PEP8NotebookBear(LocalBear):
                                   apply.
         :param local_pep8_config: Set to true if autopep8 should use a config
                                   file as if run normally from this directory.
+        :param cache_corrections: Set to true to store the corrected cells on
+                                  disk, so unchanged cells aren't corrected
+                                  again in the next run.
         """
         options = {'ignore': pep_ignore,
                    'select': pep_select,
@@ -98,24 +212,47 @@ class PEP8NotebookBear(LocalBear):
         notebook_node = notebook_node_from_string_list(file)
         cells = notebook_node['cells']
 
-        for cell in cells:
+        def fix(source):
+            return autopep8_fix_code_cell(
+                source,
+                options=options,
+                apply_config=local_pep8_config).splitlines(True)
+
+        corrected_sources = {}
+        for index, cell in enumerate(cells):
             if cell['cell_type'] != 'code':
                 continue
-            cell['source'] = autopep8_fix_code_cell(cell['source'],
-                                                    local_pep8_config,
-                                                    options)
+            lines = cell['source'].splitlines(True)
+            if local_pep8_config:
+                # The config files may change while the cell doesn't
+                corrected = fix(cell['source'])
+            else:
+                corrected = get_corrected_file(
+                    'PEP8NotebookBear',
+                    dict(options, version=autopep8.__version__),
+                    lines, fix, cache_corrections)
+            if list(corrected) != lines:
+                corrected_sources[index] = ''.join(corrected)
+
+        if not corrected_sources:
+            return
 
-        corrected = notebook_node_to_string_list(notebook_node)
+        diff = get_cell_diff(file, cells, corrected_sources)
+        if diff is None:
+            # Not written by nbformat, the whole notebook is compared
+            for index, source in corrected_sources.items():
+                cells[index]['source'] = source
+            corrected = notebook_node_to_string_list(notebook_node)
 
-        # If newline at eof in `file` but not in `corrected`, add
-        # final newline character to `corrected` to make sure this difference
-        # does not pop up in `diffs`.
-        if file[-1].endswith('\n') and not corrected[-1].endswith('\n'):
-            corrected[-1] += '\n'
+            # If newline at eof in `file` but not in `corrected`, add
+            # final newline character to `corrected` to make sure this
+            # difference does not pop up in `diffs`.
+            if file[-1].endswith('\n') and not corrected[-1].endswith('\n'):
+                corrected[-1] += '\n'
 
-        diffs = Diff.from_string_arrays(file, corrected).split_diff()
+            diff = Diff.from_string_arrays(file, corrected)
 
-        for diff in diffs:
+        for diff in diff.split_diff():
             yield Result(self,
                          'The code does not comply to PEP8.',
                          affected_code=(diff.range(filename),),
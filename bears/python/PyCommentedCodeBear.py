@@ -1,11 +1,45 @@
+import io
+import tokenize
+
 import eradicate
 
+from bears.python.PythonFormatterCache import get_corrected_file
+from bears.python.PythonParseCache import get_tokens
 from coalib.bears.LocalBear import LocalBear
 from dependency_management.requirements.PipRequirement import PipRequirement
 from coalib.results.Diff import Diff
 from coalib.results.Result import Result
 
 
+def _filter_commented_out_code(filename, file):
+    """
+    Does what ``eradicate.filter_commented_out_code`` does with the tokens
+    shared by the Python bears instead of tokenizing the file again.
+
+    :return: The lines of the file without commented out code.
+    """
+    source = ''.join(file)
+    try:
+        tokens = get_tokens(filename, file)
+    except (tokenize.TokenError, IndentationError):
+        # eradicate checks the comments up to the error
+        return tuple(eradicate.filter_commented_out_code(source))
+
+    marked_lines = {token.start[0] for token in tokens
+                    if token.type == tokenize.COMMENT and
+                    token.line.lstrip().startswith('#') and
+                    eradicate.comment_contains_code(token.line)}
+    corrected = []
+    previous_line = ''
+    for line_number, line in enumerate(io.StringIO(source).readlines(),
+                                       start=1):
+        if (line_number not in marked_lines or
+                previous_line.rstrip().endswith('\\')):
+            corrected.append(line)
+        previous_line = line
+    return tuple(corrected)
+
+
 class PyCommentedCodeBear(LocalBear):
     LANGUAGES = {'Python', 'Python 2', 'Python 3'}
     REQUIREMENTS = {PipRequirement('eradicate', '0.1.6')}
@@ -14,11 +48,18 @@ class PyCommentedCodeBear(LocalBear):
     LICENSE = 'AGPL-3.0'
     CAN_DETECT = {'Commented Code'}
 
-    def run(self, filename, file):
+    def run(self, filename, file, cache_corrections: bool = False):
         """
         Detects commented out source code in Python.
+
+        :param cache_corrections:
+            Set to true to store the file without the commented out code on
+            disk, so unchanged files aren't checked again in the next run.
         """
-        corrected = tuple(eradicate.filter_commented_out_code(''.join(file)))
+        corrected = get_corrected_file(
+            'PyCommentedCodeBear', {'version': eradicate.__version__}, file,
+            lambda source: _filter_commented_out_code(filename, file),
+            cache_corrections)
 
         for diff in Diff.from_string_arrays(file, corrected).split_diff():
             yield Result(self,
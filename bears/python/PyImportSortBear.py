@@ -1,5 +1,11 @@
+import os
+from functools import lru_cache
+
+import isort
+import isort.settings
 from isort import SortImports
 
+from bears.python.PythonFormatterCache import get_corrected_file
 from coalib.bearlib import deprecate_settings
 from coalib.bearlib.spacing.SpacingHelper import SpacingHelper
 from coalib.bears.LocalBear import LocalBear
@@ -9,6 +15,15 @@ from coalib.results.Result import Result
 from coalib.settings.Setting import typed_list
 
 
+@lru_cache(maxsize=None)
+def _get_isort_config(directory):
+    """
+    Reads the isort config files of the directory once per process, they
+    are part of the key of the cached corrections.
+    """
+    return isort.settings.from_path(directory)
+
+
 class PyImportSortBear(LocalBear):
 
     LANGUAGES = {'Python', 'Python 3', 'Python 2'}
@@ -107,6 +122,7 @@ class PyImportSortBear(LocalBear):
             max_line_length: int = 79,
             imports_forced_to_top: typed_list(str) = (),
             treat_seperated_imports_independently: bool = False,
+            cache_corrections: bool = False,
             ):
         """
         Raise issues related to sorting imports, segregating imports into
@@ -208,6 +224,9 @@ class PyImportSortBear(LocalBear):
         :param treat_seperated_imports_independently:
             Treat import statements seperated by one or more blank line or any
             statement other than an import statement as an independent bunch.
+        :param cache_corrections:
+            Set to true to store the corrected file on disk, so unchanged
+            files aren't corrected again in the next run.
         """
         isort_settings = dict(
             use_parentheses=use_parentheses_in_import,
@@ -246,9 +265,22 @@ class PyImportSortBear(LocalBear):
         self.treat_seperated_imports_independently = \
             treat_seperated_imports_independently
 
-        diff = self._get_diff()
+        def fix(source):
+            diff = self._get_diff()
+            return self.file if diff is None else diff.modified
+
+        corrected = get_corrected_file(
+            'PyImportSortBear',
+            {'version': isort.__version__,
+             # isort reads its config files from the working directory
+             'config': _get_isort_config(os.getcwd()),
+             'settings': isort_settings,
+             'treat_seperated_imports_independently':
+                 treat_seperated_imports_independently},
+            file, fix, cache_corrections)
 
-        if diff:
+        if corrected != tuple(file):
+            diff = Diff.from_string_arrays(file, corrected)
             yield Result(self,
                          'Imports can be sorted.',
                          affected_code=diff.affected_code(filename),
@@ -1,5 +1,6 @@
 import autoflake
 
+from bears.python.PythonFormatterCache import get_corrected_file
 from coalib.bears.LocalBear import LocalBear
 from dependency_management.requirements.PipRequirement import PipRequirement
 from coalib.results.Diff import Diff
@@ -34,6 +35,7 @@ class PyUnusedCodeBear(
     def run(self, filename, file,
             remove_all_unused_imports: bool = True,
             remove_unused_variables: bool = True,
+            cache_corrections: bool = False,
             ):
         """
         Detects unused code. By default this functionality is limited to:
@@ -46,13 +48,23 @@ class PyUnusedCodeBear(
             ``False`` removes only unused builtin imports
         :param remove_unused_variables:
             ``False`` keeps unused variables
+        :param cache_corrections:
+            Set to true to store the corrected file on disk, so unchanged
+            files aren't corrected again in the next run.
         """
-        corrected = autoflake.fix_code(
-                       ''.join(file),
-                       additional_imports=None,
-                       remove_all_unused_imports=remove_all_unused_imports,
-                       remove_unused_variables=remove_unused_variables
-                       ).splitlines(True)
+        corrected = get_corrected_file(
+            'PyUnusedCodeBear',
+            {'version': autoflake.__version__,
+             'remove_all_unused_imports': remove_all_unused_imports,
+             'remove_unused_variables': remove_unused_variables},
+            file,
+            lambda source: autoflake.fix_code(
+                source,
+                additional_imports=None,
+                remove_all_unused_imports=remove_all_unused_imports,
+                remove_unused_variables=remove_unused_variables
+                ).splitlines(True),
+            cache_corrections)
 
         for diff in Diff.from_string_arrays(file, corrected).split_diff():
             yield Result(self,
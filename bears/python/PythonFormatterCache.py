@@ -0,0 +1,160 @@
+"""
+Remembers the output of the deterministic Python formatters across runs.
+
+The formatters wrapped by the Python bears only depend on the file contents
+and the settings passed to them, so their output is stored on disk, keyed by
+the bear, the settings and the content hash. Files that didn't change since
+the last run are looked up instead of being formatted again.
+
+Every output is stored in its own file in a directory of the user's data
+directory, so the bears running in parallel processes don't overwrite each
+other's outputs. Every bear has its own directory, the least recently used
+outputs of a bear are removed once there are more than
+``MAX_CACHED_OUTPUTS`` of them.
+
+The bears only use the cache if their ``cache_corrections`` setting is
+enabled. The outputs are unpickled, so the data directory must not be
+writable by others.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import stat
+from collections import Counter
+from tempfile import NamedTemporaryFile
+
+from coalib.misc.CachingUtilities import get_data_path
+
+# The maximum number of outputs stored per bear
+MAX_CACHED_OUTPUTS = 10000
+
+# A directory is only checked for outputs to remove every few stores
+EVICTION_INTERVAL = 100
+
+_stores = Counter()
+
+
+def get_formatter_cache_key(bear_name, settings, file):
+    """
+    Hashes everything the output of a formatter depends on.
+
+    :param bear_name: The name of the bear running the formatter.
+    :param settings:  A dict of the settings and the version of the
+                      formatter. Sets are hashed regardless of their order.
+    :param file:      The lines of the file.
+    :return:          The hex digest of the SHA-1 hash of the arguments.
+    """
+    key = hashlib.sha1(json.dumps([bear_name, settings],
+                                  sort_keys=True,
+                                  default=sorted).encode())
+    key.update(''.join(file).encode(errors='surrogateescape'))
+    return key.hexdigest()
+
+
+def _get_cache_directory(bear_name):
+    directory = get_data_path(None, 'PythonFormatterCache')
+    if directory is None:
+        return None
+    directory = os.path.join(directory, bear_name)
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        return None
+    return directory
+
+
+def _evict(directory):
+    """
+    Removes the least recently used outputs exceeding
+    ``MAX_CACHED_OUTPUTS``.
+    """
+    entries = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            status = os.stat(path)
+        except OSError:
+            # Removed by another process
+            continue
+        if stat.S_ISREG(status.st_mode):
+            entries.append((status.st_mtime, path))
+
+    entries.sort()
+    for _, path in entries[:len(entries) - MAX_CACHED_OUTPUTS]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _load(path):
+    try:
+        with open(path, 'rb') as file:
+            output = pickle.load(file)
+        # Marks the output as recently used
+        os.utime(path)
+        return True, output
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return False, None
+
+
+def _store(directory, path, output):
+    try:
+        # Written to a temporary file first, other processes must not read
+        # incomplete outputs.
+        with NamedTemporaryFile('wb', dir=directory, suffix='.tmp',
+                                delete=False) as file:
+            pickle.dump(output, file)
+        os.replace(file.name, path)
+    except OSError:
+        return
+
+    _stores[directory] += 1
+    if _stores[directory] % EVICTION_INTERVAL == 0:
+        _evict(directory)
+
+
+def get_corrected_file(bear_name, settings, file, fix, cache=True):
+    """
+    Retrieves the output of a formatter for the file, running the formatter
+    only if it wasn't run on the same contents with the same settings
+    before::
+
+        corrected = get_corrected_file(
+            'PEP8Bear', {'version': autopep8.__version__, ...}, file,
+            lambda source: autopep8.fix_code(source, ...).splitlines(True))
+
+    Errors raised by the formatter are passed on and not stored.
+
+    :param bear_name: The name of the bear running the formatter.
+    :param settings:  A dict of everything besides the file the output of the
+                      formatter depends on, including its version. It has to
+                      be serializable to JSON, with sets being allowed.
+    :param file:      The lines of the file.
+    :param fix:       A function formatting the source code of the file and
+                      returning the corrected lines.
+    :param cache:     Set to false to run the formatter without looking up or
+                      storing its output.
+    :return:          A tuple of the corrected lines, the lines of the file if
+                      nothing needs to be corrected.
+    """
+    directory = _get_cache_directory(bear_name) if cache else None
+    if directory is None:
+        return tuple(fix(''.join(file)))
+
+    path = os.path.join(directory,
+                        get_formatter_cache_key(bear_name, settings, file))
+    found, output = _load(path)
+    if found:
+        return tuple(file) if output is None else output
+
+    corrected = tuple(fix(''.join(file)))
+    # Most files are formatted already, only a marker is stored for them
+    _store(directory, path, None if corrected == tuple(file) else corrected)
+    return corrected
@@ -0,0 +1,111 @@
+"""
+Parses Python files once per process and shares the syntax trees and token
+streams between all Python bears analyzing them in process.
+
+Files are cached by filename and content, so every bear running on the same
+file gets the same tree and tokens instead of parsing the file again. Errors
+are cached as well and raised again for every bear asking for them.
+
+The trees and token tuples are shared, bears must not modify them.
+"""
+
+import ast
+import hashlib
+import io
+import os
+import tokenize
+from collections import OrderedDict
+
+# Only the most recently used files are kept, the bears analyzing a file run
+# right after each other.
+MAX_CACHED_FILES = 64
+
+_parsed_files = OrderedDict()
+_parsed_files_pid = None
+
+
+class _ParsedFile:
+    """
+    The tree and tokens of one file, both created on first use.
+    """
+
+    def __init__(self, filename, source):
+        self.filename = filename
+        self.source = source
+        self._tree = None
+        self._tokens = None
+
+    @staticmethod
+    def _get_or_raise(value):
+        if isinstance(value, Exception):
+            raise value.with_traceback(None)
+        return value
+
+    def get_tree(self):
+        if self._tree is None:
+            try:
+                self._tree = ast.parse(self.source, self.filename)
+            except (SyntaxError, ValueError) as error:
+                self._tree = error
+        return self._get_or_raise(self._tree)
+
+    def get_tokens(self):
+        if self._tokens is None:
+            try:
+                self._tokens = tuple(tokenize.generate_tokens(
+                    io.StringIO(self.source).readline))
+            except (tokenize.TokenError, IndentationError) as error:
+                self._tokens = error
+        return self._get_or_raise(self._tokens)
+
+
+def _get_parsed_file(filename, file):
+    global _parsed_files_pid
+    if _parsed_files_pid != os.getpid():
+        # Forked processes start with an empty cache
+        _parsed_files.clear()
+        _parsed_files_pid = os.getpid()
+
+    source = ''.join(file)
+    key = (filename,
+           hashlib.sha1(source.encode(errors='surrogateescape')).digest())
+    parsed_file = _parsed_files.get(key)
+    if parsed_file is not None:
+        _parsed_files.move_to_end(key)
+        return parsed_file
+
+    parsed_file = _ParsedFile(filename, source)
+    _parsed_files[key] = parsed_file
+    while len(_parsed_files) > MAX_CACHED_FILES:
+        _parsed_files.popitem(last=False)
+    return parsed_file
+
+
+def get_ast(filename, file):
+    """
+    Retrieves the syntax tree of a file, parsing it only if it wasn't parsed
+    with the same contents before.
+
+    :param filename: The path to the file, used in error messages.
+    :param file:     The lines of the file, as given to local bears.
+    :return:         The ``ast.Module`` of the file.
+    :raises SyntaxError: If the file can't be parsed.
+    :raises ValueError:  If the file contains null bytes.
+    """
+    return _get_parsed_file(filename, file).get_tree()
+
+
+def get_tokens(filename, file):
+    """
+    Retrieves the tokens of a file, tokenizing it only if it wasn't tokenized
+    with the same contents before.
+
+    :param filename: The path to the file.
+    :param file:     The lines of the file, as given to local bears.
+    :return:         A tuple of the ``tokenize.TokenInfo`` objects of the
+                     file.
+    :raises tokenize.TokenError: If the file ends in a multi-line statement
+                                 or string.
+    :raises IndentationError:    If the file is indented inconsistently.
+    """
+    return _get_parsed_file(filename, file).get_tokens()
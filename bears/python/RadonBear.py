@@ -2,6 +2,7 @@ import logging
 import radon.complexity
 import radon.visitors
 
+from bears.python.PythonParseCache import get_ast
 from coalib.bears.LocalBear import LocalBear
 from dependency_management.requirements.PipRequirement import PipRequirement
 from coalib.results.Result import Result
@@ -48,7 +49,8 @@ class RadonBear(LocalBear):
                             ' are deprecated. Please use '
                             '`cyclomatic_complexity` instead.')
 
-        for visitor in radon.complexity.cc_visit(''.join(file)):
+        # The tree is shared with the other Python bears
+        for visitor in radon.complexity.cc_visit_ast(get_ast(filename, file)):
             rank = radon.complexity.cc_rank(visitor.complexity)
             severity = None
             for result_severity, rank_list in severity_map.items():
@@ -1,17 +1,180 @@
+import hashlib
+import os
+import pkgutil
+
+import vulture
 from coalib.bears.GlobalBear import GlobalBear
+from coalib.misc.CachingUtilities import pickle_dump, pickle_load
 from coalib.results.Result import Result
 from dependency_management.requirements.PipRequirement import PipRequirement
 from vulture import Vulture
+from vulture.core import ENCODING_REGEX
+
+from bears.python.PythonParseCache import get_ast
+
+# The attributes of Vulture holding what a file defines and uses
+DEFINITION_TABLES = ('defined_attrs', 'defined_classes', 'defined_funcs',
+                     'defined_imports', 'defined_props', 'defined_vars',
+                     'unreachable_code')
+USAGE_TABLES = ('used_attrs', 'used_names')
+
+
+def scan_file(filename, source):
+    """
+    Scans a single file for definitions and usages.
+
+    Files are scanned independently of each other, so the tables of all
+    files can be merged to analyse the whole project.
+
+    The AST shared with the other Python bears is visited the way
+    ``Vulture.scan`` does after parsing, which depends on the internals of
+    the pinned vulture 0.25.
+
+    :param filename: The path to the file.
+    :param source:   The contents of the file.
+    :return:         A dict mapping the names of the definition and usage
+                     tables of ``Vulture`` to their contents for this file.
+    """
+    scanner = Vulture()
+    try:
+        tree = get_ast(filename, source.splitlines(True))
+    except (SyntaxError, ValueError):
+        # Vulture reports the error
+        scanner.scan(source, filename=filename)
+    else:
+        scanner.filename = filename
+        # Vulture.scan removes the coding declaration before parsing
+        scanner.code = ENCODING_REGEX.sub('', source, count=1).splitlines()
+        scanner.visit(tree)
+
+    tables = {table: list(getattr(scanner, table))
+              for table in DEFINITION_TABLES}
+    tables.update((table, set(getattr(scanner, table)))
+                  for table in USAGE_TABLES)
+    return tables
+
+
+def add_tables(scanner, tables):
+    """
+    Adds the definitions and usages of a file to a ``Vulture`` object.
+
+    :param scanner: The ``Vulture`` object.
+    :param tables:  The tables of the file as returned by ``scan_file``.
+    """
+    for table in DEFINITION_TABLES:
+        getattr(scanner, table).extend(tables[table])
+    for table in USAGE_TABLES:
+        getattr(scanner, table).update(tables[table])
+
+
+class ScanCache:
+    """
+    Stores the definition and usage tables of all scanned files on disk so
+    only files that changed since the last run need to be scanned again::
+
+        cache = ScanCache('project')
+        tables = cache.get(filename, source)
+        if tables is None:
+            tables = scan_file(filename, source)
+            cache.set(filename, source, tables)
+        cache.save()
+    """
+
+    def __init__(self, identifier):
+        """
+        Loads the cached tables.
 
+        :param identifier: Identifies the cache, e.g. by the project.
+        """
+        self.identifier = 'VultureBear_tables_{}'.format(identifier)
+        self.entries = pickle_load(None, self.identifier, {})
+        self.used_entries = {}
+        self.hits = 0
+
+    @staticmethod
+    def get_key(source):
+        return (hashlib.sha1(source.encode(errors='surrogateescape'))
+                .hexdigest(),
+                vulture.__version__)
+
+    def get(self, filename, source):
+        """
+        Retrieves the tables of the file if it didn't change.
+
+        :param filename: The path to the file.
+        :param source:   The contents of the file.
+        :return:         The tables or None if nothing valid is cached.
+        """
+        entry = self.entries.get(filename)
+        if entry is None or entry[0] != self.get_key(source):
+            return None
 
-def _find_unused_code(filenames):
+        self.used_entries[filename] = entry
+        self.hits += 1
+        return entry[1]
+
+    def set(self, filename, source, tables):
+        """
+        Stores the tables of the file.
+
+        :param filename: The path to the file.
+        :param source:   The contents of the file.
+        :param tables:   The tables as returned by ``scan_file``.
+        """
+        self.used_entries[filename] = (self.get_key(source), tables)
+
+    def save(self):
+        """
+        Writes the tables of all files retrieved or stored in this run to
+        disk, dropping the ones of all other files.
+        """
+        pickle_dump(None, self.identifier, self.used_entries)
+
+
+def get_whitelists(import_names):
     """
-    :param filenames: List of filenames to check.
-    :return: Generator of Result objects.
+    Retrieves the whitelists vulture ships for the imported modules, as
+    ``Vulture.scavenge`` scans them.
+
+    :param import_names: The names of all imported modules.
+    :return:             A list of tuples of the path and the contents of
+                         every whitelist found.
     """
-    vulture = Vulture()
-    vulture.scavenge(filenames)
-    for item in vulture.get_unused_code():
+    whitelists = []
+    for import_name in sorted(import_names):
+        path = os.path.join('whitelists', import_name) + '.py'
+        try:
+            data = pkgutil.get_data('vulture', path)
+        except IOError:
+            # Most imported modules don't have a whitelist.
+            continue
+        if data is not None:
+            whitelists.append((path, data.decode('utf-8')))
+    return whitelists
+
+
+def _find_unused_code(file_dict, cache=None):
+    """
+    :param file_dict: A dict mapping the filenames to check to their lines.
+    :param cache:     An optional ``ScanCache`` to take the tables of
+                      unchanged files from.
+    :return:          Generator of Result objects.
+    """
+    scanner = Vulture()
+    for filename, file in sorted(file_dict.items()):
+        source = ''.join(file)
+        tables = None if cache is None else cache.get(filename, source)
+        if tables is None:
+            tables = scan_file(filename, source)
+            if cache is not None:
+                cache.set(filename, source, tables)
+        add_tables(scanner, tables)
+
+    import_names = {item.name for item in scanner.defined_imports}
+    for path, source in get_whitelists(import_names):
+        add_tables(scanner, scan_file(path, source))
+
+    for item in scanner.get_unused_code():
         yield Result.from_values(origin='VultureBear',
                                  message=item.message,
                                  file=item.filename,
@@ -30,9 +193,20 @@ class VultureBear(GlobalBear):
     CAN_DETECT = {'Unused Code'}
     SEE_MORE = 'https://github.com/jendrikseipp/vulture'
 
-    def run(self):
+    def run(self, cache_scans: bool = False):
         """
         Check Python code for unused variables and functions using `vulture`.
+
+        :param cache_scans:
+            Set to true to store what every file defines and uses on disk, so
+            only files that changed are scanned in the next run. Only
+            finding the unused code is repeated for all files.
         """
-        filenames = list(self.file_dict.keys())
-        return _find_unused_code(filenames)
+        cache = (ScanCache(self.section.get('files').origin)
+                 if cache_scans else None)
+        results = list(_find_unused_code(self.file_dict, cache))
+        if cache is not None:
+            self.debug('Took the scans of {} of {} files from the '
+                       'cache.'.format(cache.hits, len(self.file_dict)))
+            cache.save()
+        return results
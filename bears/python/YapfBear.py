@@ -1,5 +1,7 @@
+import yapf
 from yapf.yapflib.yapf_api import FormatCode
 
+from bears.python.PythonFormatterCache import get_corrected_file
 from coalib.bearlib import deprecate_settings
 from coalib.bearlib.spacing.SpacingHelper import SpacingHelper
 from coalib.bears.LocalBear import LocalBear
@@ -40,6 +42,7 @@ class YapfBear(LocalBear):
             use_spaces: bool = True,
             based_on_style: str = 'pep8',
             prefer_line_break_after_opening_bracket: bool = True,
+            cache_corrections: bool = False,
             ):
         """
         Check and correct formatting of Python code using ``yapf`` utility.
@@ -114,6 +117,9 @@ class YapfBear(LocalBear):
         :param prefer_line_break_after_opening_bracket:
             If True, splitting right after a open bracket will not be
             preferred.
+        :param cache_corrections:
+            Set to true to store the corrected file on disk, so unchanged
+            files aren't corrected again in the next run.
         """
         if not file:
             # Yapf cannot handle zero-byte files well, and adds a redundent
@@ -149,11 +155,16 @@ space_between_ending_comma_and_closing_bracket= \
                      else '0') + '\n')
         options = options.format(**locals())
 
-        try:
+        def fix(source):
             with prepare_file(options.splitlines(keepends=True),
                               None) as (file_, fname):
-                corrected = FormatCode(
-                    ''.join(file), style_config=fname)[0].splitlines(True)
+                return FormatCode(source,
+                                  style_config=fname)[0].splitlines(True)
+
+        try:
+            corrected = get_corrected_file(
+                'YapfBear', {'version': yapf.__version__, 'style': options},
+                file, fix, cache_corrections)
         except SyntaxError as err:
             if isinstance(err, IndentationError):
                 error_type = 'indentation errors (' + err.args[0] + ')'
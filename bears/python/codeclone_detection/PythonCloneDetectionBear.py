@@ -0,0 +1,186 @@
+import functools
+import os
+
+from bears.c_languages.codeclone_detection.AssignmentSolvers import (
+    get_assignment_solver)
+from bears.c_languages.codeclone_detection.CloneDetectionRoutines import (
+    exclude_function, get_candidate_pairs, get_count_array, get_differences,
+    get_function_pair_difference)
+from bears.python.codeclone_detection.PythonCountingConditions import (
+    condition_dict)
+from bears.python.codeclone_detection.PythonCountVectorCreator import (
+    PythonCountVectorCreator)
+from coala_utils.string_processing.StringConverter import StringConverter
+from coalib.bears.GlobalBear import GlobalBear
+from coalib.results.Result import Result
+from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
+from coalib.settings.Setting import typed_ordered_dict
+from dependency_management.requirements.PipRequirement import PipRequirement
+
+# See ClangFunctionDifferenceBear, the keys are converted to the counting
+# conditions of PythonCountingConditions.
+counting_condition_dict = typed_ordered_dict(
+    lambda setting: condition_dict[str(setting).lower()],
+    float,
+    1)
+
+default_cc_dict = counting_condition_dict(StringConverter(
+    """
+used: 0,
+returned: 1.4,
+is_yielded: 1.4,
+is_condition: 0,
+in_condition: 1.4,
+in_second_level_condition: 1.4,
+in_third_level_condition: 1.0,
+is_assignee: 0,
+is_assigner: 0.6,
+loop_content: 0,
+second_level_loop_content,
+third_level_loop_content,
+is_param: 2,
+is_called: 1.4,
+is_call_param: 0.0,
+in_sum: 2.0,
+in_product: 0,
+in_binary_operation,
+member_accessed,
+is_subscripted,
+in_comprehension,
+in_exception_handling"""))
+
+DEFAULT_MAX_CLONE_DIFFERENCE = 0.185
+
+
+class PythonCloneDetectionBear(GlobalBear):
+    """
+    Detects similar functions in Python code with the count matrix based
+    clone detection of ``ClangCloneDetectionBear``. The count matrices are
+    built from the ``ast`` module, so no native parser is needed.
+    """
+
+    LANGUAGES = {'Python', 'Python 3'}
+    REQUIREMENTS = {PipRequirement('munkres3', '1.0'),
+                    PipRequirement('numpy', '1.13')}
+    AUTHORS = {'The coala developers'}
+    AUTHORS_EMAILS = {'coala-devel@googlegroups.com'}
+    LICENSE = 'AGPL-3.0'
+    CAN_DETECT = {'Duplication'}
+
+    def get_count_matrices(self, count_vector_creator):
+        """
+        Retrieves the count matrices of all functions in all files, skipping
+        functions that aren't worth comparing.
+
+        :return: A dict mapping (file, line, function) tuples to count
+                 matrices.
+        """
+        count_matrices = {}
+        for filename, file in sorted(self.file_dict.items()):
+            try:
+                count_dict = count_vector_creator.get_vectors_for_file(
+                    filename, file)
+            except SyntaxError as error:
+                self.warn('Skipping {} as it can\'t be parsed: {}'.format(
+                    filename, error))
+                continue
+
+            count_matrices.update(
+                ((filename,) + function, count_matrix)
+                for function, count_matrix in count_dict.items()
+                if not exclude_function(count_matrix))
+
+        return count_matrices
+
+    def run(self,
+            counting_conditions: counting_condition_dict = default_cc_dict,
+            average_calculation: bool = False,
+            poly_postprocessing: bool = True,
+            exp_postprocessing: bool = False,
+            max_clone_difference: float = DEFAULT_MAX_CLONE_DIFFERENCE,
+            assignment_solver: str = 'auto',
+            comparison_processes: int = 1,
+            ):
+        """
+        Checks the given code for similar functions that are probably
+        redundant.
+
+        :param counting_conditions:
+            A comma separated list of counting conditions, see
+            ``ClangFunctionDifferenceBear``. Possible values are: used,
+            returned, is_yielded, is_condition, in_condition,
+            in_second_level_condition, in_third_level_condition,
+            is_assignee, is_assigner, loop_content,
+            second_level_loop_content, third_level_loop_content, is_param,
+            is_called, is_call_param, in_sum, in_product,
+            in_binary_operation, member_accessed, is_subscripted,
+            in_comparison, in_boolean_operation, in_comprehension,
+            in_exception_handling, in_with_block. Weightings can be
+            assigned to each condition with a dict value, e.g.
+            ``used: 0.5, is_assignee``, they default to 1 if unset.
+        :param average_calculation:
+            If set to true the difference calculation function will take the
+            average of all variable differences as the difference, else it
+            will normalize the function as a whole and thus weighting in
+            variables dependent on their size.
+        :param poly_postprocessing:
+            If set to true, the difference value of big function pairs will
+            be reduced using a polynomial approach.
+        :param exp_postprocessing:
+            If set to true, the difference value of big function pairs will
+            be reduced using an exponential approach.
+        :param max_clone_difference:
+            The maximum difference a clone should have.
+        :param assignment_solver:
+            The algorithm matching the variables of two functions. Possible
+            values are: scipy, numpy, munkres. Defaults to scipy if it is
+            installed and numpy otherwise.
+        :param comparison_processes:
+            The number of processes comparing function pairs in parallel, 0
+            to use one per CPU. Few pairs are always compared in this
+            process.
+        """
+        solver = get_assignment_solver(assignment_solver)
+
+        self.debug('Creating count matrices...')
+        count_matrices = self.get_count_matrices(PythonCountVectorCreator(
+            list(counting_conditions.keys()),
+            list(counting_conditions.values())))
+        count_arrays = {function: get_count_array(count_matrix)
+                        for function, count_matrix in count_matrices.items()}
+
+        function_pairs = get_candidate_pairs(count_arrays,
+                                             max_clone_difference,
+                                             average_calculation,
+                                             poly_postprocessing,
+                                             exp_postprocessing)
+        function_count = len(count_arrays)
+        self.debug('Comparing {} of {} function pairs, the others can\'t '
+                   'be clones.'.format(len(function_pairs),
+                                       function_count*(function_count-1)//2))
+
+        differences = get_differences(
+            function_pairs,
+            functools.partial(get_function_pair_difference,
+                              count_matrices=count_arrays,
+                              average_calculation=average_calculation,
+                              poly_postprocessing=poly_postprocessing,
+                              exp_postprocessing=exp_postprocessing,
+                              max_difference=max_clone_difference,
+                              assignment_solver=solver),
+            comparison_processes or os.cpu_count() or 1)
+
+        for function_1, function_2, difference in differences:
+            if difference < max_clone_difference:
+                yield Result.from_values(
+                    self,
+                    'Code clone found. The other occurrence is at file '
+                    '{file}, line {line}, function {function}. The '
+                    'difference is {difference}%.'.format(
+                        file=function_2[0],
+                        line=function_2[1],
+                        function=function_2[2],
+                        difference=difference),
+                    file=function_1[0],
+                    severity=RESULT_SEVERITY.MAJOR,
+                    line=function_1[1])
@@ -0,0 +1,148 @@
+import ast
+
+from bears.c_languages.codeclone_detection.CountVector import CountVector
+from bears.python.PythonParseCache import get_ast
+from bears.python.codeclone_detection.PythonCountingConditions import (
+    NodeStack, get_identifier_name, get_literal_value, is_function_definition,
+    is_literal)
+
+# Fields not walked as they contain no code executed by the function
+_SKIPPED_FIELDS = {'decorator_list', 'returns', 'annotation', 'type_comment'}
+
+
+def _iter_child_nodes(node):
+    """
+    Yields tuples of the field and the node of all children of the node.
+    """
+    for field, value in ast.iter_fields(node):
+        if field in _SKIPPED_FIELDS:
+            continue
+        if isinstance(value, ast.AST):
+            yield field, value
+        elif isinstance(value, list):
+            for child in value:
+                if isinstance(child, ast.AST):
+                    yield field, child
+
+
+def get_functions(tree):
+    """
+    Retrieves all functions and methods defined in the module, including
+    nested ones.
+
+    :param tree: The ``ast.Module`` to search.
+    :return:     A list of tuples of the qualified name of every function,
+                 e.g. ``Class.method``, and its definition node.
+    """
+    result = []
+    stack = [('', tree)]
+    while stack:
+        prefix, node = stack.pop()
+        for child in ast.iter_child_nodes(node):
+            if is_function_definition(child):
+                name = prefix + child.name
+                result.append((name, child))
+                stack.append((name + '.', child))
+            elif isinstance(child, ast.ClassDef):
+                stack.append((prefix + child.name + '.', child))
+            else:
+                stack.append((prefix, child))
+
+    return sorted(result, key=lambda function: function[1].lineno)
+
+
+class PythonCountVectorCreator:
+    """
+    This object uses the ``ast`` module to create a count vector for each
+    function for given counting conditions. The counting conditions are
+    called like this:
+
+      condition(stack)
+
+    While stack is a NodeStack (i.e. a list) holding tuples of the parent
+    nodes and the field of their parent they are in.
+
+    The PythonCountVectorCreator will count all names and literals used in
+    each function. Nested functions and classes are not counted as part of
+    the enclosing function.
+    """
+
+    def __init__(self,
+                 conditions=None,
+                 weightings=None):
+        """
+        Creates a new PythonCountVectorCreator.
+
+        :param conditions:      The counting conditions as list of function
+                                objects, each shall return true when getting
+                                data indicating that this occurrence should
+                                be counted.
+        :param weightings:      Optional factors to weight counting conditions.
+                                Defaults to 1 for all conditions.
+        """
+        self.conditions = conditions
+        self.weightings = weightings
+
+    def _count_identifier(self, count_vectors, stack, identifier, category):
+        if identifier not in count_vectors:
+            count_vectors[identifier] = CountVector(
+                identifier, category, self.conditions, self.weightings)
+
+        count_vectors[identifier].count_reference(stack)
+
+    def get_vectors_for_function(self, node):
+        """
+        Creates the count vectors of all names and literals in the function.
+
+        The tree is walked depth first without recursion so deeply nested
+        code doesn't exceed the recursion limit.
+
+        :param node: The definition node of the function.
+        :return:     A dict mapping the names to their CountVectors.
+        """
+        count_vectors = {}
+        stack = NodeStack()
+        stack.append((node, None))
+        children = [iter([(field, child)
+                          for field, child in _iter_child_nodes(node)
+                          if field == 'args' or field == 'body'])]
+
+        while children:
+            field, child = next(children[-1], (None, None))
+            if child is None:
+                children.pop()
+                stack.pop()
+                continue
+            if (is_function_definition(child) or
+                    isinstance(child, ast.ClassDef)):
+                continue
+
+            stack.append((child, field))
+            identifier = get_identifier_name(child)
+            if identifier is not None:
+                self._count_identifier(count_vectors, stack, identifier,
+                                       CountVector.Category.reference)
+            elif is_literal(child):
+                self._count_identifier(count_vectors, stack,
+                                       repr(get_literal_value(child)),
+                                       CountVector.Category.literal)
+            children.append(_iter_child_nodes(child))
+
+        return count_vectors
+
+    def get_vectors_for_file(self, filename, file):
+        """
+        Creates a dictionary associating the line and the qualified name of
+        each function within the given file with another dictionary
+        associating each name used in the function with a CountVector
+        object.
+
+        :param filename: The path to the file, used in error messages.
+        :param file:     The lines of the file.
+        :return:         The dictionary holding CountVectors for all names in
+                         all functions.
+        :raises SyntaxError: If the file can't be parsed.
+        """
+        tree = get_ast(filename, file)
+        return {(node.lineno, name): self.get_vectors_for_function(node)
+                for name, node in get_functions(tree)}
@@ -0,0 +1,400 @@
+"""
+This file contains counting conditions for count matrix based code clone
+detection of Python code. They correspond to the ones in
+``ClangCountingConditions`` and add some Python specific ones.
+
+Every condition takes a ``NodeStack`` holding the nodes from the function
+definition down to the counted name.
+"""
+
+import ast
+import sys
+from collections import Counter
+
+
+def _get_node_types(*names):
+    """
+    Retrieves the node classes of the ``ast`` module with the given names,
+    leaving out the ones this Python version doesn't have, e.g.
+    ``AsyncFor`` before Python 3.5 or ``AnnAssign`` before Python 3.6.
+
+    :return: A tuple of the node classes.
+    """
+    return tuple(getattr(ast, name) for name in names if hasattr(ast, name))
+
+
+if sys.version_info >= (3, 8):  # pragma: no cover
+    _LITERAL_TYPES = (ast.Constant,)
+else:  # pragma: no cover
+    _LITERAL_TYPES = (ast.Num, ast.Str, ast.Bytes, ast.NameConstant)
+
+_SUM_OPERATORS = (ast.Add, ast.Sub)
+_PRODUCT_OPERATORS = _get_node_types('Mult', 'Div', 'FloorDiv', 'Mod', 'Pow',
+                                     'MatMult')
+_BINARY_OPERATORS = (ast.BitAnd, ast.BitOr, ast.BitXor)
+
+_BOOLEAN_OPERATORS = (ast.And, ast.Or, ast.Not)
+_OPERATIONS = (ast.BinOp, ast.AugAssign, ast.UnaryOp, ast.BoolOp)
+
+_FUNCTION_DEFINITIONS = _get_node_types('FunctionDef', 'AsyncFunctionDef')
+_FOR_LOOPS = _get_node_types('For', 'AsyncFor')
+_LOOPS = _FOR_LOOPS + (ast.While,)
+_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+# (parent type, field) pairs of the nodes being a condition or being
+# executed conditionally
+_CONDITION_FIELDS = [(ast.If, 'test'), (ast.While, 'test'),
+                     (ast.IfExp, 'test'), (ast.Assert, 'test'),
+                     (ast.comprehension, 'ifs')]
+_CONDITIONAL_FIELDS = [(ast.If, 'body'), (ast.If, 'orelse')]
+_LOOP_FIELDS = ([(loop, 'body') for loop in _LOOPS] +
+                [(comprehension, field)
+                 for comprehension in _COMPREHENSIONS
+                 for field in ('elt', 'key', 'value')])
+_ASSIGNEE_FIELDS = ([(ast.Assign, 'targets'), (ast.AugAssign, 'target')] +
+                    [(node_type, 'target')
+                     for node_type in _get_node_types('AnnAssign') +
+                     _FOR_LOOPS] +
+                    [(ast.withitem, 'optional_vars'),
+                     (ast.comprehension, 'target')])
+_ASSIGNER_FIELDS = ([(node_type, 'value')
+                     for node_type in (ast.Assign,) +
+                     _get_node_types('AnnAssign')] +
+                    [(ast.AugAssign, 'target'), (ast.AugAssign, 'value')])
+_CALL_PARAM_FIELDS = [(ast.Call, 'args'), (ast.Call, 'keywords')]
+_EXCEPTION_HANDLING_FIELDS = [(ast.Try, 'handlers'), (ast.Try, 'finalbody')]
+_WITH_FIELDS = [(node_type, 'body')
+                for node_type in _get_node_types('With', 'AsyncWith')]
+
+
+def is_function_definition(node):
+    """
+    :param node: A node of the AST.
+    :return:     True if the node defines a function or method.
+    """
+    return isinstance(node, _FUNCTION_DEFINITIONS)
+
+
+def is_literal(node):
+    """
+    :param node: A node of the AST.
+    :return:     True if the node is a literal of any kind.
+    """
+    return isinstance(node, _LITERAL_TYPES)
+
+
+def get_literal_value(node):
+    """
+    :param node: A literal node of the AST.
+    :return:     The value of the literal.
+    """
+    for attribute in ('value', 'n', 's'):
+        if hasattr(node, attribute):
+            return getattr(node, attribute)
+    return None  # pragma: no cover
+
+
+def get_identifier_name(node):
+    """
+    Retrieves the name of the variable or parameter the node refers to.
+
+    :param node: A node of the AST.
+    :return:     The name or None if the node is no reference.
+    """
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.arg):
+        return node.arg
+    return None
+
+
+class NodeStack(list):
+    """
+    The stack of the nodes from a function definition down to the current
+    node that is passed to the counting conditions, holding tuples of a node
+    and the field of its parent it is in.
+
+    Everything the counting conditions need to know about the parents of the
+    current node is updated when a node is pushed or popped, so the
+    conditions don't need to search the stack:
+
+    - ``types`` counts the node types in the stack.
+    - ``fields`` counts the (parent type, field) pairs of the nodes in the
+      stack.
+    - ``operators`` counts the operator types of the operations and
+      augmented assignments in the stack.
+    """
+
+    def __init__(self):
+        list.__init__(self)
+        self.types = Counter()
+        self.fields = Counter()
+        self.operators = Counter()
+        self._pushed = []
+
+    def append(self, elem):
+        node, field = elem
+        field = (type(self[-1][0]), field) if self else None
+        operator = (type(node.op)
+                    if isinstance(node, _OPERATIONS)
+                    else None)
+
+        self.types[type(node)] += 1
+        self.fields[field] += 1
+        self.operators[operator] += 1
+        self._pushed.append((type(node), field, operator))
+        list.append(self, elem)
+
+    def pop(self):
+        node_type, field, operator = self._pushed.pop()
+        self.types[node_type] -= 1
+        self.fields[field] -= 1
+        self.operators[operator] -= 1
+        return list.pop(self)
+
+    def count_types(self, types):
+        return sum(self.types[node_type] for node_type in types)
+
+    def count_fields(self, fields):
+        return sum(self.fields[field] for field in fields)
+
+    def count_operators(self, operators):
+        return sum(self.operators[operator] for operator in operators)
+
+    @property
+    def top_field(self):
+        """
+        The (parent type, field) pair of the node on top.
+        """
+        return self._pushed[-1][1]
+
+
+# pylint: disabled=unused-argument
+def used(stack):
+    """
+    Returns true.
+    """
+    return True
+
+
+def returned(stack):
+    """
+    Returns true if the name is used in a return statement.
+    """
+    return stack.types[ast.Return] != 0
+
+
+def is_yielded(stack):
+    """
+    Returns true if the name is used in a yield expression.
+    """
+    return stack.count_types((ast.Yield, ast.YieldFrom)) != 0
+
+
+def is_condition(stack):
+    """
+    Returns true if the name is used as a condition, including the ones of
+    conditional expressions, assertions and comprehensions.
+    """
+    return stack.count_fields(_CONDITION_FIELDS) != 0
+
+
+def _condition_level(stack):
+    return stack.count_fields(_CONDITIONAL_FIELDS)
+
+
+def in_condition(stack):
+    """
+    Returns true if the name is in the body of one if statement.
+    """
+    return _condition_level(stack) == 1
+
+
+def in_second_level_condition(stack):
+    """
+    Returns true if the name is in the body of two nested if statements.
+    """
+    return _condition_level(stack) == 2
+
+
+def in_third_level_condition(stack):
+    """
+    Returns true if the name is in the body of three or more nested if
+    statements.
+    """
+    return _condition_level(stack) > 2
+
+
+def is_assignee(stack):
+    """
+    Returns true if the name is assigned something, i.e. it's on the left
+    hand side of an assignment or the target of a loop, ``with`` statement or
+    comprehension.
+    """
+    return stack.count_fields(_ASSIGNEE_FIELDS) != 0
+
+
+def is_assigner(stack):
+    """
+    Returns true if the name is used for an assignment on the right hand
+    side. Both sides of augmented assignments like ``+=`` count as they read
+    the target as well.
+    """
+    return stack.count_fields(_ASSIGNER_FIELDS) != 0
+
+
+def _loop_level(stack):
+    """
+    Investigates the stack to determine the loop level, the elements of
+    comprehensions count as loop content.
+
+    :param stack: A NodeStack.
+    :return:      An integer representing the level of nested loops.
+    """
+    return stack.count_fields(_LOOP_FIELDS)
+
+
+def loop_content(stack):
+    """
+    Returns true if the name is within a first level loop.
+    """
+    return _loop_level(stack) == 1
+
+
+def second_level_loop_content(stack):
+    """
+    Returns true if the name is within a second level loop.
+    """
+    return _loop_level(stack) == 2
+
+
+def third_level_loop_content(stack):
+    """
+    Returns true if the name is within a third (or higher) level loop.
+    """
+    return _loop_level(stack) > 2
+
+
+def is_param(stack):
+    """
+    Returns true if the node on top is a parameter definition.
+    """
+    return isinstance(stack[-1][0], ast.arg)
+
+
+def is_called(stack):
+    """
+    Returns true if the name is called.
+    """
+    return stack.top_field == (ast.Call, 'func')
+
+
+def is_call_param(stack):
+    """
+    Returns true if the name is used in an argument of a call.
+    """
+    return stack.count_fields(_CALL_PARAM_FIELDS) != 0
+
+
+def in_sum(stack):
+    """
+    A counting condition returning true if the name is used in a sum, i.e.
+    within the operators +, - and their augmented assignments.
+    """
+    return stack.count_operators(_SUM_OPERATORS) != 0
+
+
+def in_product(stack):
+    """
+    A counting condition returning true if the name is used in a product,
+    i.e. within the operators ``*``, ``/``, ``//``, ``%``, ``**``, ``@`` and
+    their augmented assignments.
+    """
+    return stack.count_operators(_PRODUCT_OPERATORS) != 0
+
+
+def in_binary_operation(stack):
+    """
+    A counting condition returning true if the name is used in a binary
+    operation, i.e. within the operators ``&``, ``|``, ``^`` and their
+    augmented assignments.
+    """
+    return stack.count_operators(_BINARY_OPERATORS) != 0
+
+
+def member_accessed(stack):
+    """
+    Returns true if an attribute of the name is accessed.
+    """
+    return stack.types[ast.Attribute] != 0
+
+
+def is_subscripted(stack):
+    """
+    Returns true if the name is indexed or sliced or used as an index.
+    """
+    return stack.types[ast.Subscript] != 0
+
+
+def in_comparison(stack):
+    """
+    Returns true if the name is used in a comparison.
+    """
+    return stack.types[ast.Compare] != 0
+
+
+def in_boolean_operation(stack):
+    """
+    Returns true if the name is used in an ``and``, ``or`` or ``not``
+    expression.
+    """
+    return stack.count_operators(_BOOLEAN_OPERATORS) != 0
+
+
+def in_comprehension(stack):
+    """
+    Returns true if the name is used in a comprehension or generator
+    expression.
+    """
+    return stack.count_types(_COMPREHENSIONS) != 0
+
+
+def in_exception_handling(stack):
+    """
+    Returns true if the name is used in an ``except`` or ``finally`` block.
+    """
+    return stack.count_fields(_EXCEPTION_HANDLING_FIELDS) != 0
+
+
+def in_with_block(stack):
+    """
+    Returns true if the name is used in the body of a ``with`` statement.
+    """
+    return stack.count_fields(_WITH_FIELDS) != 0
+
+
+condition_dict = {'used': used,
+                  'returned': returned,
+                  'is_yielded': is_yielded,
+                  'is_condition': is_condition,
+                  'in_condition': in_condition,
+                  'in_second_level_condition': in_second_level_condition,
+                  'in_third_level_condition': in_third_level_condition,
+                  'is_assignee': is_assignee,
+                  'is_assigner': is_assigner,
+                  'loop_content': loop_content,
+                  'second_level_loop_content': second_level_loop_content,
+                  'third_level_loop_content': third_level_loop_content,
+                  'is_param': is_param,
+                  'is_called': is_called,
+                  'is_call_param': is_call_param,
+                  'in_sum': in_sum,
+                  'in_product': in_product,
+                  'in_binary_operation': in_binary_operation,
+                  'member_accessed': member_accessed,
+                  'is_subscripted': is_subscripted,
+                  'in_comparison': in_comparison,
+                  'in_boolean_operation': in_boolean_operation,
+                  'in_comprehension': in_comprehension,
+                  'in_exception_handling': in_exception_handling,
+                  'in_with_block': in_with_block}
@@ -0,0 +1,7 @@
+"""
+This package contains a bear and utilities for count matrix based code clone
+detection of Python code, using the ``ast`` module instead of clang.
+
+The count matrices are compared with the routines of
+``bears.c_languages.codeclone_detection``.
+"""
@@ -397,6 +397,7 @@ if __name__ == '__main__':
           tests_require=test_required,
           dependency_links=DEPENDENCY_LINKS,
           package_data={'bears': ['VERSION'],
+                        'bears.general': ['hsts_preload.txt.gz'],
                         'bears.java': ['checkstyle.jar', 'google_checks.xml'],
                         'bears.scala': ['scalastyle.jar',
                                         'scalastyle_config.xml']},
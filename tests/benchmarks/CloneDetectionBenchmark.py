@@ -0,0 +1,261 @@
+"""
+Benchmarks the clone detection of ``ClangFunctionDifferenceBear`` on
+generated C projects of several sizes.
+
+Every project consists of random functions with a controlled number of
+variables and statements. Some of them are copied to other files as clones,
+with renamed variables and some statements replaced. Parsing, the
+construction of the count matrices, the pruning of function pairs and their
+comparison are timed separately and the share of the injected clones found
+is reported::
+
+    python3 -m tests.benchmarks.CloneDetectionBenchmark --functions 100 400
+"""
+
+import argparse
+import functools
+import json
+import os
+import random
+import sys
+import time
+from itertools import combinations
+from tempfile import TemporaryDirectory
+
+from bears.c_languages.ClangTranslationUnitCache import get_translation_unit
+from bears.c_languages.codeclone_detection.AssignmentSolvers import (
+    get_assignment_solver)
+from bears.c_languages.codeclone_detection.ClangCountVectorCreator import (
+    ClangCountVectorCreator)
+from bears.c_languages.codeclone_detection.ClangFunctionDifferenceBear import (
+    DEFAULT_MAX_CLONE_DIFFERENCE, default_cc_dict)
+from bears.c_languages.codeclone_detection.CloneDetectionRoutines import (
+    exclude_function, get_candidate_pairs, get_count_array, get_differences,
+    get_function_pair_difference)
+
+# Statement templates, the numbers are replaced by variables
+_STATEMENTS = ('{0} = {1} + {2};',
+               '{0} = {1} * {2} - {0};',
+               '{0} += helper({1}, {2});',
+               'if ({0} > {1})\n        {2} = {0} - {1};',
+               'if ({0} == {1} && {2} < 10)\n        return {2};',
+               'for (int i = 0; i < {0}; i++)\n        {1} += i * {2};',
+               'while ({0} > {1})\n        {0} -= {2} + 1;',
+               '{0} = {1} > {2} ? {1} : {2};')
+
+_HEADER = 'int helper(int a, int b);\n'
+
+
+class GeneratedFunction:
+    """
+    A random function, rendered with the given function and variable names.
+    """
+
+    def __init__(self, rand, variables, statements):
+        self.parameters = rand.randint(1, min(3, variables))
+        self.variables = variables
+        self.statements = [(rand.choice(_STATEMENTS),
+                            [rand.randrange(variables) for _ in range(3)])
+                           for _ in range(statements)]
+        self.result = rand.randrange(variables)
+
+    def mutated(self, rand, mutations):
+        """
+        :return: A copy of the function with the given number of statements
+                 replaced by random ones.
+        """
+        clone = GeneratedFunction.__new__(GeneratedFunction)
+        clone.__dict__.update(self.__dict__)
+        clone.statements = list(self.statements)
+        for index in rand.sample(range(len(clone.statements)),
+                                 min(mutations, len(clone.statements))):
+            clone.statements[index] = (
+                rand.choice(_STATEMENTS),
+                [rand.randrange(self.variables) for _ in range(3)])
+        return clone
+
+    def render(self, name, variable_names):
+        lines = ['int {}({}) {{'.format(
+            name, ', '.join('int ' + variable
+                            for variable
+                            in variable_names[:self.parameters]))]
+        lines += ['    int {} = {};'.format(variable, index)
+                  for index, variable
+                  in enumerate(variable_names[self.parameters:],
+                               self.parameters)]
+        lines += ['    ' + template.format(*(variable_names[index]
+                                             for index in indices))
+                  for template, indices in self.statements]
+        lines += ['    return {};'.format(variable_names[self.result]),
+                  '}', '']
+        return '\n'.join(lines)
+
+
+def _get_variable_names(rand, count):
+    return rand.sample(['v{}'.format(i) for i in range(100)], count)
+
+
+def generate_project(directory, functions, functions_per_file=20,
+                     variables=(2, 8), statements=(6, 16), clone_ratio=0.1,
+                     mutations=1, seed=1):
+    """
+    Writes C files with the given number of functions to the directory.
+    ``clone_ratio`` of them are clones of other functions.
+
+    :return: A tuple of the list of the written files and a set of pairs of
+             the names of functions and their clones.
+    """
+    rand = random.Random(seed)
+    clone_count = int(functions * clone_ratio)
+    originals = [GeneratedFunction(rand,
+                                   rand.randint(*variables),
+                                   rand.randint(*statements))
+                 for _ in range(functions - clone_count)]
+    generated = [('f{}'.format(index), function)
+                 for index, function in enumerate(originals)]
+    clones = set()
+    for index in range(clone_count):
+        original = rand.randrange(len(originals))
+        name = 'clone{}'.format(index)
+        generated.append((name, originals[original].mutated(rand,
+                                                            mutations)))
+        clones.add(frozenset(('f{}'.format(original), name)))
+    rand.shuffle(generated)
+
+    filenames = []
+    for start in range(0, len(generated), functions_per_file):
+        filename = os.path.join(directory,
+                                'file{}.c'.format(len(filenames)))
+        with open(filename, 'w') as file:
+            file.write(_HEADER)
+            for name, function in generated[start:start+functions_per_file]:
+                file.write('\n' + function.render(
+                    name, _get_variable_names(rand, function.variables)))
+        filenames.append(filename)
+
+    return filenames, clones
+
+
+def run_benchmark(functions, functions_per_file, variables, statements,
+                  clone_ratio, mutations, solver, processes, prune,
+                  max_clone_difference):
+    with TemporaryDirectory() as directory:
+        filenames, clones = generate_project(
+            directory, functions, functions_per_file, variables, statements,
+            clone_ratio, mutations)
+        report = {'functions': functions, 'files': len(filenames),
+                  'injected_clones': len(clones)}
+
+        conditions = list(default_cc_dict.keys())
+        weightings = list(default_cc_dict.values())
+        creator = ClangCountVectorCreator(conditions, weightings)
+        parse_seconds, count_seconds = 0, 0
+        count_matrices = {}
+        for filename in filenames:
+            start = time.perf_counter()
+            get_translation_unit(filename)
+            parse_seconds += time.perf_counter() - start
+
+            # Takes the translation unit just parsed from the cache
+            start = time.perf_counter()
+            count_dict = creator.get_vectors_for_file(filename)
+            count_matrices.update(
+                ((filename,) + function, count_matrix)
+                for function, count_matrix in count_dict.items()
+                if not exclude_function(count_matrix))
+            count_seconds += time.perf_counter() - start
+        report['analyzed_functions'] = len(count_matrices)
+        report['parse_seconds'] = parse_seconds
+        report['count_matrix_seconds'] = count_seconds
+
+        start = time.perf_counter()
+        count_arrays = {function: get_count_array(count_matrix)
+                        for function, count_matrix in count_matrices.items()}
+        function_pairs = (
+            get_candidate_pairs(count_arrays, max_clone_difference)
+            if prune else list(combinations(count_arrays, 2)))
+        report['pairs'] = len(count_arrays) * (len(count_arrays) - 1) // 2
+        report['compared_pairs'] = len(function_pairs)
+        report['pruning_seconds'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        differences = list(get_differences(
+            function_pairs,
+            functools.partial(get_function_pair_difference,
+                              count_matrices=count_arrays,
+                              average_calculation=False,
+                              poly_postprocessing=True,
+                              exp_postprocessing=False,
+                              max_difference=max_clone_difference,
+                              assignment_solver=get_assignment_solver(
+                                  solver)),
+            processes))
+        report['comparison_seconds'] = time.perf_counter() - start
+        report['seconds'] = (parse_seconds + count_seconds +
+                             report['pruning_seconds'] +
+                             report['comparison_seconds'])
+
+        found = {frozenset((function_1[2].split('(')[0],
+                            function_2[2].split('(')[0]))
+                 for function_1, function_2, difference in differences
+                 if difference <= max_clone_difference}
+        report['found_clones'] = len(found)
+        report['found_injected_clones'] = len(found & clones)
+        report['recall'] = (len(found & clones) / len(clones) if clones
+                            else 1.0)
+        return report
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--functions', type=int, nargs='+',
+                        default=[100, 200, 400],
+                        help='numbers of functions of the generated projects')
+    parser.add_argument('--functions-per-file', type=int, default=20,
+                        help='number of functions in every file')
+    parser.add_argument('--variables', type=int, nargs=2, default=[2, 8],
+                        metavar=('MIN', 'MAX'),
+                        help='number of variables of every function')
+    parser.add_argument('--statements', type=int, nargs=2, default=[6, 16],
+                        metavar=('MIN', 'MAX'),
+                        help='number of statements of every function')
+    parser.add_argument('--clone-ratio', type=float, default=0.1,
+                        help='share of the functions being clones')
+    parser.add_argument('--mutations', type=int, default=1,
+                        help='number of statements replaced in every clone')
+    parser.add_argument('--solver', default='auto',
+                        help='assignment solver to compare the pairs with')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='number of processes comparing the pairs')
+    parser.add_argument('--no-pruning', dest='prune', action='store_false',
+                        help='compare all function pairs')
+    parser.add_argument('--max-clone-difference', type=float,
+                        default=DEFAULT_MAX_CLONE_DIFFERENCE,
+                        help='maximum difference of clones')
+    parser.add_argument('--json', action='store_true',
+                        help='print the report as JSON')
+    args = parser.parse_args(args)
+
+    reports = [run_benchmark(functions, args.functions_per_file,
+                             args.variables, args.statements,
+                             args.clone_ratio, args.mutations, args.solver,
+                             args.processes, args.prune,
+                             args.max_clone_difference)
+               for functions in args.functions]
+    if args.json:
+        print(json.dumps(reports, indent=2, sort_keys=True))
+        return
+
+    for report in reports:
+        print('{functions} functions in {files} files, {compared_pairs} of '
+              '{pairs} pairs compared'.format(**report))
+        print('  parsing: {parse_seconds:.3f}s, count matrices: '
+              '{count_matrix_seconds:.3f}s, pruning: {pruning_seconds:.3f}s, '
+              'comparison: {comparison_seconds:.3f}s'.format(**report))
+        print('  {found_injected_clones} of {injected_clones} injected '
+              'clones found (recall {recall:.2f}), {found_clones} clones '
+              'found in total'.format(**report))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Benchmarks the link checking bears against a local ``LinkCheckServer`` so
+no internet connection is needed.
+
+A corpus of text files with links to the server is generated, most links
+respond with 200, the others are broken, redirect, are rate limited or time
+out. Every bear is run on the whole corpus and the wall time and the number
+of links checked per second are reported::
+
+    python3 -m tests.benchmarks.LinkBearsBenchmark --links 10000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from queue import Queue
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from coalib.misc import Constants
+from coalib.settings.Section import Section
+
+from bears.general.HTTPSBear import HTTPSBear
+from bears.general.InvalidLinkBear import InvalidLinkBear
+from bears.general.MementoBear import MementoBear
+from bears.general.URLBear import URLBear
+from bears.general.URLHeadBear import URLHeadBear
+from tests.general.LinkCheckServer import LinkCheckServer
+
+_WORDS = ('the', 'bear', 'checks', 'links', 'in', 'documentation', 'and',
+          'reports', 'broken', 'ones', 'to', 'users', 'of', 'coala')
+
+
+def generate_corpus(server_url, links, links_per_file=100, broken_ratio=0.05,
+                    redirect_ratio=0.05, ratelimit_ratio=0.02,
+                    timeout_ratio=0.001, timeout=0.5, seed=1):
+    """
+    Generates a list of files, each one containing ``links_per_file`` lines
+    with a link to the server. All links are distinct.
+    """
+    rand = random.Random(seed)
+    paths = []
+    for i in range(links):
+        value = rand.random()
+        if value < broken_ratio:
+            path = '/status/' + rand.choice(('404', '410', '500'))
+        elif value < broken_ratio + redirect_ratio:
+            path = '/redirect/%d' % rand.randint(1, 3)
+        elif value < broken_ratio + redirect_ratio + ratelimit_ratio:
+            path = '/ratelimit/1/%d' % i
+        elif value < (broken_ratio + redirect_ratio + ratelimit_ratio +
+                      timeout_ratio):
+            path = '/slow/%s' % (2 * timeout)
+        else:
+            path = '/status/200'
+        paths.append('{} {}{}?link={} {}\n'.format(
+            ' '.join(rand.choice(_WORDS) for _ in range(4)),
+            server_url, path, i,
+            ' '.join(rand.choice(_WORDS) for _ in range(4))))
+
+    return [paths[i:i + links_per_file]
+            for i in range(0, len(paths), links_per_file)]
+
+
+def run_bear(bear_class, corpus, dependency_results=None, **settings):
+    """
+    Runs the bear on every file of the corpus.
+
+    :return: A tuple of the seconds needed and a list with the results of
+             every file.
+    """
+    bear = bear_class(Section(''), Queue())
+    results = []
+    start = time.perf_counter()
+    for index, file in enumerate(corpus):
+        kwargs = dict(settings)
+        if dependency_results is not None:
+            kwargs['dependency_results'] = dependency_results[index]
+        results.append(list(bear.run('file%d.txt' % index, file, **kwargs)))
+    return time.perf_counter() - start, results
+
+
+def run_benchmark(links, latency, timeout, timeout_ratio, host_rate,
+                  archive_cache_days):
+    server = LinkCheckServer(latency=latency,
+                             is_archived=lambda url: '/status/' in url)
+    with server, TemporaryDirectory() as data_dir, \
+            patch.object(Constants, 'USER_DATA_DIR', data_dir), \
+            patch.object(URLHeadBear, 'check_connection_url',
+                         server.url + '/status/200'), \
+            patch.object(MementoBear, 'timegate_uri', server.timegate_uri):
+        MementoBear.archived_links = None
+        HTTPSBear.https_hosts.clear()
+
+        corpus = generate_corpus(server.url, links, timeout=timeout,
+                                 timeout_ratio=timeout_ratio)
+        report = {'files': len(corpus), 'links': links, 'latency': latency,
+                  'bears': {}}
+
+        def record(name, seconds, results):
+            report['bears'][name] = {
+                'seconds': seconds,
+                'links_per_second': links / seconds,
+                'results': sum(len(file_results)
+                               for file_results in results)}
+
+        start = time.perf_counter()
+        seconds, url_results = run_bear(URLBear, corpus)
+        record('URLBear', seconds, url_results)
+
+        seconds, head_results = run_bear(
+            URLHeadBear, corpus,
+            [{URLBear.name: file_results} for file_results in url_results],
+            network_timeout={'*': timeout},
+            host_request_rate=host_rate,
+            host_request_burst=int(host_rate))
+        record('URLHeadBear', seconds, head_results)
+
+        head_dependencies = [{URLHeadBear.name: file_results}
+                             for file_results in head_results]
+        for name, bear_class, settings in (
+                ('InvalidLinkBear', InvalidLinkBear, {}),
+                ('HTTPSBear', HTTPSBear, {'network_timeout': {'*': timeout}}),
+                ('MementoBear', MementoBear,
+                 {'archive_cache_days': archive_cache_days}),
+                ('MementoBear (cached)', MementoBear,
+                 {'archive_cache_days': archive_cache_days})):
+            record(name, *run_bear(bear_class, corpus, head_dependencies,
+                                   **settings))
+
+        report['seconds'] = time.perf_counter() - start
+        report['requests'] = sum(server.requests.values())
+        MementoBear.archived_links = None
+        return report
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--links', type=int, default=10000,
+                        help='number of links in the generated corpus')
+    parser.add_argument('--latency', type=float, default=0.002,
+                        help='seconds every response of the server is '
+                             'delayed')
+    parser.add_argument('--timeout', type=float, default=0.5,
+                        help='network timeout of the bears in seconds')
+    parser.add_argument('--timeout-ratio', type=float, default=0.001,
+                        help='share of the links timing out')
+    parser.add_argument('--host-rate', type=float, default=10000,
+                        help='requests per second allowed to the server')
+    parser.add_argument('--archive-cache-days', type=int, default=30,
+                        help='archive_cache_days setting of MementoBear')
+    parser.add_argument('--json', action='store_true',
+                        help='print the report as JSON')
+    args = parser.parse_args(args)
+
+    report = run_benchmark(args.links, args.latency, args.timeout,
+                           args.timeout_ratio, args.host_rate,
+                           args.archive_cache_days)
+    if args.json:
+        print(json.dumps(report, indent=2, sort_keys=True))
+    else:
+        print('{files} files, {links} links, {latency}s latency'.format(
+            **report))
+        for name, bear_report in report['bears'].items():
+            print('{:>20}: {:10.0f} links/s ({:.3f}s, {} results)'.format(
+                name, bear_report['links_per_second'],
+                bear_report['seconds'], bear_report['results']))
+        print('total: {:.3f}s, {} requests'.format(report['seconds'],
+                                                   report['requests']))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
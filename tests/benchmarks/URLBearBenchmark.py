@@ -0,0 +1,197 @@
+"""
+Benchmarks the link extraction of ``URLBear`` on a generated corpus of
+markdown and HTML files.
+
+The current implementation is compared with the one that recompiled all
+regexes for every file and matched every link against every ignore glob
+separately::
+
+    python3 -m tests.benchmarks.URLBearBenchmark --lines 200000
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+
+from coalib.parsing.Globbing import fnmatch
+
+from bears.general.URLBear import LINK_CONTEXT, URLBear
+
+DEFAULT_LINK_IGNORE_REGEX = r'([.\/]example\.com|\{|\$)'
+DEFAULT_LINK_IGNORE_LIST = ('https://ci.coala.io/*',
+                            'http://localhost:*/**',
+                            'https://(gitlab|bitbucket).com/*/private/**')
+
+_HOSTS = ('github.com', 'coala.io', 'docs.python.org', 'readthedocs.io',
+          'gitlab.com', 'bitbucket.com', 'www.example.com', 'localhost:8000',
+          'ci.coala.io', 'en.wikipedia.org')
+
+_WORDS = ('the', 'bear', 'checks', 'links', 'in', 'documentation', 'and',
+          'reports', 'broken', 'ones', 'to', 'users', 'of', 'coala')
+
+
+def legacy_extract_links_from_file(file, link_ignore_regex,
+                                   link_ignore_list):
+    """
+    ``URLBear.extract_links_from_file`` as it was before the regexes were
+    compiled once per process.
+    """
+    link_ignore_regex = re.compile(link_ignore_regex)
+    regex = re.compile(
+        r"""
+        ((git\+|bzr\+|svn\+|hg\+|)
+        https?://
+        [^.:%\s_/?#[\]@\\]+
+        \.
+        (
+            ((?:%[A-Fa-f0-9][A-Fa-f0-9])*[^\s()%\'"`<>|\\\[\]]+)
+        |
+            \((?:%[A-Fa-f0-9][A-Fa-f0-9])*[^\s()%\'"`<>|\\\[\]]*\)
+        )
+        *)
+        (?<!\.)(?<!,)
+        """, re.VERBOSE)
+    file_context = {}
+    for line_number, line in enumerate(file):
+        xmlns_regex = re.compile(r'xmlns:?\w*="(.*)"')
+        for match in re.findall(regex, line):
+            link = match[0]
+            link_context = file_context.get(link)
+            if not link_context:
+                link_context = LINK_CONTEXT.no_context
+                xmlns_match = xmlns_regex.search(line)
+                if xmlns_match and link in xmlns_match.groups():
+                    link_context |= LINK_CONTEXT.xml_namespace
+                if link.startswith(('hg+', 'bzr+', 'git+', 'svn+')):
+                    link_context |= LINK_CONTEXT.pip_vcs_url
+                file_context[link] = link_context
+            if not (link_ignore_regex.search(link) or
+                    fnmatch(link, link_ignore_list)):
+                yield link, line_number, link_context
+
+
+def _random_link(rand):
+    path = '/'.join(rand.choice(_WORDS) for _ in range(rand.randint(0, 4)))
+    return '{}://{}/{}'.format(rand.choice(('http', 'https')),
+                               rand.choice(_HOSTS), path)
+
+
+def _random_text(rand, words):
+    return ' '.join(rand.choice(_WORDS) for _ in range(words))
+
+
+def generate_markdown_file(rand, lines, link_ratio):
+    """
+    Generates the lines of a markdown file where about ``link_ratio`` of the
+    lines contain a link.
+    """
+    result = []
+    for i in range(lines):
+        if i % 40 == 0:
+            result.append('# ' + _random_text(rand, 4) + '\n')
+        elif rand.random() < link_ratio:
+            result.append('{} [{}]({}) {}\n'.format(
+                _random_text(rand, 5), _random_text(rand, 2),
+                _random_link(rand), _random_text(rand, 3)))
+        else:
+            result.append(_random_text(rand, 12) + '\n')
+    return result
+
+
+def generate_html_file(rand, lines, link_ratio):
+    """
+    Generates the lines of a HTML file where about ``link_ratio`` of the
+    lines contain a link.
+    """
+    result = ['<html xmlns="http://www.w3.org/1999/xhtml">\n', '<body>\n']
+    for _ in range(lines - 4):
+        if rand.random() < link_ratio:
+            result.append('  <p>{} <a href="{}">{}</a></p>\n'.format(
+                _random_text(rand, 6), _random_link(rand),
+                _random_text(rand, 2)))
+        else:
+            result.append('  <p class="text">{}</p>\n'.format(
+                _random_text(rand, 10)))
+    result += ['</body>\n', '</html>\n']
+    return result
+
+
+def generate_corpus(total_lines, file_lines=500, link_ratio=0.1, seed=1):
+    """
+    Generates a list of files, half markdown and half HTML, with
+    ``total_lines`` lines overall.
+    """
+    rand = random.Random(seed)
+    generators = (generate_markdown_file, generate_html_file)
+    return [generators[i % 2](rand, file_lines, link_ratio)
+            for i in range(max(1, total_lines // file_lines))]
+
+
+def time_extraction(extract, corpus, link_ignore_regex, link_ignore_list):
+    """
+    :return: A tuple of the seconds needed to extract all links of the corpus
+             and the extracted links.
+    """
+    start = time.perf_counter()
+    links = [list(extract(file, link_ignore_regex, link_ignore_list))
+             for file in corpus]
+    return time.perf_counter() - start, links
+
+
+def run_benchmark(total_lines, link_ratio, repeat):
+    corpus = generate_corpus(total_lines, link_ratio=link_ratio)
+    line_count = sum(len(file) for file in corpus)
+    report = {'files': len(corpus), 'lines': line_count,
+              'link_ratio': link_ratio}
+
+    for name, extract in (('before', legacy_extract_links_from_file),
+                          ('after', URLBear.extract_links_from_file)):
+        timings = []
+        for _ in range(repeat):
+            seconds, links = time_extraction(extract,
+                                             corpus,
+                                             DEFAULT_LINK_IGNORE_REGEX,
+                                             DEFAULT_LINK_IGNORE_LIST)
+            timings.append(seconds)
+        report[name] = {'seconds': min(timings),
+                        'lines_per_second': line_count / min(timings),
+                        'links': sum(len(file_links)
+                                     for file_links in links)}
+        report[name + '_links'] = links
+
+    assert report.pop('before_links') == report.pop('after_links'), (
+        'The implementations extracted different links.')
+    report['speedup'] = (report['before']['seconds'] /
+                         report['after']['seconds'])
+    return report
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--lines', type=int, default=100000,
+                        help='number of lines in the generated corpus')
+    parser.add_argument('--link-ratio', type=float, default=0.1,
+                        help='share of the lines containing a link')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of runs, the fastest one is reported')
+    parser.add_argument('--json', action='store_true',
+                        help='print the report as JSON')
+    args = parser.parse_args(args)
+
+    report = run_benchmark(args.lines, args.link_ratio, args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2, sort_keys=True))
+    else:
+        print('{files} files, {lines} lines'.format(**report))
+        for name in ('before', 'after'):
+            print('{:>6}: {:10.0f} lines/s ({:.3f}s, {} links)'.format(
+                name, report[name]['lines_per_second'],
+                report[name]['seconds'], report[name]['links']))
+        print('speedup: {:.2f}x'.format(report['speedup']))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
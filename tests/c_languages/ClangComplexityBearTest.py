@@ -20,7 +20,8 @@ class ClangComplexityBearTest(unittest.TestCase):
         self.filename = os.path.abspath(os.path.join(os.path.dirname(__file__),
                                                      'codeclone_detection',
                                                      'conditions_samples.c'))
-        self.file = 'fake'
+        with open(self.filename) as file:
+            self.file = file.readlines()
         self.queue = Queue()
         self.section = Section('test section')
         self.bear = ClangComplexityBear(self.section, self.queue)
@@ -0,0 +1,72 @@
+import os
+import unittest
+from queue import Queue
+
+from coalib.results.Result import Result
+from coalib.results.SourceRange import SourceRange
+from coalib.settings.Section import Section
+
+from bears.c_languages.ClangFunctionMetricsBear import (
+    ClangFunctionMetricsBear, FunctionMetrics, get_functions_metrics)
+from bears.c_languages.ClangTranslationUnitCache import get_translation_unit
+from coalib.testing.BearTestHelper import generate_skip_decorator
+from coalib.testing.LocalBearTestHelper import execute_bear
+
+
+@generate_skip_decorator(ClangFunctionMetricsBear)
+class ClangFunctionMetricsBearTest(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                     'test_files',
+                                                     'function_metrics.c'))
+        with open(self.filename) as file:
+            self.file = file.readlines()
+        self.queue = Queue()
+        self.section = Section('test section')
+        self.bear = ClangFunctionMetricsBear(self.section, self.queue)
+
+    def test_metrics(self):
+        root = get_translation_unit(self.filename, self.file).cursor
+        results = [(cursor.displayname, metrics)
+                   for cursor, metrics
+                   in get_functions_metrics(root, self.filename)]
+        self.assertEqual(results, [
+            ('simple()', FunctionMetrics(cyclomatic_complexity=1,
+                                         nesting_depth=0,
+                                         statements=1,
+                                         parameters=0,
+                                         fan_out=0)),
+            ('nested(int, int, int)', FunctionMetrics(cyclomatic_complexity=7,
+                                                      nesting_depth=4,
+                                                      statements=13,
+                                                      parameters=3,
+                                                      fan_out=2)),
+            # Branches and bodies without braces are statements as well
+            ('unbraced(int)', FunctionMetrics(cyclomatic_complexity=3,
+                                              nesting_depth=2,
+                                              statements=6,
+                                              parameters=1,
+                                              fan_out=0))])
+
+    def test_output(self):
+        with execute_bear(self.bear, self.filename, self.file,
+                          max_nesting_depth=3,
+                          max_parameters=2) as out:
+            self.assertEqual(out, [
+                Result(self.bear,
+                       "The function 'nested(int, int, int)' should be "
+                       'simplified. Its nesting depth is 4 which exceeds the '
+                       'maximum of 3.',
+                       affected_code=(SourceRange.from_values(
+                           self.filename, 9, 1, 30, 2),)),
+                Result(self.bear,
+                       "The function 'nested(int, int, int)' should be "
+                       'simplified. Its number of parameters is 3 which '
+                       'exceeds the maximum of 2.',
+                       affected_code=(SourceRange.from_values(
+                           self.filename, 9, 1, 30, 2),))])
+
+    def test_default_thresholds(self):
+        with execute_bear(self.bear, self.filename, self.file) as out:
+            self.assertEqual(out, [])
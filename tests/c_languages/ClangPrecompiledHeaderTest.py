@@ -0,0 +1,126 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from bears.c_languages import ClangPrecompiledHeader
+from bears.c_languages.ClangBear import ClangBear
+from bears.c_languages.ClangPrecompiledHeader import (
+    get_precompiled_header, get_prefix_header_args, get_source_language)
+from coalib.misc import Constants
+from coalib.settings.Section import Section
+from coalib.settings.Setting import Setting
+from coalib.testing.BearTestHelper import generate_skip_decorator
+
+
+@generate_skip_decorator(ClangBear)
+class ClangPrecompiledHeaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = TemporaryDirectory()
+        self.data_dir_patch = patch.object(Constants, 'USER_DATA_DIR',
+                                           self.data_dir.name)
+        self.data_dir_patch.start()
+        self.cache_patch = patch.dict(
+            ClangPrecompiledHeader._precompiled_headers, clear=True)
+        self.cache_patch.start()
+
+        self.source_dir = TemporaryDirectory()
+        self.header = os.path.join(self.source_dir.name, 'prefix.h')
+        self.included = os.path.join(self.source_dir.name, 'point.h')
+        with open(self.header, 'w') as file:
+            file.write('#include "point.h"\n')
+        self.write_included('struct point { int x, y; };\n')
+
+    def tearDown(self):
+        self.cache_patch.stop()
+        self.data_dir_patch.stop()
+        self.data_dir.cleanup()
+        self.source_dir.cleanup()
+
+    def write_included(self, contents):
+        with open(self.included, 'w') as file:
+            file.write(contents)
+        # Make sure the change is visible even with coarse timestamps
+        stat = os.stat(self.included)
+        os.utime(self.included, ns=(stat.st_atime_ns,
+                                    stat.st_mtime_ns + 10**9))
+
+    def test_reuse_and_invalidation(self):
+        build = ClangPrecompiledHeader.build_precompiled_header
+        with patch.object(ClangPrecompiledHeader, 'build_precompiled_header',
+                          side_effect=build) as build_mock:
+            pch_path = get_precompiled_header(self.header)
+            self.assertTrue(os.path.isfile(pch_path))
+            self.assertEqual(get_precompiled_header(self.header), pch_path)
+            self.assertEqual(build_mock.call_count, 1)
+
+            # Loaded from disk in a later run
+            ClangPrecompiledHeader._precompiled_headers.clear()
+            self.assertEqual(get_precompiled_header(self.header), pch_path)
+            self.assertEqual(build_mock.call_count, 1)
+
+            self.write_included('struct point { int x, y, z; };\n')
+            self.assertEqual(get_precompiled_header(self.header), pch_path)
+            self.assertEqual(build_mock.call_count, 2)
+
+            self.assertNotEqual(get_precompiled_header(self.header, ['-DX']),
+                                pch_path)
+            self.assertEqual(build_mock.call_count, 3)
+
+    def test_info_loaded_once(self):
+        pch_path = get_precompiled_header(self.header)
+        with patch.object(ClangPrecompiledHeader, 'pickle_load') as load:
+            self.assertEqual(get_precompiled_header(self.header), pch_path)
+            self.assertFalse(load.called)
+
+    def test_invalid_header(self):
+        header = os.path.join(self.source_dir.name, 'not_existing')
+        self.assertEqual(get_prefix_header_args(header),
+                         ['-include', header])
+
+    def test_clang_bear(self):
+        filename = os.path.join(self.source_dir.name, 'test.c')
+        file = ['int f(struct point p) { return p.x; }\n']
+        section = Section('test section')
+        self.assertNotEqual(list(ClangBear(section, None).run(filename,
+                                                              file)),
+                            [])
+
+        section.append(Setting('prefix_header', self.header))
+        bear = ClangBear(section, None)
+        self.assertEqual(list(bear.execute(filename, file)), [])
+        self.assertEqual(get_prefix_header_args(self.header)[0],
+                         '-include-pch')
+
+    def test_source_language(self):
+        self.assertEqual(get_source_language('a.c'), 'c')
+        self.assertEqual(get_source_language('a.cpp'), 'c++')
+        self.assertEqual(get_source_language('a.h', ['-x', 'c++']), 'c++')
+        self.assertEqual(get_source_language('a.cc', ['-xc']), 'c')
+
+    def test_clang_bear_cpp(self):
+        section = Section('test section')
+        section.append(Setting('prefix_header', self.header))
+        file = ['int f(point p) { return p.x; }\n']
+        for filename in ('test.cpp', 'test.c'):
+            filename = os.path.join(self.source_dir.name, filename)
+            # C++ doesn't need the struct keyword, C does
+            results = list(ClangBear(section, None).execute(filename, file))
+            self.assertEqual(results == [], filename.endswith('.cpp'))
+
+        self.assertNotEqual(get_precompiled_header(self.header),
+                            get_precompiled_header(self.header,
+                                                   language='c++'))
+
+    def test_clang_bear_pch_fallback(self):
+        filename = os.path.join(self.source_dir.name, 'test.c')
+        file = ['int f(struct point p) { return p.x; }\n']
+        section = Section('test section')
+        section.append(Setting('prefix_header', self.header))
+        # A precompiled header clang can't load
+        with patch.object(ClangPrecompiledHeader, 'get_precompiled_header',
+                          return_value=self.included):
+            self.assertEqual(list(ClangBear(section, None).execute(filename,
+                                                                   file)),
+                             [])
@@ -0,0 +1,67 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from clang.cindex import TranslationUnitLoadError
+
+from bears.c_languages import ClangTranslationUnitCache
+from bears.c_languages.ClangBear import ClangBear
+from bears.c_languages.ClangComplexityBear import ClangComplexityBear
+from bears.c_languages.ClangTranslationUnitCache import get_translation_unit
+from coalib.settings.Section import Section
+from coalib.testing.BearTestHelper import generate_skip_decorator
+
+
+@generate_skip_decorator(ClangBear)
+class ClangTranslationUnitCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.filename = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                     'codeclone_detection',
+                                                     'conditions_samples.c'))
+        with open(self.filename) as file:
+            self.file = file.readlines()
+
+    def test_cache(self):
+        translation_unit = get_translation_unit(self.filename, self.file)
+        self.assertIs(get_translation_unit(self.filename, self.file),
+                      translation_unit)
+        # The file on disk has the same contents
+        self.assertIs(get_translation_unit(self.filename), translation_unit)
+
+        self.assertIsNot(get_translation_unit(self.filename,
+                                              self.file,
+                                              ['-DX']),
+                         translation_unit)
+        changed = get_translation_unit(self.filename, ['int f();\n'])
+        self.assertIsNot(changed, translation_unit)
+        self.assertEqual([cursor.spelling
+                          for cursor in changed.cursor.get_children()
+                          if cursor.location.file is not None],
+                         ['f'])
+
+    def test_eviction(self):
+        with patch.object(ClangTranslationUnitCache,
+                          'MAX_CACHED_TRANSLATION_UNITS', 2):
+            translation_unit = get_translation_unit('a.c', ['int a;\n'])
+            get_translation_unit('b.c', ['int b;\n'])
+            get_translation_unit('c.c', ['int c;\n'])
+            self.assertIsNot(get_translation_unit('a.c', ['int a;\n']),
+                             translation_unit)
+
+    def test_not_existing(self):
+        with self.assertRaises(TranslationUnitLoadError):
+            get_translation_unit('not_existing')
+
+    def test_bears_share_translation_unit(self):
+        with patch.object(ClangTranslationUnitCache, '_translation_units',
+                          ClangTranslationUnitCache.OrderedDict()), \
+                patch('clang.cindex.Index.parse',
+                      autospec=True,
+                      side_effect=ClangTranslationUnitCache.Index.parse
+                      ) as parse:
+            section = Section('test section')
+            file = ['int f(void) { return 0; }\n']
+            list(ClangBear(section, None).run('t.c', file))
+            list(ClangComplexityBear(section, None).run('t.c', file))
+            self.assertEqual(parse.call_count, 1)
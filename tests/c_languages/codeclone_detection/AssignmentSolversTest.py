@@ -0,0 +1,52 @@
+import unittest
+
+import numpy
+
+from bears.c_languages.codeclone_detection.AssignmentSolvers import (
+    ASSIGNMENT_SOLVERS, get_assignment_solver, linear_sum_assignment,
+    solve_munkres, solve_numpy, solve_scipy)
+
+
+class AssignmentSolversTest(unittest.TestCase):
+
+    def check_solvers(self, cost_matrix, solvers):
+        expected = sum(cost_matrix[row, column]
+                       for row, column in solve_munkres(cost_matrix))
+        for solver in solvers:
+            matching = solver(cost_matrix)
+            self.assertEqual([row for row, column in matching],
+                             list(range(len(cost_matrix))))
+            self.assertEqual(len({column for row, column in matching}),
+                             len(cost_matrix))
+            self.assertAlmostEqual(sum(cost_matrix[row, column]
+                                       for row, column in matching),
+                                   expected)
+
+    def check_random_matrices(self, solvers):
+        random = numpy.random.RandomState(0)
+        self.check_solvers(numpy.zeros((1, 1)), solvers)
+        self.check_solvers(numpy.ones((3, 3)), solvers)
+        for size in (2, 5, 20):
+            for i in range(10):
+                self.check_solvers(random.rand(size, size), solvers)
+                # Many equal fields
+                self.check_solvers(numpy.round(random.rand(size, size) * 3),
+                                   solvers)
+                self.check_solvers(random.rand(size, size + 2), solvers)
+
+    def test_numpy_solver(self):
+        self.check_random_matrices((solve_numpy,))
+
+    @unittest.skipIf(linear_sum_assignment is None, 'SciPy is not installed')
+    def test_scipy_solver(self):
+        self.check_random_matrices((solve_scipy,))
+
+    def test_get_assignment_solver(self):
+        self.assertIs(get_assignment_solver(),
+                      solve_numpy if linear_sum_assignment is None
+                      else solve_scipy)
+        self.assertIs(get_assignment_solver('Munkres'), solve_munkres)
+        self.assertEqual(set(ASSIGNMENT_SOLVERS),
+                         {'scipy', 'numpy', 'munkres'})
+        with self.assertRaisesRegex(ValueError, 'Unknown assignment solver'):
+            get_assignment_solver('magic')
@@ -2,11 +2,14 @@ import os
 import sys
 
 from queue import Queue
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
 from bears.c_languages.codeclone_detection.ClangCloneDetectionBear import (
     ClangCloneDetectionBear)
 from bears.c_languages.codeclone_detection.ClangFunctionDifferenceBear import (
     ClangFunctionDifferenceBear)
+from coalib.misc import Constants
 from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
 from coalib.results.Result import Result
 from coalib.testing.BearTestHelper import generate_skip_decorator
@@ -28,6 +31,15 @@ class ClangCloneDetectionBearTest(LocalBearTestHelper):
         self.clone_files = [os.listdir(os.path.join(self.base_test_path,
                                                     'clones'))]
 
+        self.data_dir = TemporaryDirectory()
+        self.data_dir_patch = patch.object(Constants, 'USER_DATA_DIR',
+                                           self.data_dir.name)
+        self.data_dir_patch.start()
+
+    def tearDown(self):
+        self.data_dir_patch.stop()
+        self.data_dir.cleanup()
+
     def test_dependencies(self):
         self.assertIn(ClangFunctionDifferenceBear,
                       ClangCloneDetectionBear.BEAR_DEPS)
@@ -426,6 +438,19 @@ class ClangCloneDetectionBearTest(LocalBearTestHelper):
                                         lambda results, msg:
                                         self.assertNotEqual(results, [], msg))
 
+    def test_stored_differences_and_debug_message(self):
+        self.section.append(Setting('max_stored_difference', '0.308'))
+        faculty = os.path.join(self.base_test_path, 'clones', 'faculty.c')
+
+        results = self.get_results_clone_detection_bear(faculty)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].debug_msg, '')
+
+        self.section.append(Setting('debug_count_matrices', 'true'))
+        results = self.get_results_clone_detection_bear(faculty)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(sorted(results[0].debug_msg[0]), ['2', 'result', 'x'])
+
     def get_results_clone_detection_bear(self, file):
         """
         Get the results of ClangCloneDetectionBear.
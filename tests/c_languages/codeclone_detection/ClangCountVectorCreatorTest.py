@@ -1,5 +1,7 @@
 import os
+import sys
 import unittest
+from tempfile import TemporaryDirectory
 
 from clang.cindex import CursorKind
 
@@ -86,3 +88,17 @@ class ClangCountVectorCreatorTest(unittest.TestCase):
         cv_dict = self.uut.get_vectors_for_file(self.testfile)
 
         self.check_cv_dict(cv_dict, expected_results)
+
+    def test_deep_nesting(self):
+        depth = sys.getrecursionlimit()
+        with TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'deep.c')
+            with open(filename, 'w') as file:
+                file.write('int deep(int x) {\n' + 'if (1) ' * depth +
+                           'return x;\n}\n')
+
+            self.uut = ClangCountVectorCreator([no_condition])
+            cv_dict = self.uut.get_vectors_for_file(filename)
+
+        self.check_cv_dict(cv_dict,
+                           {(1, 'deep(int)'): {'x': [2], '1': [depth]}})
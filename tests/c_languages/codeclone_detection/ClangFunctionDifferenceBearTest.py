@@ -0,0 +1,83 @@
+import functools
+import json
+import os
+import unittest
+from itertools import combinations
+from queue import Queue
+from tempfile import TemporaryDirectory
+
+import numpy
+
+from bears.c_languages.codeclone_detection.ClangFunctionDifferenceBear import (
+    ClangFunctionDifferenceBear, get_differences)
+from bears.c_languages.codeclone_detection.CloneDetectionRoutines import (
+    get_function_pair_difference)
+from coalib.settings.Section import Section
+from coalib.settings.Setting import Setting
+
+
+class GetDifferencesTest(unittest.TestCase):
+
+    def setUp(self):
+        random = numpy.random.RandomState(0)
+        self.count_arrays = {
+            ('file.c', i, 'f{}()'.format(i)):
+                numpy.round(random.rand(random.randint(2, 6), 4) * 3)
+            for i in range(12)}
+        self.function_pairs = list(combinations(sorted(self.count_arrays),
+                                                2))
+        self.difference_function = functools.partial(
+            get_function_pair_difference,
+            count_matrices=self.count_arrays,
+            average_calculation=False,
+            poly_postprocessing=True,
+            exp_postprocessing=False)
+
+    def test_serial(self):
+        differences = list(get_differences(self.function_pairs,
+                                           self.difference_function))
+        self.assertEqual([(f1, f2) for f1, f2, difference in differences],
+                         self.function_pairs)
+
+    def test_parallel(self):
+        expected = list(map(self.difference_function, self.function_pairs))
+        self.assertEqual(list(get_differences(self.function_pairs,
+                                              self.difference_function,
+                                              processes=3,
+                                              chunk_size=10)),
+                         expected)
+
+
+class GetCompileCommandsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.project_dir = TemporaryDirectory()
+        self.project = self.project_dir.name
+        section = Section('default')
+        section.append(Setting('files', '',
+                               origin=os.path.join(self.project, '.coafile')))
+        self.queue = Queue()
+        self.uut = ClangFunctionDifferenceBear({}, section, self.queue)
+
+    def tearDown(self):
+        self.project_dir.cleanup()
+
+    def write_compile_commands(self, contents):
+        with open(os.path.join(self.project, 'compile_commands.json'),
+                  'w') as file:
+            file.write(contents)
+
+    def test_default(self):
+        self.assertIsNone(self.uut.get_compile_commands(''))
+
+        self.write_compile_commands(json.dumps([
+            {'directory': self.project,
+             'arguments': ['cc', '-DX', '-c', 'a.c'],
+             'file': 'a.c'}]))
+        self.assertEqual(self.uut.get_compile_commands(''),
+                         {os.path.join(self.project, 'a.c'): ['-DX']})
+
+    def test_invalid(self):
+        self.write_compile_commands('[{}]')
+        self.assertIsNone(self.uut.get_compile_commands(self.project))
+        self.assertIn('could not be loaded', self.queue.get().message)
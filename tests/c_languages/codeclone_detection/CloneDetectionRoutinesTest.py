@@ -1,7 +1,34 @@
+import os
 import unittest
+from collections import OrderedDict
+from itertools import combinations, product
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
+import numpy
+
+from bears.c_languages.codeclone_detection.ClangCountVectorCreator import (
+    ClangCountVectorCreator)
+from bears.c_languages.codeclone_detection.ClangFunctionDifferenceBear import (
+    default_cc_dict)
 from bears.c_languages.codeclone_detection.CloneDetectionRoutines import (
-    relative_difference)
+    compare_functions, get_candidate_pairs, get_cost_matrices,
+    get_count_array, get_count_matrices, get_difference_lower_bound,
+    get_norm_signature, get_signature_lower_bound, pack_count_matrix,
+    pad_count_arrays, relative_difference, unpack_count_matrix)
+from bears.c_languages.codeclone_detection.CountVector import CountVector
+from coalib.misc import Constants
+from tests.c_languages import skip_if_no_clang
+
+
+def create_count_matrix(count_vectors):
+    count_matrix = OrderedDict()
+    for i, counts in enumerate(count_vectors):
+        count_vector = CountVector(str(i),
+                                   conditions=[lambda: False for x in counts])
+        count_vector.count_vector = counts
+        count_matrix[str(i)] = count_vector
+    return count_matrix
 
 
 class CloneDetectionRoutinesTest(unittest.TestCase):
@@ -18,3 +45,196 @@ class CloneDetectionRoutinesTest(unittest.TestCase):
         self.assertEqual(relative_difference(0, 0), 1)
         self.assertEqual(relative_difference(1, 0), 1)
         self.assertEqual(relative_difference(0.5, 2), 0.25)
+
+    def test_count_array(self):
+        count_matrix = create_count_matrix([[1, 2, 0], [0, 0, 3]])
+        count_array = get_count_array(count_matrix)
+        self.assertEqual(count_array.shape, (2, 3))
+        self.assertEqual(count_array.tolist(), [[1, 2, 0], [0, 0, 3]])
+
+    def test_pad_count_arrays(self):
+        small = get_count_array(create_count_matrix([[1, 2]]))
+        big = get_count_array(create_count_matrix([[3, 4], [5, 6]]))
+        for arrays in ((small, big), (big, small)):
+            ca1, ca2 = pad_count_arrays(*arrays)
+            self.assertIs(ca1, big)
+            self.assertEqual(ca2.tolist(), [[1, 2], [0, 0]])
+        self.assertEqual(small.tolist(), [[1, 2]])
+
+    def test_cost_matrices(self):
+        cm1 = create_count_matrix([[0, 1, 4], [2, 2, 0], [0, 0, 0]])
+        cm2 = create_count_matrix([[1, 0, 3], [0, 0, 0]])
+        differences, maxabs = get_cost_matrices(get_count_array(cm1),
+                                                get_count_array(cm2))
+        for i, cv1 in enumerate(cm1.values()):
+            for j, cv2 in enumerate(cm2.values()):
+                self.assertAlmostEqual(differences[i, j],
+                                       cv1.difference(cv2))
+                self.assertAlmostEqual(maxabs[i, j], cv1.maxabs(cv2))
+
+    def test_compare_functions(self):
+        cm1 = create_count_matrix([[0, 1, 4], [2, 2, 0]])
+        cm2 = create_count_matrix([[2, 2, 0], [0, 1, 4]])
+        self.assertEqual(compare_functions(cm1, cm2), 0)
+        self.assertEqual(
+            compare_functions(get_count_array(cm1), get_count_array(cm2)), 0)
+
+        cm3 = create_count_matrix([[2, 2, 0]])
+        self.assertEqual(compare_functions(cm3, cm1),
+                         compare_functions(cm1, cm3))
+        self.assertGreater(compare_functions(cm1, cm3), 0)
+
+    def test_difference_lower_bound(self):
+        random = numpy.random.RandomState(0)
+        for size, settings in product((2, 4, 7),
+                                      product((False, True), repeat=3)):
+            for i in range(10):
+                ca1 = numpy.round(random.rand(size, 5) * 4)
+                ca2 = numpy.round(random.rand(size - i % 2, 5) * 4)
+                ca1[:, random.rand(5) < 0.3] = 0
+                difference = compare_functions(ca1, ca2, *settings)
+
+                differences, maxabs = get_cost_matrices(
+                    *pad_count_arrays(ca1, ca2))
+                cost_matrix = numpy.ones_like(differences)
+                numpy.divide(differences, maxabs, out=cost_matrix,
+                             where=maxabs != 0)
+                lower_bound = get_difference_lower_bound(
+                    differences, maxabs, cost_matrix, *settings)
+                self.assertLessEqual(lower_bound, difference + 1e-12)
+
+                self.assertEqual(compare_functions(ca1, ca2, *settings,
+                                                   max_difference=difference),
+                                 difference)
+                rejected = compare_functions(ca1, ca2, *settings,
+                                             max_difference=lower_bound / 2)
+                self.assertGreaterEqual(rejected, lower_bound / 2)
+                self.assertLessEqual(rejected, difference + 1e-12)
+
+    def test_candidate_pairs(self):
+        random = numpy.random.RandomState(1)
+        count_arrays = OrderedDict()
+        for i in range(40):
+            count_array = numpy.round(random.rand(random.randint(2, 6), 4) *
+                                      random.randint(1, 6))
+            count_arrays['f%d' % i] = count_array
+            # Some near clones
+            if i % 4 == 0:
+                count_arrays['g%d' % i] = count_array[::-1] + (
+                    random.rand(*count_array.shape) < 0.1)
+        all_pairs = list(combinations(count_arrays, 2))
+
+        for settings in product((False, True), repeat=2):
+            candidates = get_candidate_pairs(count_arrays, 0.2, False,
+                                             *settings)
+            self.assertLess(len(candidates), len(all_pairs))
+            self.assertEqual(candidates,
+                             [pair for pair in all_pairs
+                              if pair in set(candidates)])
+            for pair in all_pairs:
+                ca1, ca2 = (count_arrays[function] for function in pair)
+                difference = compare_functions(ca1, ca2, False, *settings)
+                self.assertLessEqual(
+                    get_signature_lower_bound(get_norm_signature(ca1),
+                                              get_norm_signature(ca2),
+                                              *settings),
+                    difference + 1e-12)
+                if difference < 0.2:
+                    self.assertIn(pair, candidates)
+
+        self.assertEqual(get_candidate_pairs(count_arrays, None), all_pairs)
+        self.assertEqual(get_candidate_pairs(count_arrays, 0.2, True),
+                         all_pairs)
+        count_arrays['f0'][0, 0] = -1
+        self.assertEqual(get_candidate_pairs(count_arrays, 0.2), all_pairs)
+
+    def test_norm_signature(self):
+        self.assertEqual(
+            get_norm_signature(numpy.array([[3, 4], [0, 1], [6, 8]]))
+            .tolist(), [10, 5, 1])
+        self.assertEqual(
+            get_signature_lower_bound(numpy.array([0.0]), numpy.array([0.0]),
+                                      True, True), 1)
+
+    def test_pack_count_matrix(self):
+        conditions = [lambda: False, lambda: True]
+        count_matrix = create_count_matrix([[1, 2], [0, 3]])
+        for count_vector in count_matrix.values():
+            count_vector.unweighted = [7, 8]
+        count_matrix['0'].category = 'function'
+        packed = pack_count_matrix(count_matrix)
+        self.assertEqual(packed, (['0', '1'], ['function', None],
+                                  [[1, 2], [0, 3]], [[7, 8], [7, 8]]))
+
+        unpacked = unpack_count_matrix(packed, conditions, [2, 3])
+        self.assertEqual(list(unpacked), ['0', '1'])
+        self.assertEqual(unpacked['0'].category, 'function')
+        self.assertEqual(unpacked['1'].count_vector, [0, 3])
+        self.assertEqual(unpacked['1'].unweighted, [7, 8])
+        self.assertIs(unpacked['1'].conditions, conditions)
+        self.assertEqual(unpacked['1'].weightings, [2, 3])
+
+
+@skip_if_no_clang()
+class GetCountMatricesTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = os.path.join(os.path.dirname(__file__),
+                                 'clone_detection_samples',
+                                 'clones')
+        self.filenames = [os.path.join(directory, filename)
+                          for filename in ('faculty.c', 's1a.c', 's2a.c')]
+        self.count_vector_creator = ClangCountVectorCreator(
+            list(default_cc_dict.keys()), list(default_cc_dict.values()))
+
+        self.data_dir = TemporaryDirectory()
+        self.data_dir_patch = patch.object(Constants, 'USER_DATA_DIR',
+                                           self.data_dir.name)
+        self.data_dir_patch.start()
+
+    def tearDown(self):
+        self.data_dir_patch.stop()
+        self.data_dir.cleanup()
+
+    def get_count_matrices(self, processes):
+        progress = []
+        parse_times = []
+        count_matrices = get_count_matrices(
+            self.count_vector_creator,
+            self.filenames,
+            progress.append,
+            self.filenames[0],
+            [],
+            processes,
+            lambda filename, seconds: parse_times.append(filename))
+        self.assertEqual(progress, [100*(i/3) for i in range(3)])
+        self.assertEqual(parse_times, self.filenames)
+        return {function: {name: (cv.category, cv.count_vector,
+                                  cv.unweighted)
+                           for name, cv in count_matrix.items()}
+                for function, count_matrix in count_matrices.items()}
+
+    def test_parallel(self):
+        expected = self.get_count_matrices(processes=1)
+        self.assertTrue(expected)
+        self.assertEqual(self.get_count_matrices(processes=2), expected)
+
+    def test_compile_commands(self):
+        faculty, s1a, s2a = self.filenames
+        directory = os.path.dirname(faculty)
+        with patch.object(
+                self.count_vector_creator,
+                'get_vectors_and_includes_for_file',
+                return_value=({}, [])) as parse:
+            get_count_matrices(self.count_vector_creator,
+                               self.filenames,
+                               lambda progress: None,
+                               faculty,
+                               ['/extra'],
+                               compile_commands={s1a: ['-DX=1']})
+
+        self.assertEqual(
+            [(call[0][0], call[1]['args']) for call in parse.call_args_list],
+            [(faculty, ['-I' + directory, '-I/extra']),
+             (s1a, ['-DX=1', '-I/extra']),
+             (s2a, ['-I' + directory, '-I/extra'])])
@@ -0,0 +1,88 @@
+import json
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from bears.c_languages.codeclone_detection import CompileCommands
+from bears.c_languages.codeclone_detection.CompileCommands import (
+    get_clang_args, get_project_include_paths, load_compile_commands)
+from coalib.misc import Constants
+
+
+class CompileCommandsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = TemporaryDirectory()
+        self.data_dir_patch = patch.object(Constants, 'USER_DATA_DIR',
+                                           self.data_dir.name)
+        self.data_dir_patch.start()
+        self.project_dir = TemporaryDirectory()
+        self.project = self.project_dir.name
+
+    def tearDown(self):
+        self.data_dir_patch.stop()
+        self.data_dir.cleanup()
+        self.project_dir.cleanup()
+
+    def write_compile_commands(self, commands):
+        with open(os.path.join(self.project, 'compile_commands.json'),
+                  'w') as file:
+            json.dump(commands, file)
+
+    def test_clang_args(self):
+        self.assertEqual(
+            get_clang_args(['cc', '-I', 'inc', '-isystem/usr/x', '-DA',
+                            '-MD', '-MF', 'a.d', '-o', 'a.o', '-c',
+                            '-std=c99', '../src/a.c', '-include', 'b.h'],
+                           '/project/build',
+                           '/project/src/a.c'),
+            ['-I', '/project/build/inc', '-isystem/usr/x', '-DA',
+             '-std=c99', '-include', '/project/build/b.h'])
+
+    def test_load_compile_commands(self):
+        self.write_compile_commands([
+            {'directory': self.project,
+             'command': 'gcc -Iinclude "-DNAME=a b" -c a.c',
+             'file': 'a.c'},
+            {'directory': self.project,
+             'arguments': ['clang', '-DB', '-c', 'b.c'],
+             'file': os.path.join(self.project, 'b.c')},
+            {'directory': self.project,
+             'arguments': ['clang', '-DOTHER', '-c', 'b.c'],
+             'file': 'b.c'}])
+
+        expected = {
+            os.path.join(self.project, 'a.c'): [
+                '-I' + os.path.join(self.project, 'include'),
+                '-DNAME=a b'],
+            os.path.join(self.project, 'b.c'): ['-DB']}
+        self.assertEqual(load_compile_commands(self.project), expected)
+        self.assertEqual(load_compile_commands(
+            os.path.join(self.project, 'compile_commands.json')), expected)
+
+    def test_invalid_compile_commands(self):
+        self.write_compile_commands([{'file': 'a.c'}])
+        with self.assertRaisesRegex(ValueError, 'Invalid compile command'):
+            load_compile_commands(self.project)
+
+        with self.assertRaises(OSError):
+            load_compile_commands(os.path.join(self.project, 'missing'))
+
+    def test_project_include_paths(self):
+        os.makedirs(os.path.join(self.project, 'a', 'b'))
+        with patch.object(CompileCommands, 'iglob',
+                          wraps=CompileCommands.iglob) as collect:
+            include_paths = get_project_include_paths(self.project)
+            self.assertEqual(sorted(include_paths),
+                             [self.project,
+                              os.path.join(self.project, 'a'),
+                              os.path.join(self.project, 'a', 'b')])
+            self.assertEqual(get_project_include_paths(self.project),
+                             include_paths)
+            self.assertEqual(collect.call_count, 1)
+
+            os.makedirs(os.path.join(self.project, 'a', 'b', 'c'))
+            self.assertIn(os.path.join(self.project, 'a', 'b', 'c'),
+                          get_project_include_paths(self.project))
+            self.assertEqual(collect.call_count, 2)
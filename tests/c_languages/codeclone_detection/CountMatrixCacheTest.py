@@ -0,0 +1,111 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from bears.c_languages.codeclone_detection.ClangCountVectorCreator import (
+    ClangCountVectorCreator)
+from bears.c_languages.codeclone_detection.ClangFunctionDifferenceBear import (
+    default_cc_dict)
+from bears.c_languages.codeclone_detection.CloneDetectionRoutines import (
+    get_count_matrices)
+from bears.c_languages.codeclone_detection.CountMatrixCache import (
+    CountMatrixCache, hash_file)
+from coalib.misc import Constants
+from tests.c_languages import skip_if_no_clang
+
+MAIN_FILE = """#include "defs.h"
+
+int faculty(int x) {
+    int result = x;
+    while(x > LIMIT) {
+        result *= --x;
+    }
+
+    return result;
+}
+"""
+
+
+@skip_if_no_clang()
+class CountMatrixCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = TemporaryDirectory()
+        self.data_dir_patch = patch.object(Constants, 'USER_DATA_DIR',
+                                           self.data_dir.name)
+        self.data_dir_patch.start()
+
+        self.project_dir = TemporaryDirectory()
+        self.main_file = os.path.join(self.project_dir.name, 'main.c')
+        self.header_file = os.path.join(self.project_dir.name, 'defs.h')
+        self.write(self.main_file, MAIN_FILE)
+        self.write(self.header_file, '#define LIMIT 2\n')
+
+        self.conditions = list(default_cc_dict.keys())
+        self.weightings = list(default_cc_dict.values())
+
+    def tearDown(self):
+        self.data_dir_patch.stop()
+        self.data_dir.cleanup()
+        self.project_dir.cleanup()
+
+    @staticmethod
+    def write(filename, contents):
+        with open(filename, 'w') as file:
+            file.write(contents)
+
+    def get_count_matrices(self, weightings=None):
+        """
+        :return: A tuple of the count matrices and the number of parsed
+                 files.
+        """
+        cache = CountMatrixCache(self.project_dir.name,
+                                 self.conditions,
+                                 weightings or self.weightings)
+        count_vector_creator = ClangCountVectorCreator(
+            self.conditions, weightings or self.weightings)
+        with patch.object(
+                count_vector_creator, 'get_vectors_and_includes_for_file',
+                wraps=count_vector_creator
+                .get_vectors_and_includes_for_file) as parse:
+            count_matrices = get_count_matrices(count_vector_creator,
+                                                [self.main_file],
+                                                lambda progress: None,
+                                                self.main_file,
+                                                [],
+                                                cache=cache)
+        cache.save()
+        return ({function: {name: count_vector.count_vector
+                            for name, count_vector in count_matrix.items()}
+                 for function, count_matrix in count_matrices.items()},
+                parse.call_count)
+
+    def test_hash_file(self):
+        self.assertEqual(hash_file(self.header_file),
+                         '9136bb5d2268c75e1e170bbfa9a1a2de3e3ae959')
+        self.assertIsNone(hash_file(self.header_file + '.missing'))
+
+    def test_unchanged(self):
+        expected, parsed = self.get_count_matrices()
+        self.assertEqual(list(expected), [(self.main_file, 3, 'faculty(int)')])
+        self.assertEqual(parsed, 1)
+        self.assertEqual(self.get_count_matrices(), (expected, 0))
+
+    def test_changed_file(self):
+        self.get_count_matrices()
+        self.write(self.main_file, '\n' + MAIN_FILE)
+        count_matrices, parsed = self.get_count_matrices()
+        self.assertEqual(list(count_matrices),
+                         [(self.main_file, 4, 'faculty(int)')])
+        self.assertEqual(parsed, 1)
+
+    def test_changed_header(self):
+        self.get_count_matrices()
+        self.write(self.header_file, '#define LIMIT 3\n')
+        self.assertEqual(self.get_count_matrices()[1], 1)
+
+    def test_changed_weightings(self):
+        self.get_count_matrices()
+        self.assertEqual(self.get_count_matrices([2] * len(self.conditions))
+                         [1], 1)
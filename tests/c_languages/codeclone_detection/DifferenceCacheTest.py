@@ -0,0 +1,96 @@
+import unittest
+from array import array
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import numpy
+
+from bears.c_languages.codeclone_detection.DifferenceCache import (
+    FINGERPRINT_SIZE, DifferenceCache, get_count_array_fingerprint)
+from coalib.misc import Constants
+from coalib.misc.CachingUtilities import pickle_dump, pickle_load
+
+
+class DifferenceCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.data_dir = TemporaryDirectory()
+        self.data_dir_patch = patch.object(Constants, 'USER_DATA_DIR',
+                                           self.data_dir.name)
+        self.data_dir_patch.start()
+
+        self.count_arrays = {
+            ('a.c', 1, 'a()'): numpy.array([[1, 2], [3, 4]]),
+            ('a.c', 9, 'b()'): numpy.array([[1, 2]]),
+            ('b.c', 1, 'c()'): numpy.array([[0, 5], [1, 1]])}
+        self.functions = sorted(self.count_arrays)
+        self.settings = (False, True, False, 0.185)
+
+    def tearDown(self):
+        self.data_dir_patch.stop()
+        self.data_dir.cleanup()
+
+    def test_fingerprint(self):
+        fingerprint = get_count_array_fingerprint(numpy.array([[1, 2]]))
+        self.assertEqual(
+            get_count_array_fingerprint(numpy.array([[1.0, 2.0]])),
+            fingerprint)
+        self.assertNotEqual(
+            get_count_array_fingerprint(numpy.array([[1], [2]])),
+            fingerprint)
+        self.assertNotEqual(
+            get_count_array_fingerprint(numpy.array([[1, 3]])),
+            fingerprint)
+
+    def test_cache(self):
+        a, b, c = self.functions
+        cache = DifferenceCache('project', self.settings)
+        self.assertEqual(cache.get([(a, b), (a, c)], self.count_arrays), {})
+        cache.save([(a, b, 0.5), (a, c, 0.25)], self.count_arrays)
+
+        # Function a moved and b changed
+        moved_a = ('a.c', 2, 'a()')
+        count_arrays = {moved_a: self.count_arrays[a],
+                        b: numpy.array([[2, 2]]),
+                        c: self.count_arrays[c]}
+        cache = DifferenceCache('project', self.settings)
+        self.assertEqual(cache.get([(moved_a, b), (moved_a, c), (c, moved_a)],
+                                   count_arrays),
+                         {(moved_a, c): 0.25, (c, moved_a): 0.25})
+
+        cache.save([(moved_a, b, 0.75)], count_arrays)
+        cache = DifferenceCache('project', self.settings)
+        self.assertEqual(cache.get([(moved_a, b), (moved_a, c)],
+                                   count_arrays),
+                         {(moved_a, b): 0.75})
+
+    def test_other_settings(self):
+        a, b, c = self.functions
+        DifferenceCache('project', self.settings).save([(a, b, 0.5)],
+                                                       self.count_arrays)
+        self.assertEqual(DifferenceCache('project', (True, True, False, 0.3))
+                         .get([(a, b)], self.count_arrays), {})
+        self.assertEqual(DifferenceCache('other', self.settings)
+                         .get([(a, b)], self.count_arrays), {})
+
+    def test_compact_storage(self):
+        a, b, c = self.functions
+        cache = DifferenceCache('project', self.settings)
+        cache.save([(a, b, 0.5), (a, c, 0.25), (b, c, 1.0)],
+                   self.count_arrays)
+
+        cached = pickle_load(None, cache.identifier)
+        # Every fingerprint is stored once
+        self.assertEqual(len(cached['fingerprints']), 3 * FINGERPRINT_SIZE)
+        self.assertEqual(cached['first'], array('I', [0, 0, 1]))
+        self.assertEqual(cached['second'], array('I', [1, 2, 2]))
+        self.assertEqual(cached['differences'], array('d', [0.5, 0.25, 1.0]))
+
+    def test_old_format(self):
+        a, b, c = self.functions
+        cache = DifferenceCache('project', self.settings)
+        pickle_dump(None, cache.identifier, {
+            'settings': self.settings,
+            'differences': {('0' * 40, '1' * 40): 0.5}})
+        self.assertEqual(DifferenceCache('project', self.settings)
+                         .get([(a, b)], self.count_arrays), {})
@@ -0,0 +1,39 @@
+import unittest
+
+from bears.c_languages.codeclone_detection.DifferenceList import (
+    DifferenceList)
+
+
+class DifferenceListTest(unittest.TestCase):
+
+    def setUp(self):
+        self.a = ('a.c', 1, 'a()')
+        self.b = ('a.c', 9, 'b()')
+        self.c = ('c.c', 4, 'c(int)')
+        self.differences = [(self.a, self.b, 0.25),
+                            (self.a, self.c, 0.75),
+                            (self.b, self.c, 0.0)]
+
+    def test_all(self):
+        uut = DifferenceList(self.differences)
+        self.assertEqual(len(uut), 3)
+        self.assertEqual(list(uut), self.differences)
+        self.assertEqual(uut, self.differences)
+        self.assertEqual(uut[1], (self.a, self.c, 0.75))
+        self.assertEqual(uut.functions, [self.a, self.b, self.c])
+
+    def test_max_difference(self):
+        uut = DifferenceList(self.differences, max_difference=0.25)
+        self.assertEqual(list(uut), [(self.a, self.b, 0.25),
+                                     (self.b, self.c, 0.0)])
+        self.assertNotEqual(uut, self.differences)
+
+        uut = DifferenceList(max_difference=0.1)
+        uut.append((self.a, self.c, 0.75))
+        self.assertEqual(len(uut), 0)
+        self.assertEqual(uut.functions, [])
+
+    def test_equality(self):
+        self.assertEqual(DifferenceList(self.differences),
+                         DifferenceList(self.differences))
+        self.assertNotEqual(DifferenceList(self.differences), 5)
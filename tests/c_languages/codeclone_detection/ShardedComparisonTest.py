@@ -0,0 +1,163 @@
+import functools
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from itertools import combinations
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import numpy
+
+from bears.c_languages.codeclone_detection import ShardedComparison
+from bears.c_languages.codeclone_detection.CloneDetectionRoutines import (
+    get_function_pair_difference)
+from bears.c_languages.codeclone_detection.ShardedComparison import (
+    evaluate_sharded, main, work, work_on_job, write_job)
+
+
+class ShardedComparisonTest(unittest.TestCase):
+
+    def setUp(self):
+        random = numpy.random.RandomState(0)
+        count_arrays = {
+            ('file.c', i, 'f{}()'.format(i)):
+                numpy.round(random.rand(random.randint(2, 6), 4) * 3)
+            for i in range(10)}
+        self.function_pairs = list(combinations(sorted(count_arrays), 2))
+        self.difference_function = functools.partial(
+            get_function_pair_difference,
+            count_matrices=count_arrays,
+            average_calculation=False,
+            poly_postprocessing=True,
+            exp_postprocessing=False)
+        self.expected = list(map(self.difference_function,
+                                 self.function_pairs))
+
+        self.shared_dir = TemporaryDirectory()
+        self.directory = self.shared_dir.name
+
+    def tearDown(self):
+        self.shared_dir.cleanup()
+
+    def evaluate_sharded(self, shard_count, **kwargs):
+        return evaluate_sharded(self.directory,
+                                self.function_pairs,
+                                self.difference_function,
+                                shard_count,
+                                poll_interval=0.01,
+                                **kwargs)
+
+    def test_without_workers(self):
+        self.assertEqual(self.evaluate_sharded(4), self.expected)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_workers(self):
+        workers = [multiprocessing.Process(target=work,
+                                           args=(self.directory,),
+                                           kwargs={'wait': 2,
+                                                   'poll_interval': 0.01})
+                   for _ in range(2)]
+        for worker in workers:
+            worker.start()
+
+        self.assertEqual(self.evaluate_sharded(8), self.expected)
+        for worker in workers:
+            worker.join()
+            self.assertEqual(worker.exitcode, 0)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_timeout(self):
+        claim = ShardedComparison._claim
+
+        def claim_by_dead_worker(job_path, shard):
+            # Shard 1 is claimed by a worker that dies
+            return claim(job_path, shard) and shard != 1
+
+        with patch.object(ShardedComparison, '_claim', claim_by_dead_worker):
+            self.assertEqual(self.evaluate_sharded(3, timeout=0.05),
+                             self.expected)
+
+    def test_heartbeat(self):
+        claim = ShardedComparison._claim
+        evaluate_shard = ShardedComparison.evaluate_shard
+        workers = []
+
+        def evaluate_slowly(job_path, shard):
+            claim_path = ShardedComparison._get_shard_path(job_path, shard,
+                                                           'claim')
+            with ShardedComparison._heartbeat(claim_path, 0.01):
+                time.sleep(0.3)
+                evaluate_shard(job_path, shard)
+
+        def claim_by_worker(job_path, shard):
+            if not claim(job_path, shard):
+                return False
+            if shard != 1:
+                return True
+            workers.append(threading.Thread(target=evaluate_slowly,
+                                            args=(job_path, shard)))
+            workers[-1].start()
+            return False
+
+        with patch.object(ShardedComparison, '_claim', claim_by_worker), \
+                patch.object(ShardedComparison, 'evaluate_shard',
+                             side_effect=evaluate_shard) as evaluate:
+            self.assertEqual(self.evaluate_sharded(3, timeout=0.1),
+                             self.expected)
+        workers[0].join()
+        # The shard of the live worker isn't taken over
+        self.assertEqual(sorted(call[0][1] for call in evaluate.call_args_list),
+                         [0, 2])
+
+    def test_cleanup_keeps_temporary_files(self):
+        claim = ShardedComparison._claim
+        temporary_paths = []
+
+        def claim_by_worker(job_path, shard):
+            if shard != 1:
+                return claim(job_path, shard)
+            # A worker still writing the result of shard 1
+            temporary_paths.append(ShardedComparison._get_shard_path(
+                job_path, shard, 'result') + '.worker.tmp')
+            open(temporary_paths[-1], 'w').close()
+            return False
+
+        with patch.object(ShardedComparison, '_claim', claim_by_worker):
+            self.assertEqual(self.evaluate_sharded(3, timeout=0.05),
+                             self.expected)
+        self.assertEqual(os.listdir(self.directory),
+                         [os.path.basename(path) for path in temporary_paths])
+
+    def check_cancelled_job(self, cancel):
+        directory = os.path.join(self.directory, 'jobs')
+        job_path = write_job(directory, self.function_pairs,
+                             self.difference_function, 2)
+        get_differences = ShardedComparison.get_differences
+
+        def cancel_while_evaluating(*args):
+            cancel(job_path)
+            return get_differences(*args)
+
+        with patch.object(ShardedComparison, 'get_differences',
+                          cancel_while_evaluating):
+            self.assertEqual(work_on_job(job_path), 0)
+        return directory
+
+    def test_cancelled_job(self):
+        directory = self.check_cancelled_job(os.remove)
+        self.assertEqual(os.listdir(directory), [])
+
+    def test_cancelled_directory(self):
+        self.check_cancelled_job(
+            lambda job_path: shutil.rmtree(os.path.dirname(job_path)))
+
+    def test_main(self):
+        output = StringIO()
+        with redirect_stdout(output):
+            main([self.directory, '--processes', '1'])
+        self.assertEqual(output.getvalue(), 'Evaluated 0 shards.\n')
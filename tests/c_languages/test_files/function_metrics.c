@@ -0,0 +1,40 @@
+#include <stdio.h>
+
+int declared(int a, int b);
+
+int simple(void) {
+    return 0;
+}
+
+int nested(int a, int b, int c) {
+    if (a) {
+        while (b) {
+            for (int i = 0; i < c; i++) {
+                if (i == b)
+                    puts("found");
+                else if (i > b)
+                    printf("%d\n", i);
+                else
+                    puts("skipped");
+            }
+            b--;
+        }
+    }
+    switch (c) {
+        case 1:
+            return 1;
+        default:
+            break;
+    }
+    return puts("done");
+}
+
+int unbraced(int a) {
+    for (int i = 0; i < a; i++)
+        if (i)
+            a++;
+    do
+        a--;
+    while (a > 10);
+    return a;
+}
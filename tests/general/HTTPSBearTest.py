@@ -7,8 +7,10 @@ import unittest.mock
 
 from bears.general.HTTPSBear import HTTPSBear
 from bears.general.URLHeadBear import URLHeadBear
-from coalib.testing.LocalBearTestHelper import LocalBearTestHelper
+from coalib.testing.LocalBearTestHelper import (LocalBearTestHelper,
+                                                get_results)
 from coalib.settings.Section import Section
+from coalib.settings.Setting import Setting
 from tests.general.InvalidLinkBearTest import custom_matcher
 
 
@@ -76,6 +78,7 @@ class HTTPSBearTest(LocalBearTestHelper):
         self.ub_check_prerequisites = URLHeadBear.check_prerequisites
         self.section = Section('')
         URLHeadBear.check_prerequisites = lambda *args: True
+        HTTPSBear.https_hosts.clear()
         self.uut = HTTPSBear(self.section, Queue())
 
     def tearDown(self):
@@ -107,3 +110,90 @@ class HTTPSBearTest(LocalBearTestHelper):
         with requests_mock.Mocker() as m:
             m.add_matcher(custom_matcher_https)
             self.check_validity(self.uut, test_link)
+
+    def test_probe_once_per_host(self):
+        test_link = """
+        http://httpbin.org/status/v200
+        http://httpbin.org/status/v201 http://coala.io/v200
+        http://httpbin.org/status/i200
+        """.splitlines()
+
+        with requests_mock.Mocker() as m:
+            m.add_matcher(custom_matcher_https)
+            results = get_results(self.uut, test_link)
+            self.assertEqual([result.affected_code[0].start.line
+                              for result in results], [2, 3, 3, 4])
+
+            https_requests = [request.url for request in m.request_history
+                              if request.scheme == 'https']
+            self.assertEqual(sorted(https_requests),
+                             ['https://coala.io/v200',
+                              'https://httpbin.org/status/v200'])
+
+            # Hosts are remembered for other files
+            self.check_validity(self.uut, ['http://httpbin.org/status/v404'],
+                                valid=False)
+            self.assertEqual(len(m.request_history), 7)
+
+    def test_unreachable_host_not_cached(self):
+        test_link = ['http://httpbin.org/status/v200']
+
+        with requests_mock.Mocker() as m:
+            m.add_matcher(custom_matcher_https)
+            m.head('https://httpbin.org/status/v200',
+                   exc=requests.exceptions.ConnectTimeout)
+            self.check_validity(self.uut, test_link)
+            self.assertNotIn('httpbin.org', HTTPSBear.https_hosts)
+
+            # Probed again once the host can be reached
+            m.head('https://httpbin.org/status/v200', status_code=200)
+            self.check_line_result_count(self.uut, test_link, [1])
+            self.assertTrue(HTTPSBear.https_hosts['httpbin.org'])
+
+    def test_probe_rate_limiter(self):
+        self.section.append(Setting('host_request_rate', '0.5'))
+        with requests_mock.Mocker() as m, unittest.mock.patch.object(
+                URLHeadBear, 'get_head_response',
+                wraps=URLHeadBear.get_head_response) as get_head_response:
+            m.add_matcher(custom_matcher_https)
+            self.check_line_result_count(
+                self.uut, ['http://httpbin.org/status/v200'], [1])
+        rate_limiter = get_head_response.call_args[1]['rate_limiter']
+        self.assertIs(rate_limiter, URLHeadBear.get_rate_limiter(self.section))
+        self.assertEqual(rate_limiter.rate, 0.5)
+
+    def test_invalid_http_link_not_probed(self):
+        test_link = """
+        http://httpbin.org/status/i404
+        http://httpbin.org/status/v200
+        """.splitlines()
+
+        with requests_mock.Mocker() as m:
+            m.add_matcher(custom_matcher_https)
+            results = get_results(self.uut, test_link)
+            self.assertEqual([result.affected_code[0].start.line
+                              for result in results], [2, 3])
+
+    def test_hsts_preload(self):
+        test_link = """
+        http://github.com/coala/i200
+        """.splitlines()
+
+        with requests_mock.Mocker() as m:
+            m.add_matcher(custom_matcher_https)
+            self.check_line_result_count(self.uut, test_link, [1])
+            self.assertEqual([request.scheme for request in m.request_history],
+                             ['http'])
+
+            # The preload list doesn't leak into runs not using it
+            self.check_validity(self.uut, test_link,
+                                settings={'use_hsts_preload': False})
+            self.assertEqual([request.scheme for request in m.request_history],
+                             ['http', 'http', 'https'])
+
+    def test_hsts_preload_subdomains(self):
+        self.assertTrue(HTTPSBear.is_hsts_preloaded('github.com'))
+        self.assertTrue(HTTPSBear.is_hsts_preloaded('GitHub.com:443'))
+        self.assertTrue(HTTPSBear.is_hsts_preloaded('coala.dev'))
+        self.assertFalse(HTTPSBear.is_hsts_preloaded('httpbin.org'))
+        self.assertFalse(HTTPSBear.is_hsts_preloaded(''))
@@ -0,0 +1,170 @@
+import unittest
+
+import requests
+import requests_mock
+
+from bears.general.HostRateLimiter import (
+    CircuitBreaker, HostRateLimiter, HostUnavailableError, TokenBucket,
+    get_host_rate_limiter, parse_retry_after)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.time = 0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.time
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.time += seconds
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_take(self):
+        clock = FakeClock()
+        uut = TokenBucket(rate=2, capacity=2, clock=clock)
+        self.assertEqual(uut.take(), 0)
+        self.assertEqual(uut.take(), 0)
+        self.assertEqual(uut.take(), 0.5)
+
+        clock.time += 0.5
+        self.assertEqual(uut.take(), 0)
+
+        # The bucket never holds more than its capacity
+        clock.time += 100
+        self.assertEqual(uut.take(), 0)
+        self.assertEqual(uut.take(), 0)
+        self.assertEqual(uut.take(), 0.5)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+
+    def test_breaker(self):
+        clock = FakeClock()
+        uut = CircuitBreaker(failure_threshold=2, reset_timeout=10,
+                             clock=clock)
+        self.assertTrue(uut.allow_request())
+        uut.record_failure()
+        self.assertFalse(uut.is_open)
+        uut.record_success()
+        uut.record_failure()
+        self.assertTrue(uut.allow_request())
+        uut.record_failure()
+        self.assertTrue(uut.is_open)
+        self.assertFalse(uut.allow_request())
+
+        clock.time += 10
+        self.assertTrue(uut.allow_request())
+        # A single failure of the trial request opens the breaker again
+        uut.record_failure()
+        self.assertFalse(uut.allow_request())
+
+        clock.time += 10
+        self.assertTrue(uut.allow_request())
+        uut.record_success()
+        self.assertFalse(uut.is_open)
+        uut.record_failure()
+        self.assertTrue(uut.allow_request())
+
+
+class ParseRetryAfterTest(unittest.TestCase):
+
+    def test_parse(self):
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertEqual(parse_retry_after(' 3 '), 3)
+        self.assertEqual(
+            parse_retry_after('Wed, 21 Oct 2015 07:28:10 GMT',
+                              now=lambda: 1445412480),
+            10)
+        self.assertEqual(
+            parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT',
+                              now=lambda: 1445412490),
+            0)
+
+
+class HostRateLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.uut = HostRateLimiter(rate=1,
+                                   burst=1,
+                                   max_retries=2,
+                                   failure_threshold=2,
+                                   reset_timeout=100,
+                                   clock=self.clock,
+                                   sleep=self.clock.sleep)
+
+    def test_throttle_per_host(self):
+        with requests_mock.Mocker() as m:
+            m.head(requests_mock.ANY, status_code=200)
+            self.uut.head('http://a.com/1')
+            self.uut.head('http://b.com/1')
+            self.assertEqual(self.clock.sleeps, [])
+            self.uut.head('http://A.com/2')
+            self.assertEqual(self.clock.sleeps, [1])
+
+    def test_retry_after(self):
+        with requests_mock.Mocker() as m:
+            m.head('http://a.com/', [
+                {'status_code': 429, 'headers': {'Retry-After': '5'}},
+                {'status_code': 503, 'headers': {'Retry-After': '7'}},
+                {'status_code': 200}])
+            self.assertEqual(self.uut.head('http://a.com/').status_code, 200)
+            # Waiting for the retries also refills the bucket
+            self.assertEqual(self.clock.sleeps, [5, 7])
+
+    def test_exponential_backoff(self):
+        self.uut.burst = 10
+        with requests_mock.Mocker() as m:
+            m.head('http://a.com/', status_code=429)
+            self.assertEqual(self.uut.head('http://a.com/').status_code, 429)
+            self.assertEqual(m.call_count, 3)
+            self.assertEqual(self.clock.sleeps, [0.5, 1])
+
+    def test_no_retry(self):
+        with requests_mock.Mocker() as m:
+            m.head('http://a.com/503', status_code=503)
+            m.head('http://b.com/429', status_code=429,
+                   headers={'Retry-After': '3600'})
+            self.assertEqual(self.uut.head('http://a.com/503').status_code,
+                             503)
+            self.assertEqual(self.uut.head('http://b.com/429').status_code,
+                             429)
+            self.assertEqual(m.call_count, 2)
+            self.assertEqual(self.clock.sleeps, [])
+
+    def test_circuit_breaker(self):
+        with requests_mock.Mocker() as m:
+            m.head('http://a.com/',
+                   exc=requests.exceptions.ConnectTimeout)
+            m.head('http://b.com/', status_code=200)
+            for i in range(2):
+                with self.assertRaises(requests.exceptions.ConnectTimeout):
+                    self.uut.head('http://a.com/')
+            self.assertFalse(self.uut.is_available('http://a.com/x'))
+            self.assertTrue(self.uut.is_available('http://b.com/'))
+
+            with self.assertRaisesRegex(HostUnavailableError, 'a.com'):
+                self.uut.head('http://a.com/')
+            self.assertEqual(m.call_count, 2)
+            self.assertEqual(self.uut.head('http://b.com/').status_code, 200)
+
+    def test_other_exceptions(self):
+        with requests_mock.Mocker() as m:
+            m.head('http://a.com/',
+                   exc=requests.exceptions.InvalidURL)
+            for i in range(3):
+                with self.assertRaises(requests.exceptions.InvalidURL):
+                    self.uut.head('http://a.com/')
+            self.assertTrue(self.uut.is_available('http://a.com/'))
+
+    def test_shared_instance(self):
+        self.assertIs(get_host_rate_limiter(), get_host_rate_limiter())
+        self.assertIs(get_host_rate_limiter(),
+                      get_host_rate_limiter(HostRateLimiter.DEFAULT_RATE))
+        self.assertIsNot(get_host_rate_limiter(), get_host_rate_limiter(5))
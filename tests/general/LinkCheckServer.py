@@ -0,0 +1,180 @@
+"""
+A local HTTP server standing in for the internet in tests and benchmarks of
+the link checking bears.
+
+The response is selected by the path of the request, the query string is
+ignored so a corpus can contain many distinct links with the same behaviour:
+
+- ``/status/<code>`` responds with the given status code.
+- ``/redirect/<n>`` redirects ``n`` times before responding with 200.
+- ``/ratelimit/<n>/<key>`` responds with 429 and ``Retry-After: 0`` to the
+  first ``n`` requests for ``key`` and with 200 afterwards.
+- ``/slow/<seconds>`` responds with 200 after the given delay, exceeding the
+  timeout of the client simulates a timeout.
+- ``/timegate/<url>`` is a Memento TimeGate redirecting to a memento of
+  ``url`` if ``url`` is archived, else it responds with 404.
+- ``/web/<timestamp>/<url>`` is the memento the TimeGate redirects to.
+
+Every other path responds with 404. All responses are delayed by the
+``latency`` of the server.
+"""
+
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import urlsplit
+
+MEMENTO_TIMESTAMP = '20170421070937'
+MEMENTO_DATETIME = 'Fri, 21 Apr 2017 07:09:37 GMT'
+
+
+class LinkCheckRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def respond(self, send_body):
+        path = urlsplit(self.path).path
+        self.server.record_request(path)
+        time.sleep(self.server.latency)
+
+        route, _, argument = path.lstrip('/').partition('/')
+        handler = getattr(self, 'route_' + route, None)
+        try:
+            status, headers = (handler(argument) if handler
+                               else (404, {}))
+        except ValueError:
+            status, headers = 400, {}
+
+        body = ('%d\n' % status).encode() if send_body else b''
+        try:
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up waiting, e.g. because of its timeout.
+            self.close_connection = True
+
+    def route_status(self, argument):
+        return int(argument), {}
+
+    def route_redirect(self, argument):
+        remaining = int(argument)
+        if remaining <= 0:
+            return 200, {}
+        return 302, {'Location': '/redirect/%d' % (remaining - 1)}
+
+    def route_ratelimit(self, argument):
+        limit, _, key = argument.partition('/')
+        if self.server.count_request('ratelimit/' + key) <= int(limit):
+            return 429, {'Retry-After': '0'}
+        return 200, {}
+
+    def route_slow(self, argument):
+        time.sleep(float(argument))
+        return 200, {}
+
+    def route_timegate(self, url):
+        if not self.server.is_archived(url):
+            return 404, {'Vary': 'accept-datetime'}
+
+        memento = '%s/web/%s/%s' % (self.server.url, MEMENTO_TIMESTAMP, url)
+        return 302, {
+            'Vary': 'accept-datetime',
+            'Location': memento,
+            'Link': ('<{url}>; rel="original", '
+                     '<{server}/timemap/{url}>; rel="timemap"; '
+                     'type="application/link-format", '
+                     '<{memento}>; rel="memento first last"; '
+                     'datetime="{datetime}"').format(
+                         url=url, server=self.server.url, memento=memento,
+                         datetime=MEMENTO_DATETIME)}
+
+    def route_web(self, argument):
+        timestamp, _, url = argument.partition('/')
+        return 200, {
+            'Memento-Datetime': MEMENTO_DATETIME,
+            'Link': ('<{url}>; rel="original", '
+                     '<{server}/timegate/{url}>; rel="timegate"').format(
+                         url=url, server=self.server.url)}
+
+
+class LinkCheckServer(ThreadingMixIn, HTTPServer):
+    """
+    Serves ``LinkCheckRequestHandler`` in a background thread, use it as a
+    context manager::
+
+        with LinkCheckServer(latency=0.01) as server:
+            requests.head(server.url + '/status/404')
+    """
+
+    daemon_threads = True
+
+    def __init__(self, latency=0, is_archived=lambda url: True,
+                 host='127.0.0.1', port=0):
+        """
+        :param latency:     Seconds every response is delayed.
+        :param is_archived: A function telling whether the Memento TimeGate
+                            knows a memento of the given URL.
+        :param host:        The address to listen on.
+        :param port:        The port to listen on, by default a free one is
+                            chosen.
+        """
+        HTTPServer.__init__(self, (host, port), LinkCheckRequestHandler)
+        self.latency = latency
+        self.is_archived = is_archived
+        self.requests = Counter()
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    @property
+    def timegate_uri(self):
+        return self.url + '/timegate/'
+
+    def record_request(self, path):
+        with self._lock:
+            self.requests[path] += 1
+
+    def count_request(self, key):
+        """
+        :return: The number of requests counted for ``key`` including this
+                 one.
+        """
+        with self._lock:
+            self._counts[key] += 1
+            return self._counts[key]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
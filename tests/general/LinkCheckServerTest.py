@@ -0,0 +1,125 @@
+import unittest
+from queue import Queue
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import requests
+
+from bears.general.InvalidLinkBear import InvalidLinkBear
+from bears.general.MementoBear import MementoBear
+from bears.general.URLHeadBear import URLHeadBear
+from coalib.misc import Constants
+from coalib.settings.Section import Section
+from coalib.testing.LocalBearTestHelper import get_results
+from memento_client import MementoClient
+
+from .LinkCheckServer import LinkCheckServer
+
+
+class LinkCheckServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LinkCheckServer(
+            is_archived=lambda url: url.endswith('/200'))
+        self.server.start()
+        self.url = self.server.url
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_status(self):
+        self.assertEqual(requests.head(self.url + '/status/404').status_code,
+                         404)
+        self.assertEqual(requests.get(self.url + '/status/201?x=1').text,
+                         '201\n')
+        self.assertEqual(requests.head(self.url + '/status/x').status_code,
+                         400)
+        self.assertEqual(requests.head(self.url + '/unknown').status_code,
+                         404)
+        self.assertEqual(self.server.requests['/status/404'], 1)
+
+    def test_redirect(self):
+        response = requests.head(self.url + '/redirect/3',
+                                 allow_redirects=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.history), 3)
+
+    def test_ratelimit(self):
+        url = self.url + '/ratelimit/2/key'
+        self.assertEqual(requests.head(url).status_code, 429)
+        self.assertEqual(requests.head(url).headers['Retry-After'], '0')
+        self.assertEqual(requests.head(url).status_code, 200)
+        self.assertEqual(requests.head(self.url + '/ratelimit/0/other')
+                         .status_code, 200)
+
+    def test_timeout(self):
+        with self.assertRaises(requests.exceptions.Timeout):
+            requests.head(self.url + '/slow/1', timeout=0.1)
+        self.assertEqual(requests.head(self.url + '/slow/0').status_code, 200)
+
+    def test_memento(self):
+        mc = MementoClient(timegate_uri=self.server.timegate_uri)
+        self.assertIn('mementos',
+                      mc.get_memento_info(self.url + '/status/200'))
+        self.assertNotIn('mementos',
+                         mc.get_memento_info(self.url + '/status/201'))
+
+
+class LinkBearsOfflineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = LinkCheckServer(
+            is_archived=lambda url: 'status/200' in url)
+        self.server.start()
+
+        self.data_dir = TemporaryDirectory()
+        self.data_dir_patch = patch.object(Constants, 'USER_DATA_DIR',
+                                           self.data_dir.name)
+        self.data_dir_patch.start()
+        MementoBear.archived_links = None
+
+        self.connection_url_patch = patch.object(
+            URLHeadBear, 'check_connection_url',
+            self.server.url + '/status/200')
+        self.connection_url_patch.start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.connection_url_patch.stop()
+        self.data_dir_patch.stop()
+        self.data_dir.cleanup()
+        MementoBear.archived_links = None
+
+    def test_check_prerequisites(self):
+        self.assertTrue(URLHeadBear.check_prerequisites())
+        self.server.stop()
+        self.assertEqual(URLHeadBear.check_prerequisites(),
+                         'You are not connected to the internet.')
+        self.server = LinkCheckServer()
+        self.server.start()
+
+    def test_invalid_links(self):
+        file = [line.format(self.server.url) + '\n' for line in (
+            '{}/status/200',
+            '{}/status/404',
+            '{}/ratelimit/1/a',
+            '{}/slow/1',
+        )]
+        uut = InvalidLinkBear(Section(''), Queue())
+        results = get_results(uut, file,
+                              settings={'network_timeout': {'*': 0.2}})
+        self.assertEqual([result.affected_code[0].start.line
+                          for result in results], [2, 4])
+        self.assertEqual(self.server.requests['/ratelimit/1/a'], 2)
+
+    def test_memento(self):
+        file = [line.format(self.server.url) + '\n' for line in (
+            '{}/status/200',
+            '{}/status/201',
+        )]
+        with patch.object(MementoBear, 'timegate_uri',
+                          self.server.timegate_uri):
+            uut = MementoBear(Section(''), Queue())
+            results = get_results(uut, file)
+        self.assertEqual([result.affected_code[0].start.line
+                          for result in results], [2])
@@ -3,15 +3,21 @@ import json
 import os
 import requests
 import requests_mock
+import time
 import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
 from bears.general.MementoBear import MementoBear
 from bears.general.URLHeadBear import URLHeadBear
 
+from coalib.misc import Constants
+from coalib.misc.CachingUtilities import pickle_dump, pickle_load
 from coalib.results.Result import Result
 from coalib.settings.Section import Section
 from coalib.results.RESULT_SEVERITY import RESULT_SEVERITY
-from coalib.testing.LocalBearTestHelper import LocalBearTestHelper
+from coalib.testing.LocalBearTestHelper import (LocalBearTestHelper,
+                                                get_results)
 
 from queue import Queue
 
@@ -148,8 +154,17 @@ class MementoBearTest(LocalBearTestHelper):
         URLHeadBear.check_prerequisites = lambda *args: True
         self.uut = MementoBear(self.section, Queue())
 
+        self.data_dir = TemporaryDirectory()
+        self.data_dir_patch = patch.object(Constants, 'USER_DATA_DIR',
+                                           self.data_dir.name)
+        self.data_dir_patch.start()
+        MementoBear.archived_links = None
+
     def tearDown(self):
         URLHeadBear.check_prerequisites = self.ub_check_prerequisites
+        self.data_dir_patch.stop()
+        self.data_dir.cleanup()
+        MementoBear.archived_links = None
 
     def test_dead_links(self):
         valid_file = """
@@ -259,7 +274,9 @@ class MementoBearTest(LocalBearTestHelper):
             memento_archive_status_mock(m, 'http://redirect9times.com/1',
                                         override_head=False)
 
-            self.check_line_result_count(self.uut, invalid_file, [8])
+            # Unarchived links are checked again by the next run
+            self.check_line_result_count(MementoBear(self.section, Queue()),
+                                         invalid_file, [8])
 
     def test_settings_follow_redirects(self):
         invalid_file = """
@@ -306,3 +323,88 @@ class MementoBearTest(LocalBearTestHelper):
             self.check_validity(
                 self.uut, valid_file,
                 settings={'link_ignore_list': link_ignore_list})
+
+    def test_deduplicated_lookups(self):
+        test_file = """
+        https://www.google.com
+        https://www.google.com https://www.facebook.com/coala
+        https://www.facebook.com/coala
+        """.splitlines()
+
+        with requests_mock.Mocker() as m:
+            m.add_matcher(custom_matcher)
+            memento_archive_status_mock(m, 'https://www.google.com')
+            memento_archive_status_mock(
+                m, 'https://www.facebook.com/coala', False)
+
+            with patch.object(MementoBear, 'check_archive',
+                              wraps=MementoBear.check_archive) as check:
+                results = get_results(self.uut, test_file)
+            self.assertEqual([result.affected_code[0].start.line
+                              for result in results], [3, 4])
+            self.assertEqual(sorted(args[1] for args, _ in
+                                    check.call_args_list),
+                             ['https://www.facebook.com/coala',
+                              'https://www.google.com'])
+
+    def test_archive_cache(self):
+        test_file = """
+        https://www.google.com
+        """.splitlines()
+
+        def count_timegate_requests(m):
+            return sum(request.url.startswith(
+                           'http://timetravel.mementoweb.org/timegate/')
+                       for request in m.request_history)
+
+        with requests_mock.Mocker() as m:
+            m.add_matcher(custom_matcher)
+            memento_archive_status_mock(m, 'https://www.google.com')
+
+            self.check_validity(self.uut, test_file)
+            self.assertEqual(count_timegate_requests(m), 1)
+            self.assertIn('https://www.google.com', MementoBear.archived_links)
+
+            # Archived links are remembered in the coala data directory
+            MementoBear.archived_links = None
+            self.check_validity(self.uut, test_file)
+            self.assertEqual(count_timegate_requests(m), 1)
+
+            # Links need to be checked again once the cache expired
+            self.check_validity(self.uut, test_file,
+                                settings={'archive_cache_days': 0})
+            self.assertEqual(count_timegate_requests(m), 2)
+            self.assertEqual(MementoBear.archived_links, {})
+
+    def test_unarchived_links_not_cached(self):
+        test_file = """
+        https://www.facebook.com/coala
+        """.splitlines()
+
+        with requests_mock.Mocker() as m:
+            m.add_matcher(custom_matcher)
+            memento_archive_status_mock(
+                m, 'https://www.facebook.com/coala', False)
+            self.check_invalidity(self.uut, test_file)
+
+            memento_archive_status_mock(
+                m, 'https://www.facebook.com/coala', override_head=False)
+            # Checked only once per run
+            with patch.object(MementoBear, 'check_archive') as check:
+                self.check_invalidity(self.uut, test_file)
+                self.assertFalse(check.called)
+
+            self.check_validity(MementoBear(self.section, Queue()),
+                                test_file)
+
+    def test_archive_cache_merged(self):
+        MementoBear.load_archived_links(60)
+        # Written by another process meanwhile
+        pickle_dump(None, MementoBear.ARCHIVE_CACHE_IDENTIFIER,
+                    {'https://coala.io': time.time()})
+
+        MementoBear.store_archived_links({'https://www.google.com':
+                                          time.time()})
+        self.assertEqual(
+            sorted(pickle_load(None, MementoBear.ARCHIVE_CACHE_IDENTIFIER)),
+            ['https://coala.io', 'https://www.google.com'])
@@ -1,7 +1,11 @@
+import os
 import unittest
 import requests_mock
+from unittest.mock import patch
 
-from bears.general.URLBear import URLBear, LINK_CONTEXT, URLResult
+from bears.general.URLBear import (URLBear, LINK_CONTEXT, URLResult,
+                                   compile_globs)
+from coalib.parsing.Globbing import fnmatch
 from coalib.results.SourceRange import SourceRange
 from coalib.testing.LocalBearTestHelper import get_results
 from coalib.settings.Section import Section
@@ -53,6 +57,61 @@ class URLBearTest(unittest.TestCase):
                                'yes-green.svg/200'),
                               LINK_CONTEXT.no_context])
 
+    def test_link_ignore_list(self):
+        valid_file = """
+        http://www.facebook.com/200 http://www.google.com/404
+        <a href="http://coala.io/blog/1">coala</a>
+        http://coala.io/docs/1 http://coala.io/news/1
+        """.splitlines()
+
+        result = get_results(
+            self.uut, valid_file,
+            settings={'link_ignore_list': ['http://www.google.com/*',
+                                           'http://coala.io/(docs|blog)/?']})
+        self.assertEqual([r.contents for r in result],
+                         [[2, 'http://www.facebook.com/200',
+                           LINK_CONTEXT.no_context],
+                          [4, 'http://coala.io/news/1',
+                           LINK_CONTEXT.no_context]])
+
+
+class CompileGlobsTest(unittest.TestCase):
+
+    def test_fnmatch_equivalence(self):
+        links = ['http://a.com', 'http://a.com/', 'http://a.com/b/c',
+                 'http://b.com/1', 'https://b.com/12', 'http://c.org/(x)',
+                 'http://c.org/x', 'http://c.org/y', 'http://d.net/[1]',
+                 'http://d.net/1', '']
+        glob_lists = [(), ('',), ('http://a.com',), ('http://a.com/*',),
+                      ('http://a.com/**',), ('http*://b.com/?',),
+                      ('http://c.org/(x|y)', 'http://d.net/[0-9]'),
+                      ('http://d.net/[!0-9]', 'http://c.org/(x)'),
+                      ('**/(1|2)',), ('http://(a|(b|c)).(com|org)/(x|[|])',)]
+
+        for globs in glob_lists:
+            regex = compile_globs(globs)
+            for link in links:
+                self.assertEqual(bool(regex.match(os.path.normcase(link))),
+                                 fnmatch(link, globs),
+                                 'Globs {} differ from fnmatch for {}'.format(
+                                     globs, link))
+
+    def test_normcase(self):
+        compile_globs.cache_clear()
+        try:
+            # Both the globs and the links are normalized like on Windows
+            with patch.object(os.path, 'normcase', str.lower):
+                self.assertTrue(compile_globs(('http://A.com/*',)).match(
+                    os.path.normcase('http://a.COM/x')))
+                links = URLBear.extract_links_from_file(
+                    ['http://a.COM/x http://b.com/x\n'], '^$',
+                    ['http://A.com/*'])
+                self.assertEqual(list(links),
+                                 [('http://b.com/x', 0,
+                                   LINK_CONTEXT.no_context)])
+        finally:
+            compile_globs.cache_clear()
+
 
 class URLResultTest(unittest.TestCase):
 
@@ -6,6 +6,7 @@ from bears.general.URLHeadBear import URLHeadBear, LINK_CONTEXT, URLHeadResult
 from coalib.results.SourceRange import SourceRange
 from coalib.testing.LocalBearTestHelper import get_results
 from coalib.settings.Section import Section
+from coalib.settings.Setting import Setting
 from queue import Queue
 from .InvalidLinkBearTest import custom_matcher
 
@@ -60,6 +61,36 @@ class URLHeadBearTest(unittest.TestCase):
                              [3, 'http://www.google.com/404',
                               404, LINK_CONTEXT.no_context])
 
+    def test_rate_limited_url(self):
+        valid_file = ['http://www.facebook.com/limited']
+        rate_limited_responses = [
+            {'status_code': 429, 'headers': {'Retry-After': '0'}},
+            {'status_code': 200}]
+
+        with requests_mock.Mocker() as m:
+            m.head('http://www.facebook.com/limited', rate_limited_responses)
+            result = get_results(self.uut, valid_file)
+            self.assertEqual(result[0].http_status_code, 200)
+            self.assertEqual(m.call_count, 2)
+
+        with requests_mock.Mocker() as m:
+            m.head('http://www.facebook.com/limited', rate_limited_responses)
+            result = get_results(self.uut, valid_file,
+                                 settings={'max_request_retries': 0})
+            self.assertEqual(result[0].http_status_code, 429)
+            self.assertEqual(m.call_count, 1)
+
+    def test_get_rate_limiter(self):
+        rate_limiter = URLHeadBear.get_rate_limiter(self.section)
+        self.assertIs(URLHeadBear.get_rate_limiter(Section('other')),
+                      rate_limiter)
+
+        self.section.append(Setting('max_request_retries', '0'))
+        self.section.append(Setting('host_request_rate', '0.5'))
+        rate_limiter = URLHeadBear.get_rate_limiter(self.section)
+        self.assertEqual(rate_limiter.max_retries, 0)
+        self.assertEqual(rate_limiter.rate, 0.5)
+
 
 class URLHeadResultTest(unittest.TestCase):
 
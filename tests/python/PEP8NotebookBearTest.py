@@ -1,5 +1,14 @@
+import unittest
+from queue import Queue
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import autopep8
+
+from coalib.settings.Section import Section
 from coalib.testing.LocalBearTestHelper import verify_local_bear
-from bears.python.PEP8NotebookBear import PEP8NotebookBear
+from bears.python.PEP8NotebookBear import (
+    PEP8NotebookBear, get_cell_source_spans)
 
 
 # metadata field deleted manually
@@ -89,3 +98,57 @@ PEP8NotebookBearWithoutTrailingNewlineTest = \
                       invalid_files=(bad_file[:-1],),
                       force_linebreaks=False,
                       )
+
+
+class PEP8NotebookBearCellTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.data_dir = patch('coalib.misc.Constants.USER_DATA_DIR',
+                              self.directory.name)
+        self.data_dir.start()
+        self.uut = PEP8NotebookBear(Section('name'), Queue())
+
+    def tearDown(self):
+        self.data_dir.stop()
+        self.directory.cleanup()
+
+    def test_cell_source_spans(self):
+        self.assertEqual(get_cell_source_spans(bad_file.splitlines(True)),
+                         [(10, 12), (17, 19), (36, 38)])
+
+    def test_cell_diff(self):
+        file = bad_file.splitlines(True)
+        results = list(self.uut.run('t.ipynb', file))
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].affected_code[0].start.line, 11)
+        self.assertEqual(results[0].diffs['t.ipynb'].modified[10],
+                         '    "x = 1  # <-- PEP8 Error"\n')
+
+    def test_cell_cache(self):
+        file = bad_file.splitlines(True)
+        with patch('autopep8.fix_code', side_effect=autopep8.fix_code) as fix:
+            first = list(self.uut.run('t.ipynb', file,
+                                      cache_corrections=True))
+            self.assertEqual(fix.call_count, 2)
+            self.assertEqual(list(self.uut.run('t.ipynb', file,
+                                               cache_corrections=True)),
+                             first)
+            self.assertEqual(fix.call_count, 2)
+
+            # Only the changed cell is fixed again
+            file = bad_file.replace('print(x)', 'print(x+1)').splitlines(True)
+            list(self.uut.run('t.ipynb', file, cache_corrections=True))
+            self.assertEqual(fix.call_count, 3)
+
+            # Not cached by default
+            list(self.uut.run('t.ipynb', file))
+            self.assertEqual(fix.call_count, 5)
+
+    def test_not_written_by_nbformat(self):
+        file = bad_file.replace('    "x =    1  # <-- PEP8 Error"\n   ]',
+                                '    "x =    1  # <-- PEP8 Error"]')
+        results = list(self.uut.run('t.ipynb', file.splitlines(True)))
+        self.assertEqual(len(results), 1)
+        self.assertIn('    "x = 1  # <-- PEP8 Error"\n',
+                      results[0].diffs['t.ipynb'].modified)
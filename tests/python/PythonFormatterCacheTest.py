@@ -0,0 +1,131 @@
+import os
+import unittest
+from queue import Queue
+from tempfile import TemporaryDirectory
+from unittest.mock import MagicMock, patch
+
+from bears.python import PythonFormatterCache
+from bears.python import PyImportSortBear as PyImportSortBearModule
+from bears.python.PEP8Bear import PEP8Bear
+from bears.python.PyImportSortBear import PyImportSortBear
+from bears.python.PythonFormatterCache import (
+    get_corrected_file, get_formatter_cache_key)
+from coalib.settings.Section import Section
+
+
+class PythonFormatterCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.data_dir = patch('coalib.misc.Constants.USER_DATA_DIR',
+                              self.directory.name)
+        self.data_dir.start()
+        self.file = ['a=1\n']
+        self.fix = MagicMock(side_effect=lambda source: ['a = 1\n'])
+
+    def tearDown(self):
+        self.data_dir.stop()
+        self.directory.cleanup()
+
+    def get_cached_outputs(self, bear_name='Bear'):
+        directory = PythonFormatterCache._get_cache_directory(bear_name)
+        return [name for name in os.listdir(directory)
+                if not name.endswith('.tmp')]
+
+    def test_key(self):
+        key = get_formatter_cache_key('Bear', {'a': {'x', 'y'}}, self.file)
+        self.assertEqual(
+            get_formatter_cache_key('Bear', {'a': {'y', 'x'}}, self.file),
+            key)
+        self.assertNotEqual(
+            get_formatter_cache_key('Other', {'a': {'x', 'y'}}, self.file),
+            key)
+        self.assertNotEqual(
+            get_formatter_cache_key('Bear', {'a': {'x'}}, self.file), key)
+        self.assertNotEqual(
+            get_formatter_cache_key('Bear', {'a': {'x', 'y'}}, ['a=2\n']),
+            key)
+
+    def test_cache(self):
+        self.assertEqual(get_corrected_file('Bear', {}, self.file, self.fix),
+                         ('a = 1\n',))
+        self.assertEqual(get_corrected_file('Bear', {}, self.file, self.fix),
+                         ('a = 1\n',))
+        self.assertEqual(self.fix.call_count, 1)
+
+        get_corrected_file('Bear', {'setting': 2}, self.file, self.fix)
+        self.assertEqual(self.fix.call_count, 2)
+
+    def test_unchanged(self):
+        fix = MagicMock(side_effect=lambda source: source.splitlines(True))
+        self.assertEqual(get_corrected_file('Bear', {}, self.file, fix),
+                         tuple(self.file))
+        self.assertEqual(get_corrected_file('Bear', {}, self.file, fix),
+                         tuple(self.file))
+        self.assertEqual(fix.call_count, 1)
+
+    def test_errors_not_cached(self):
+        fix = MagicMock(side_effect=SyntaxError)
+        for _ in range(2):
+            with self.assertRaises(SyntaxError):
+                get_corrected_file('Bear', {}, self.file, fix)
+        self.assertEqual(fix.call_count, 2)
+        self.assertEqual(self.get_cached_outputs(), [])
+
+    def test_eviction(self):
+        with patch.object(PythonFormatterCache, 'MAX_CACHED_OUTPUTS', 2), \
+                patch.object(PythonFormatterCache, 'EVICTION_INTERVAL', 1):
+            for index in range(4):
+                get_corrected_file('Bear', {}, ['a={}\n'.format(index)],
+                                   self.fix)
+            self.assertEqual(len(self.get_cached_outputs()), 2)
+
+            # Every bear keeps its own outputs
+            get_corrected_file('Other', {}, self.file, self.fix)
+            self.assertEqual(len(self.get_cached_outputs()), 2)
+            self.assertEqual(len(self.get_cached_outputs('Other')), 1)
+
+    def test_disabled(self):
+        get_corrected_file('Bear', {}, self.file, self.fix, cache=False)
+        get_corrected_file('Bear', {}, self.file, self.fix, cache=False)
+        self.assertEqual(self.fix.call_count, 2)
+        self.assertEqual(self.get_cached_outputs(), [])
+
+    def test_no_data_dir(self):
+        with patch('bears.python.PythonFormatterCache.get_data_path',
+                   return_value=None):
+            get_corrected_file('Bear', {}, self.file, self.fix)
+            get_corrected_file('Bear', {}, self.file, self.fix)
+        self.assertEqual(self.fix.call_count, 2)
+
+    def test_bear(self):
+        uut = PEP8Bear(Section('name'), Queue())
+        with patch('autopep8.fix_code', return_value='a = 1\n') as fix_code:
+            results = list(uut.run('t.py', self.file, cache_corrections=True))
+            self.assertEqual(list(uut.run('t.py', self.file,
+                                          cache_corrections=True)),
+                             results)
+            self.assertEqual(fix_code.call_count, 1)
+
+            # The config files aren't part of the key
+            list(uut.run('t.py', self.file, local_pep8_config=True,
+                         cache_corrections=True))
+            list(uut.run('t.py', self.file, local_pep8_config=True,
+                         cache_corrections=True))
+            self.assertEqual(fix_code.call_count, 3)
+
+            # Not cached by default
+            list(uut.run('t.py', self.file))
+            self.assertEqual(fix_code.call_count, 4)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].diffs['t.py'].modified, ['a = 1\n'])
+
+    def test_isort_config_read_once(self):
+        uut = PyImportSortBear(Section('name'), Queue())
+        get_config = PyImportSortBearModule._get_isort_config
+        get_config.cache_clear()
+        list(uut.run('a.py', ['import sys\n', 'import os\n'],
+                     cache_corrections=True))
+        list(uut.run('b.py', ['import os\n'], cache_corrections=True))
+        self.assertEqual(get_config.cache_info().misses, 1)
+        self.assertEqual(get_config.cache_info().hits, 1)
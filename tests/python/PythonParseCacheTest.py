@@ -0,0 +1,77 @@
+import ast
+import tokenize
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from bears.python import PythonParseCache
+from bears.python.PyCommentedCodeBear import PyCommentedCodeBear
+from bears.python.PythonParseCache import get_ast, get_tokens
+from bears.python.RadonBear import RadonBear
+from coalib.settings.Section import Section
+
+
+class PythonParseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.file = ['def f(a):\n', '    # return a\n', '    return a\n']
+
+    def test_ast(self):
+        tree = get_ast('t.py', self.file)
+        self.assertIsInstance(tree, ast.Module)
+        self.assertIs(get_ast('t.py', list(self.file)), tree)
+        self.assertIsNot(get_ast('other.py', self.file), tree)
+        self.assertIsNot(get_ast('t.py', self.file[:1] + ['    pass\n']),
+                         tree)
+
+    def test_tokens(self):
+        tokens = get_tokens('t.py', self.file)
+        self.assertIs(get_tokens('t.py', self.file), tokens)
+        self.assertEqual([token.string for token in tokens
+                          if token.type == tokenize.COMMENT],
+                         ['# return a'])
+
+    def test_errors(self):
+        file = ['def f(:\n']
+        with self.assertRaises(SyntaxError) as context:
+            get_ast('invalid.py', file)
+        self.assertEqual(context.exception.filename, 'invalid.py')
+        with patch('ast.parse') as parse:
+            with self.assertRaises(SyntaxError):
+                get_ast('invalid.py', file)
+            self.assertFalse(parse.called)
+
+        with self.assertRaises(tokenize.TokenError):
+            get_tokens('invalid.py', ['f(\n'])
+        with self.assertRaises(IndentationError):
+            get_tokens('invalid.py', ['if a:\n', '        a\n', '    a\n'])
+
+    def test_eviction(self):
+        with patch.object(PythonParseCache, 'MAX_CACHED_FILES', 2):
+            tree = get_ast('a.py', ['a = 1\n'])
+            get_ast('b.py', ['b = 1\n'])
+            get_ast('c.py', ['c = 1\n'])
+            self.assertIsNot(get_ast('a.py', ['a = 1\n']), tree)
+
+    def test_bears_share_file(self):
+        # The output of PyCommentedCodeBear must not be cached from before
+        with TemporaryDirectory() as directory, \
+                patch('coalib.misc.Constants.USER_DATA_DIR', directory), \
+                patch.object(PythonParseCache, '_parsed_files',
+                             PythonParseCache.OrderedDict()), \
+                patch('ast.parse', side_effect=ast.parse) as parse, \
+                patch('tokenize.generate_tokens',
+                      side_effect=tokenize.generate_tokens) as generate:
+            section = Section('test section')
+            list(RadonBear(section, None).run('t.py', self.file,
+                                              cyclomatic_complexity=10))
+            list(RadonBear(section, None).run('t.py', self.file,
+                                              cyclomatic_complexity=1))
+            self.assertEqual(parse.call_count, 1)
+
+            results = list(PyCommentedCodeBear(section, None).run(
+                't.py', self.file))
+            list(PyCommentedCodeBear(section, None).run('t.py', self.file))
+            self.assertEqual(generate.call_count, 1)
+            self.assertEqual(len(results), 1)
+            self.assertEqual(results[0].affected_code[0].start.line, 2)
@@ -2,12 +2,16 @@ import os
 import unittest
 from queue import Queue
 from textwrap import dedent
+from tempfile import TemporaryDirectory
 from contextlib import ExitStack, contextmanager
+from unittest.mock import patch
 
 from coala_utils.ContextManagers import prepare_file
 from coalib.settings.Section import Section
 
+from bears.python import VultureBear as VultureBearModule
 from bears.python.VultureBear import VultureBear
+from vulture import Vulture
 
 
 def get_testfile_path(name):
@@ -27,6 +31,15 @@ class VultureBearTest(unittest.TestCase):
         self.file_dict = {}
         self.uut = VultureBear(self.file_dict, self.section, self.queue)
 
+        self.directory = TemporaryDirectory()
+        self.data_dir = patch('coalib.misc.Constants.USER_DATA_DIR',
+                              self.directory.name)
+        self.data_dir.start()
+
+    def tearDown(self):
+        self.data_dir.stop()
+        self.directory.cleanup()
+
     def get_results(self, *files):
         """
         Runs the bears with the files given.
@@ -108,3 +121,43 @@ class VultureBearTest(unittest.TestCase):
         self.verify_results('unreachable_else.py', {
             "unreachable 'else' block": (3, 6, 100)
         })
+
+    def test_file_contents(self):
+        # The contents given by coala are checked, not the ones on disk
+        self.file_dict['/not/existing.py'] = load_testfile(
+            'unused_function.py').splitlines(True)
+        self.assertEqual([result.message for result in self.uut.run()],
+                         ["unused function 'hello'"])
+
+    def test_cache(self):
+        self.file_dict['a.py'] = ['import os\n', 'os.getcwd()\n']
+        self.file_dict['b.py'] = ['def hello():\n', '    pass\n']
+        with patch.object(VultureBearModule, 'scan_file',
+                          side_effect=VultureBearModule.scan_file) as scan:
+            self.assertEqual([result.message for result in self.uut.run(
+                cache_scans=True)], ["unused function 'hello'"])
+            self.assertEqual(scan.call_count, 2)
+
+            self.file_dict['a.py'] = ['import os\n', 'hello()\n']
+            self.assertEqual([result.message for result in self.uut.run(
+                cache_scans=True)], ["unused import 'os'"])
+            self.assertEqual(scan.call_count, 3)
+
+            self.assertEqual([result.message for result in self.uut.run()],
+                             ["unused import 'os'"])
+            self.assertEqual(scan.call_count, 5)
+
+    def test_coding_declaration(self):
+        source = ('# -*- coding: utf-8 -*-\n'
+                  'def hello():\n'
+                  '    return\n'
+                  '    print("unreachable")\n')
+        scanner = Vulture()
+        scanner.scan(source, filename='coding.py')
+        expected = {table: list(getattr(scanner, table))
+                    for table in VultureBearModule.DEFINITION_TABLES}
+        expected.update((table, set(getattr(scanner, table)))
+                        for table in VultureBearModule.USAGE_TABLES)
+        self.assertEqual(VultureBearModule.scan_file('coding.py', source),
+                         expected)
+        self.assertEqual(scanner.code[0], '')
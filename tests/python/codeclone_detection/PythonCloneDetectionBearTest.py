@@ -0,0 +1,46 @@
+import os
+import unittest
+from queue import Queue
+
+from bears.python.codeclone_detection.PythonCloneDetectionBear import (
+    PythonCloneDetectionBear)
+from coalib.settings.Section import Section
+from coalib.settings.Setting import Setting
+
+
+class PythonCloneDetectionBearTest(unittest.TestCase):
+
+    def setUp(self):
+        self.base_test_path = os.path.abspath(os.path.join(
+            os.path.dirname(__file__),
+            'clone_detection_samples'))
+        self.file_dict = {}
+        for filename in os.listdir(self.base_test_path):
+            path = os.path.join(self.base_test_path, filename)
+            with open(path) as file:
+                self.file_dict[path] = file.readlines()
+        self.section = Section('default')
+        self.section.append(Setting('comparison_processes', '1'))
+        self.queue = Queue()
+
+    def run_bear(self):
+        bear = PythonCloneDetectionBear(self.file_dict, self.section,
+                                        self.queue)
+        return list(bear.execute())
+
+    def test_clones(self):
+        results = self.run_bear()
+        self.assertEqual(len(results), 1, [str(result) for result in results])
+        self.assertEqual(results[0].affected_code[0].file,
+                         os.path.join(self.base_test_path, 'copy.py'))
+        self.assertEqual(results[0].affected_code[0].start.line, 3)
+        self.assertIn('function merge_sorted.', results[0].message)
+
+        messages = []
+        while not self.queue.empty():
+            messages.append(self.queue.get().message)
+        self.assertIn('invalid.py as it can\'t be parsed', '\n'.join(messages))
+
+    def test_max_clone_difference(self):
+        self.section.append(Setting('max_clone_difference', '0'))
+        self.assertEqual(self.run_bear(), [])
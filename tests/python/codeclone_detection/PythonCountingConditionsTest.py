@@ -0,0 +1,136 @@
+import ast
+import os
+import unittest
+
+from bears.python.codeclone_detection import PythonCountingConditions
+from bears.python.codeclone_detection.PythonCountVectorCreator import (
+    PythonCountVectorCreator)
+
+
+class PythonCountingConditionsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.testfile = os.path.abspath(os.path.join(
+            os.path.dirname(__file__),
+            'conditions_samples.py'))
+        with open(self.testfile) as file:
+            self.lines = file.readlines()
+
+    def check_counting_condition(self, condition, function, expected):
+        """
+        Checks if the count vectors of the given condition match the given
+        expected counts.
+
+        :param condition: The name of the condition to use.
+        :param function:  The (line, qualified name) tuple of the function
+                          from the test file to use.
+        :param expected:  Dict with the counts of all names.
+        """
+        counter = PythonCountVectorCreator(
+            [PythonCountingConditions.condition_dict[condition]])
+        vectors = counter.get_vectors_for_file(self.testfile, self.lines)
+
+        actual = {name: count_vector.count_vector[0]
+                  for name, count_vector in vectors[function].items()}
+        self.assertEqual(actual, expected)
+
+    def test_functions(self):
+        vectors = PythonCountVectorCreator().get_vectors_for_file(
+            self.testfile, self.lines)
+        self.assertEqual(list(vectors), [(1, 'used'),
+                                         (6, 'conditions'),
+                                         (17, 'loops'),
+                                         (25, 'members'),
+                                         (36, 'Outer.method'),
+                                         (37, 'Outer.method.nested')])
+
+    def test_used(self):
+        self.check_counting_condition(
+            'used', (1, 'used'), {'a': 3, 'b': 2, 'foo': 1, '2': 1})
+
+    def test_nested_function(self):
+        # The nested function is counted on its own
+        self.check_counting_condition(
+            'used', (36, 'Outer.method'), {'self': 1, 'x': 2, 'nested': 1})
+
+    def test_is_called(self):
+        self.check_counting_condition(
+            'is_called', (1, 'used'), {'a': 0, 'b': 0, 'foo': 1, '2': 0})
+
+    def test_is_call_param(self):
+        self.check_counting_condition(
+            'is_call_param', (1, 'used'), {'a': 1, 'b': 1, 'foo': 0, '2': 0})
+
+    def test_returned(self):
+        self.check_counting_condition(
+            'returned', (1, 'used'), {'a': 1, 'b': 0, 'foo': 0, '2': 1})
+
+    def test_operators(self):
+        self.check_counting_condition(
+            'in_sum', (1, 'used'), {'a': 1, 'b': 1, 'foo': 0, '2': 0})
+        self.check_counting_condition(
+            'in_product', (1, 'used'), {'a': 1, 'b': 0, 'foo': 0, '2': 1})
+
+    def test_conditions(self):
+        function = (6, 'conditions')
+        self.check_counting_condition(
+            'is_condition', function, {'a': 1, 'b': 2, 'c': 2, '0': 1, '1': 0})
+        self.check_counting_condition(
+            'in_condition', function, {'a': 0, 'b': 1, 'c': 0, '0': 0, '1': 0})
+        self.check_counting_condition(
+            'in_second_level_condition', function,
+            {'a': 2, 'b': 0, 'c': 2, '0': 0, '1': 0})
+        self.check_counting_condition(
+            'in_boolean_operation', function,
+            {'a': 0, 'b': 1, 'c': 1, '0': 0, '1': 0})
+
+    def test_assignments(self):
+        function = (6, 'conditions')
+        self.check_counting_condition(
+            'is_assignee', function, {'a': 0, 'b': 1, 'c': 2, '0': 0, '1': 0})
+        self.check_counting_condition(
+            'is_assigner', function, {'a': 2, 'b': 1, 'c': 0, '0': 0, '1': 1})
+
+    def test_loops(self):
+        function = (17, 'loops')
+        self.check_counting_condition(
+            'loop_content', function,
+            {'items': 0, 'total': 0, 'item': 3, 'part': 1, 'squares': 0})
+        self.check_counting_condition(
+            'second_level_loop_content', function,
+            {'items': 0, 'total': 1, 'item': 0, 'part': 1, 'squares': 0})
+        self.check_counting_condition(
+            'in_comprehension', function,
+            {'items': 1, 'total': 0, 'item': 4, 'part': 0, 'squares': 0})
+
+    def test_python_specific(self):
+        function = (25, 'members')
+        self.check_counting_condition(
+            'member_accessed', function,
+            {'self': 2, 'data': 1, '0': 0, 'KeyError': 0, 'open': 0,
+             'file': 1})
+        self.check_counting_condition(
+            'in_exception_handling', function,
+            {'self': 0, 'data': 1, '0': 0, 'KeyError': 1, 'open': 0,
+             'file': 0})
+        self.check_counting_condition(
+            'in_with_block', function,
+            {'self': 0, 'data': 1, '0': 0, 'KeyError': 0, 'open': 0,
+             'file': 1})
+        self.check_counting_condition(
+            'is_yielded', function,
+            {'self': 0, 'data': 1, '0': 0, 'KeyError': 0, 'open': 0,
+             'file': 0})
+
+    def test_deep_nesting(self):
+        lines = ['def deep(x):\n',
+                 '    return ' + '(' * 50 + 'x' + ' + 1)' * 50 + '\n']
+        vectors = PythonCountVectorCreator(
+            [PythonCountingConditions.in_sum]).get_vectors_for_file(
+                'deep.py', lines)
+        self.assertEqual(vectors[1, 'deep']['x'].count_vector, [1])
+
+    def test_missing_node_types(self):
+        # Node types of newer Python versions are left out
+        self.assertEqual(PythonCountingConditions._get_node_types(
+            'For', 'NotExisting'), (ast.For,))
@@ -0,0 +1,29 @@
+class Merger:
+
+    def combine(self, first, second):
+        merged = []
+        a = 0
+        b = 0
+        while a < len(first) and b < len(second):
+            if first[a] <= second[b]:
+                merged.append(first[a])
+                a += 1
+            else:
+                merged.append(second[b])
+                b += 1
+        merged.extend(first[a:])
+        merged.extend(second[b:])
+        return merged
+
+
+def parse_config(lines, defaults):
+    config = dict(defaults)
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        if '=' not in line:
+            raise ValueError('Invalid line {}: {}'.format(number, line))
+        key, value = line.split('=', 1)
+        config[key.strip()] = value.strip()
+    return config
@@ -0,0 +1,39 @@
+def used(a, b):
+    foo(a + b)
+    return a * 2
+
+
+def conditions(a, b, c):
+    if a > 0:
+        if b:
+            c = a
+        else:
+            c = -a
+    while b and not c:
+        b -= 1
+    return c if c else 0
+
+
+def loops(items, total):
+    for item in items:
+        for part in item:
+            total += part
+    squares = [item * item for item in items if item]
+    return squares, total
+
+
+def members(self, data):
+    try:
+        self.data[0] = data.copy()
+    except KeyError:
+        yield data
+    with open(self.name) as file:
+        file.write(data)
+
+
+class Outer:
+
+    def method(self, x):
+        def nested(y):
+            return y
+        return nested(x)